@@ -1,7 +1,7 @@
 import typer
 
 from poptimizer import consts
-from poptimizer.cli import app, div, income, metrics, pdf, risk, stats
+from poptimizer.cli import app, div, income, metrics, pdf, risk, standin, stats, trace, worker
 
 
 def _main() -> None:
@@ -11,12 +11,15 @@ def _main() -> None:
         help=f"POptimizer {consts.__version__} - portfolio optimizer for MOEX shares and ETFs.",
     )
     cli.command()(app.run)
+    cli.command()(worker.worker)
     cli.command()(stats.stats)
     cli.command()(income.income)
     cli.command()(risk.risk)
     cli.command()(pdf.pdf)
     cli.command()(div.div)
     cli.command()(metrics.metrics)
+    cli.command()(trace.trace)
+    cli.command()(standin.standin)
     cli()
 
 
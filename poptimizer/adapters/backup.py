@@ -8,8 +8,9 @@ from pydantic import ValidationError
 from pymongo.errors import PyMongoError
 
 from poptimizer import consts, errors
-from poptimizer.adapters import mongo
+from poptimizer.adapters import mongo, storage
 from poptimizer.domain.div import raw
+from poptimizer.domain.evolve import evolve
 from poptimizer.domain.moex import trading_day
 from poptimizer.domain.portfolio import forecasts
 from poptimizer.use_cases import handler
@@ -19,15 +20,15 @@ _DF_KEY: Final = "df"
 
 
 class BackupHandler:
-    def __init__(self, mongo_repo: mongo.Repo) -> None:
+    def __init__(self, repo: storage.Repo) -> None:
         self._lgr = logging.getLogger()
-        self._mongo_repo = mongo_repo
+        self._repo = repo
 
     async def __call__(self, ctx: handler.Ctx, msg: handler.AppStarted) -> None:  # noqa: ARG002
         await self._migrate(ctx)
 
         try:
-            all_docs = [div.model_dump(mode="json") async for div in self._mongo_repo.get_all(raw.DivRaw)]
+            all_docs = [div.model_dump(mode="json") async for div in self._repo.get_all(raw.DivRaw)]
         except PyMongoError as err:
             raise errors.AdapterError("can't check raw dividends") from err
 
@@ -53,7 +54,12 @@ class BackupHandler:
         # 2025-11-23
         if _normalized_ver(current_ver) < _normalized_ver("3.3.0"):
             self._lgr.warning("Dropping forecasts data due to new format")
-            await self._mongo_repo.drop(forecasts.Forecast)
+            await self._repo.drop(forecasts.Forecast)
+
+        # 2026-10-17
+        if _normalized_ver(current_ver) < _normalized_ver("3.4.0"):
+            self._lgr.warning("Moving models forecasts to separate collection")
+            await self._repo.unset(evolve.Model, ["mean", "cov"])
 
     async def restore(self) -> None:
         if not _DUMP.exists():
@@ -65,9 +71,9 @@ class BackupHandler:
         try:
             for doc in json.loads(json_data):
                 div = raw.DivRaw.model_validate(doc)
-                div_new = await self._mongo_repo.get(raw.DivRaw, div.uid)
+                div_new = await self._repo.get(raw.DivRaw, div.uid, for_update=True)
                 div_new.df = div.df
-                await self._mongo_repo.save(div_new)
+                await self._repo.save(div_new)
         except (PyMongoError, ValidationError) as err:
             raise errors.AdapterError("can't restore raw dividends") from err
 
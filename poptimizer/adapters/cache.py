@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from typing import Final, NamedTuple
+
+from poptimizer.adapters import adapter
+from poptimizer.domain import domain
+
+_MAX_ENTRIES: Final = 4096
+_MAX_BYTES: Final = 2**28
+
+type Key = tuple[adapter.Component, domain.UID]
+
+
+class Stats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+class _Entry(NamedTuple):
+    entity: domain.Entity
+    size: int
+
+
+class EntityCache:
+    """Сущности копируются при записи в кеш и при выдаче из него, поэтому их изменения не попадают в кеш."""
+
+    def __init__(self, max_entries: int = _MAX_ENTRIES, max_bytes: int = _MAX_BYTES) -> None:
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[Key, _Entry] = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # Номер последней инвалидации каждого ключа защищает от записи в кеш данных,
+        # загруженных до инвалидации, но сохраняемых после нее
+        self._epoch = 0
+        self._invalidated: OrderedDict[Key, int] = OrderedDict()
+        self._forgotten = 0
+
+    def epoch(self) -> int:
+        return self._epoch
+
+    def versions(self) -> dict[Key, domain.Version]:
+        return {key: entry.entity.ver for key, entry in self._entries.items()}
+
+    def version(self, key: Key) -> domain.Version | None:
+        if (entry := self._entries.get(key)) is None:
+            return None
+
+        return entry.entity.ver
+
+    def get[E: domain.Entity](self, t_entity: type[E], key: Key, ver: domain.Version | None) -> E | None:
+        entry = self._entries.get(key)
+
+        if entry is None or entry.entity.ver != ver or not isinstance(entry.entity, t_entity):
+            self._misses += 1
+
+            return None
+
+        self._hits += 1
+        self._entries.move_to_end(key)
+
+        return entry.entity.model_copy(deep=True)
+
+    def put(self, key: Key, entity: domain.Entity, size: int, epoch: int | None = None) -> None:
+        if size > self._max_bytes or (epoch is not None and self._invalidated.get(key, self._forgotten) > epoch):
+            return
+
+        self._pop(key)
+        self._entries[key] = _Entry(entity.model_copy(deep=True), size)
+        self._size += size
+
+        while len(self._entries) > self._max_entries or self._size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= evicted.size
+            self._evictions += 1
+
+    def invalidate(self, key: Key) -> None:
+        self._epoch += 1
+        self._invalidated[key] = self._epoch
+        self._invalidated.move_to_end(key)
+
+        while len(self._invalidated) > self._max_entries:
+            _, epoch = self._invalidated.popitem(last=False)
+            self._forgotten = max(self._forgotten, epoch)
+
+        self._pop(key)
+
+    def invalidate_older(self, key: Key, ver: domain.Version) -> None:
+        if (cached := self.version(key)) is None or cached < ver:
+            self.invalidate(key)
+
+    def invalidate_collection(self, collection_name: adapter.Component) -> None:
+        self._forget_all()
+
+        for key in [key for key in self._entries if key[0] == collection_name]:
+            self._pop(key)
+
+    def clear(self) -> None:
+        self._forget_all()
+        self._entries.clear()
+        self._size = 0
+
+    def _forget_all(self) -> None:
+        self._epoch += 1
+        self._forgotten = self._epoch
+        self._invalidated.clear()
+
+    def _pop(self, key: Key) -> None:
+        if (entry := self._entries.pop(key, None)) is not None:
+            self._size -= entry.size
+
+    def stats(self) -> Stats:
+        return Stats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            size=self._size,
+        )
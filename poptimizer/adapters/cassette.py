@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from pathlib import Path
+from typing import Final
+
+import aiohttp
+from aiohttp import web
+from pydantic import BaseModel, ValidationError
+
+from poptimizer import config, errors
+
+_META_SUFFIX: Final = ".json"
+_BODY_SUFFIX: Final = ".body"
+_KEY: Final = "key"
+_SCHEME: Final = "http"
+_LOCALHOST: Final = "127.0.0.1"
+_RECORDED_METHODS: Final = frozenset({aiohttp.hdrs.METH_GET, aiohttp.hdrs.METH_HEAD})
+# Тело сохраняется распакованным, а длину выставляет сервер воспроизведения
+_SKIPPED_HEADERS: Final = frozenset(
+    header.lower()
+    for header in (
+        aiohttp.hdrs.CONTENT_ENCODING,
+        aiohttp.hdrs.CONTENT_LENGTH,
+        aiohttp.hdrs.TRANSFER_ENCODING,
+        aiohttp.hdrs.CONNECTION,
+    )
+)
+
+
+class _Record(BaseModel):
+    method: str
+    url: str
+    status: int
+    reason: str
+    headers: list[tuple[str, str]]
+
+
+class Cassette:
+    """Промежуточный слой клиентской сессии aiohttp для записи ответов внешних источников и их воспроизведения.
+
+    При записи ответы на GET и HEAD сохраняются в каталог. При воспроизведении запросы перенаправляются
+    на локальный сервер, отдающий записанные ответы, а отсутствие записи приводит к ошибке.
+    """
+
+    def __init__(self, path: Path, replay_port: int | None = None) -> None:
+        self._path = path
+        self._replay_port = replay_port
+
+    async def __call__(self, req: aiohttp.ClientRequest, handler: aiohttp.ClientHandlerType) -> aiohttp.ClientResponse:
+        if req.method not in _RECORDED_METHODS:
+            return await handler(req)
+
+        key = _key(req.method, str(req.url))
+
+        if self._replay_port is None:
+            resp = await handler(req)
+            body = await resp.read()
+
+            try:
+                await asyncio.to_thread(_save, self._path, key, _to_record(req, resp), body)
+            except OSError as err:
+                raise errors.AdapterError(f"can't record {req.method} {req.url}") from err
+
+            return resp
+
+        if not await asyncio.to_thread(_exists, self._path, key):
+            raise errors.AdapterError(f"no recorded response for {req.method} {req.url}")
+
+        req.url = req.url.build(scheme=_SCHEME, host=_LOCALHOST, port=self._replay_port, path=f"/{key}")
+
+        return await handler(req)
+
+
+@asynccontextmanager
+async def cassette(cfg: config.Cfg) -> AsyncIterator[Cassette | None]:
+    match cfg.http_cassette:
+        case "off":
+            yield None
+        case "record":
+            yield Cassette(cfg.http_cassette_path)
+        case "replay":
+            async with _replay_server(cfg.http_cassette_path, cfg.http_replay_latency) as port:
+                yield Cassette(cfg.http_cassette_path, port)
+
+
+@asynccontextmanager
+async def _replay_server(path: Path, latency: timedelta) -> AsyncIterator[int]:
+    async def replay(request: web.Request) -> web.Response:
+        try:
+            record, body = await asyncio.to_thread(_load, path, request.match_info[_KEY])
+        except (OSError, ValidationError) as err:
+            raise web.HTTPNotFound from err
+
+        await asyncio.sleep(latency.total_seconds())
+
+        return web.Response(status=record.status, reason=record.reason, headers=record.headers, body=body)
+
+    app = web.Application()
+    app.router.add_route("*", f"/{{{_KEY}}}", replay)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+
+    try:
+        site = web.TCPSite(runner, _LOCALHOST, 0)
+        await site.start()
+        _, port = runner.addresses[0][:2]
+
+        yield port
+    finally:
+        await runner.cleanup()
+
+
+def _key(method: str, url: str) -> str:
+    return hashlib.sha256(f"{method} {url}".encode()).hexdigest()
+
+
+def _to_record(req: aiohttp.ClientRequest, resp: aiohttp.ClientResponse) -> _Record:
+    return _Record(
+        method=req.method,
+        url=str(req.url),
+        status=resp.status,
+        reason=resp.reason or "",
+        headers=[(name, value) for name, value in resp.headers.items() if name.lower() not in _SKIPPED_HEADERS],
+    )
+
+
+def _exists(path: Path, key: str) -> bool:
+    return (path / f"{key}{_META_SUFFIX}").exists()
+
+
+def _load(path: Path, key: str) -> tuple[_Record, bytes]:
+    record = _Record.model_validate_json((path / f"{key}{_META_SUFFIX}").read_bytes())
+
+    return record, (path / f"{key}{_BODY_SUFFIX}").read_bytes()
+
+
+def _save(path: Path, key: str, record: _Record, body: bytes) -> None:
+    path.mkdir(parents=True, exist_ok=True)
+    _write(path / f"{key}{_BODY_SUFFIX}", body)
+    _write(path / f"{key}{_META_SUFFIX}", record.model_dump_json(indent=2).encode())
+
+
+def _write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}")
+    tmp.write_bytes(data)
+    tmp.replace(path)
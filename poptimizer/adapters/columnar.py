@@ -0,0 +1,170 @@
+import functools
+import hashlib
+from typing import Any, Final, NamedTuple, get_args
+
+import annotated_types
+import bson
+import numpy as np
+from numpy.typing import NDArray
+from pydantic import AfterValidator, BaseModel
+
+from poptimizer import consts
+from poptimizer.domain import domain
+from poptimizer.domain.div import div
+from poptimizer.domain.moex import index, quotes, usd
+
+DF: Final = "df"
+_DAY: Final = "day"
+
+_DAY_DTYPE: Final = np.dtype("datetime64[D]")
+_DAY_STORAGE_DTYPE: Final = np.dtype("<i8")
+_VALUE_DTYPE: Final = np.dtype("<f8")
+_START_DAY: Final = np.datetime64(consts.START_DAY, "D")
+
+_TYPES: Final = (
+    quotes.Quotes,
+    index.Index,
+    usd.USD,
+    div.Dividends,
+)
+
+type Columns = dict[str, NDArray[Any]]
+type Chunk = dict[str, bson.Binary]
+
+
+class Snapshot(NamedTuple):
+    ver: domain.Version
+    rows: int
+    chunks: int
+    digest: bytes
+
+
+class _Column:
+    def __init__(self, name: str, metadata: list[Any]) -> None:
+        self.name = name
+        self._gt: float | None = None
+        self._ge: float | None = None
+
+        for constraint in metadata:
+            match constraint:
+                case annotated_types.Gt(gt=gt):
+                    self._gt = float(gt)
+                case annotated_types.Ge(ge=ge):
+                    self._ge = float(ge)
+                case _:
+                    ...
+
+    def validate(self, values: NDArray[np.double]) -> None:
+        if self._gt is not None and not np.all(values > self._gt):
+            raise ValueError(f"{self.name} should be greater than {self._gt}")
+
+        if self._ge is not None and not np.all(values >= self._ge):
+            raise ValueError(f"{self.name} should be greater than or equal to {self._ge}")
+
+
+class Table:
+    def __init__(self, t_entity: type[domain.Entity]) -> None:
+        field = t_entity.model_fields[DF]
+        (self._t_row,) = get_args(field.annotation)
+        self._after_start = any(
+            isinstance(validator, AfterValidator) and validator.func is domain.after_start_date_validator
+            for validator in field.metadata
+        )
+        self._columns = [
+            _Column(name, row_field.metadata) for name, row_field in self._t_row.model_fields.items() if name != _DAY
+        ]
+
+    def columns(self, rows: list[BaseModel]) -> Columns:
+        columns: Columns = {_DAY: np.array([getattr(row, _DAY) for row in rows], dtype=_DAY_DTYPE)}
+
+        for col in self._columns:
+            columns[col.name] = np.array([getattr(row, col.name) for row in rows], dtype=_VALUE_DTYPE)
+
+        return columns
+
+    def size(self, columns: Columns) -> int:
+        return len(columns[_DAY])
+
+    def chunk(self, columns: Columns, start: int = 0) -> Chunk:
+        chunk = {_DAY: bson.Binary(columns[_DAY][start:].view(_DAY_STORAGE_DTYPE).tobytes())}
+
+        for col in self._columns:
+            chunk[col.name] = bson.Binary(columns[col.name][start:].tobytes())
+
+        return chunk
+
+    def unpack(self, chunks: list[dict[str, bytes]]) -> tuple[list[BaseModel], Columns]:
+        columns = self._load(chunks)
+        self.validate(columns)
+
+        names = [_DAY, *(col.name for col in self._columns)]
+        values = [columns[name].tolist() for name in names]
+        rows = [self._t_row.model_construct(**dict(zip(names, row, strict=True))) for row in zip(*values, strict=True)]
+
+        return rows, columns
+
+    def digest(self, columns: Columns, rows: int) -> bytes:
+        hasher = hashlib.blake2b()
+        hasher.update(columns[_DAY][:rows].view(_DAY_STORAGE_DTYPE).tobytes())
+
+        for col in self._columns:
+            hasher.update(columns[col.name][:rows].tobytes())
+
+        return hasher.digest()
+
+    def is_appended(self, columns: Columns, snapshot: Snapshot) -> bool:
+        if self.size(columns) < snapshot.rows:
+            return False
+
+        return self.digest(columns, snapshot.rows) == snapshot.digest
+
+    def validate(self, columns: Columns) -> None:
+        days = columns[_DAY]
+
+        if not np.all(days[1:] > days[:-1]):
+            raise ValueError("df not sorted by day")
+
+        if self._after_start and len(days) and days[0] < _START_DAY:
+            raise ValueError(f"day before start day {days[0]}")
+
+        for col in self._columns:
+            col.validate(columns[col.name])
+
+    def _load(self, chunks: list[dict[str, bytes]]) -> Columns:
+        try:
+            columns: Columns = {
+                _DAY: self._concat(chunks, _DAY, _DAY_STORAGE_DTYPE).view(_DAY_DTYPE),
+            }
+            for col in self._columns:
+                columns[col.name] = self._concat(chunks, col.name, _VALUE_DTYPE)
+        except KeyError as err:
+            raise ValueError(f"column {err} is missing") from err
+
+        if len({len(values) for values in columns.values()}) != 1:
+            raise ValueError("columns length mismatch")
+
+        return columns
+
+    def _concat(self, chunks: list[dict[str, bytes]], name: str, dtype: np.dtype[Any]) -> NDArray[Any]:
+        if not chunks:
+            return np.empty(0, dtype=dtype)
+
+        return np.concatenate([np.frombuffer(chunk[name], dtype=dtype) for chunk in chunks])
+
+
+@functools.cache
+def table(t_entity: type[domain.Entity]) -> Table | None:
+    if t_entity not in _TYPES:
+        return None
+
+    return Table(t_entity)
+
+
+def is_packed(doc: dict[str, Any]) -> bool:
+    match doc.get(DF):
+        case None | []:
+            return True
+        case [{"day": bytes()}, *_]:
+            return True
+        case _:
+            return False
@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import Mapping
+from datetime import timedelta
+from http import HTTPStatus
+from pathlib import Path
+from typing import Final
+
+import aiohttp
+from pydantic import BaseModel, ValidationError
+
+from poptimizer import errors
+from poptimizer.use_cases import handler
+
+_META_SUFFIX: Final = ".json"
+_BODY_SUFFIX: Final = ".body"
+_TMP_SUFFIX: Final = ".tmp"
+
+_NO_STORE: Final = "no-store"
+_MAX_AGE: Final = "max-age="
+
+
+class _Meta(BaseModel):
+    url: str
+    etag: str = ""
+    last_modified: str = ""
+    fresh_until: float = 0
+    digest: str
+
+
+class Cache:
+    """Кеш ответов внешних источников на диске.
+
+    Свежий ответ возвращается без запроса. Устаревший перепроверяется условным запросом по ETag и Last-Modified,
+    и при ответе 304 возвращается сохраненное тело. Ответ остается свежим дольше из TTL источника
+    и max-age из Cache-Control.
+    """
+
+    def __init__(self, http_client: aiohttp.ClientSession, path: Path) -> None:
+        self._lgr = logging.getLogger()
+        self._http_client = http_client
+        self._path = path
+
+    async def get(self, url: str, ttl: timedelta = timedelta(0)) -> handler.Download:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        cached = await asyncio.to_thread(self._load, key, url)
+
+        if cached is not None and time.time() < cached[0].fresh_until:
+            meta, body = cached
+
+            return handler.Download(body=body, digest=meta.digest, unchanged=True)
+
+        try:
+            meta, body, store = await self._download(url, ttl, cached)
+        except (TimeoutError, aiohttp.ClientError) as err:
+            raise errors.AdapterError(f"can't download {url}") from err
+
+        if store:
+            await asyncio.to_thread(self._save, key, meta, body)
+
+        return handler.Download(
+            body=body,
+            digest=meta.digest,
+            unchanged=cached is not None and cached[0].digest == meta.digest,
+        )
+
+    async def _download(
+        self,
+        url: str,
+        ttl: timedelta,
+        cached: tuple[_Meta, bytes] | None,
+    ) -> tuple[_Meta, bytes, bool]:
+        headers: dict[str, str] = {}
+
+        if cached is not None and cached[0].etag:
+            headers[aiohttp.hdrs.IF_NONE_MATCH] = cached[0].etag
+        if cached is not None and cached[0].last_modified:
+            headers[aiohttp.hdrs.IF_MODIFIED_SINCE] = cached[0].last_modified
+
+        async with self._http_client.get(url, headers=headers) as resp:
+            fresh_until, store = _freshness(resp.headers, ttl)
+
+            if resp.status == HTTPStatus.NOT_MODIFIED and cached is not None:
+                meta, body = cached
+
+                return meta.model_copy(update={"fresh_until": fresh_until}), body, store
+
+            if resp.status != HTTPStatus.OK:
+                raise errors.AdapterError(f"bad {url} respond status {resp.status} {resp.reason}")
+
+            body = await resp.read()
+            meta = _Meta(
+                url=url,
+                etag=resp.headers.get(aiohttp.hdrs.ETAG, ""),
+                last_modified=resp.headers.get(aiohttp.hdrs.LAST_MODIFIED, ""),
+                fresh_until=fresh_until,
+                digest=hashlib.sha256(body).hexdigest(),
+            )
+
+            return meta, body, store
+
+    def _load(self, key: str, url: str) -> tuple[_Meta, bytes] | None:
+        try:
+            meta = _Meta.model_validate_json((self._path / f"{key}{_META_SUFFIX}").read_bytes())
+            body = (self._path / f"{key}{_BODY_SUFFIX}").read_bytes()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValidationError) as err:
+            self._lgr.warning("Can't load cached %s - %s", url, err)
+
+            return None
+
+        # Тело и описание сохраняются разными файлами и могут разойтись при сбое
+        if meta.url != url or hashlib.sha256(body).hexdigest() != meta.digest:
+            return None
+
+        return meta, body
+
+    def _save(self, key: str, meta: _Meta, body: bytes) -> None:
+        try:
+            self._path.mkdir(parents=True, exist_ok=True)
+            _write(self._path / f"{key}{_BODY_SUFFIX}", body)
+            _write(self._path / f"{key}{_META_SUFFIX}", meta.model_dump_json().encode())
+        except OSError as err:
+            self._lgr.warning("Can't cache %s - %s", meta.url, err)
+
+
+def _freshness(headers: Mapping[str, str], ttl: timedelta) -> tuple[float, bool]:
+    max_age = 0
+    store = True
+
+    for directive in (part.strip() for part in headers.get(aiohttp.hdrs.CACHE_CONTROL, "").lower().split(",")):
+        if directive == _NO_STORE:
+            store = False
+        elif (age := directive.removeprefix(_MAX_AGE)) != directive and age.isdigit():
+            max_age = int(age)
+
+    return time.time() + max(ttl.total_seconds(), max_age), store
+
+
+def _write(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}{_TMP_SUFFIX}")
+    tmp.write_bytes(data)
+    tmp.replace(path)
@@ -3,22 +3,50 @@ from pathlib import Path
 from typing import Final
 
 import aiohttp
+from pydantic import HttpUrl
+
+from poptimizer.adapters import cassette, throttle
 
-_MAX_ISS_CON: Final = 10
 _HEADERS: Final = {
     "User-Agent": "POptimizer",
     "Connection": "keep-alive",
 }
 _CERTS: Final = Path(__file__).parent / "certs"
+_ISS_HOST: Final = "iss.moex.com"
+
+
+class _Redirect:
+    """Перенаправляет запросы к MOEX ISS на заменитель, сохраняя путь и параметры запроса."""
+
+    def __init__(self, url: HttpUrl) -> None:
+        self._url = url
+
+    async def __call__(self, req: aiohttp.ClientRequest, handler: aiohttp.ClientHandlerType) -> aiohttp.ClientResponse:
+        if req.url.host == _ISS_HOST:
+            req.url = req.url.with_scheme(self._url.scheme).with_host(self._url.host or "").with_port(self._url.port)
+
+        return await handler(req)
+
 
+def client(
+    limiter: throttle.Limiter | None = None,
+    recorder: cassette.Cassette | None = None,
+    iss_url: HttpUrl | None = None,
+) -> aiohttp.ClientSession:
+    limiter = limiter or throttle.Limiter()
+    middlewares: list[aiohttp.ClientMiddlewareType] = [limiter]
+    if recorder is not None:
+        middlewares.append(recorder)
+    if iss_url is not None:
+        middlewares.append(_Redirect(iss_url))
 
-def client(on_per_host: int = _MAX_ISS_CON) -> aiohttp.ClientSession:
     ctx = ssl.create_default_context()
     ctx.load_verify_locations(capath=_CERTS)
     return aiohttp.ClientSession(
         connector=aiohttp.TCPConnector(
             ssl_context=ctx,
-            limit_per_host=on_per_host,
+            limit_per_host=limiter.max_concurrency,
         ),
         headers=_HEADERS,
+        middlewares=tuple(middlewares),
     )
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from typing import Final
+
+import pymongo
+from pydantic import ValidationError
+from pymongo.errors import PyMongoError
+
+from poptimizer import config, errors
+from poptimizer.adapters import adapter, mongo, trusted
+from poptimizer.domain import domain
+from poptimizer.domain.evolve import evolve
+
+_MONGO_ID: Final = "_id"
+_STATUS: Final = "status"
+_ERROR: Final = "error"
+_MINIMAL_RETURNS_DAYS: Final = "minimal_returns_days"
+_WORKER: Final = "worker"
+_LEASE_UNTIL: Final = "lease_until"
+_ATTEMPTS: Final = "attempts"
+
+_LEASE_TTL: Final = timedelta(minutes=10)
+_POLL_INTERVAL: Final = timedelta(seconds=5)
+# Задание, аренда которого истекла столько раз, считается неудачным
+_MAX_ATTEMPTS: Final = 3
+# Ожидание результатов ограничено несколькими сроками аренды
+_WAIT_TTLS: Final = 3
+
+
+def _now() -> datetime:
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+class Queue:
+    """Очередь заданий на обучение моделей с арендой.
+
+    Задание атомарно захватывается одним воркером на время аренды, которую воркер продлевает, пока обучает модель.
+    Задания упавших воркеров после истечения аренды достаются другим.
+    """
+
+    def __init__(self, mongo_db: mongo.MongoDatabase, capacity: int = 0, ttl: timedelta = _LEASE_TTL) -> None:
+        self._lgr = logging.getLogger()
+        self._collection = mongo_db[adapter.get_component_name(evolve.TrainingJob)]
+        self._capacity = capacity
+        self._ttl = ttl
+
+    @property
+    def capacity(self) -> int:
+        """Максимальное количество одновременно обучаемых моделей."""
+        return self._capacity
+
+    @property
+    def ttl(self) -> timedelta:
+        return self._ttl
+
+    async def claim(self, worker: str) -> evolve.TrainingJob | None:
+        now = _now()
+        expired = {
+            _STATUS: evolve.JobStatus.QUEUED,
+            "$or": [{_LEASE_UNTIL: None}, {_LEASE_UNTIL: {"$lt": now}}],
+        }
+
+        try:
+            await self._collection.update_many(
+                expired | {_ATTEMPTS: {"$gte": _MAX_ATTEMPTS}},
+                {
+                    "$set": {
+                        _STATUS: evolve.JobStatus.FAILED,
+                        _ERROR: f"not trained in {_MAX_ATTEMPTS} attempts",
+                        _MINIMAL_RETURNS_DAYS: None,
+                        _LEASE_UNTIL: None,
+                    },
+                    "$inc": {mongo.VER: 1},
+                    "$unset": {trusted.CHK: ""},
+                },
+            )
+            doc = await self._collection.find_one_and_update(
+                expired | {_ATTEMPTS: {"$lt": _MAX_ATTEMPTS}},
+                {
+                    "$set": {_WORKER: worker, _LEASE_UNTIL: now + self._ttl},
+                    "$inc": {mongo.VER: 1, _ATTEMPTS: 1},
+                    "$unset": {trusted.CHK: ""},
+                },
+                sort=[(_LEASE_UNTIL, pymongo.ASCENDING)],
+                return_document=pymongo.ReturnDocument.AFTER,
+            )
+        except PyMongoError as err:
+            raise errors.AdapterError(f"can't claim {self._collection.name}") from err
+
+        if doc is None:
+            return None
+
+        uid = doc.pop(_MONGO_ID)
+        rev = {mongo.UID: uid, mongo.VER: doc.pop(mongo.VER)}
+
+        try:
+            return trusted.load(evolve.TrainingJob, doc, rev, full_validation=True)
+        except ValidationError as err:
+            raise errors.AdapterError(f"can't create entity {self._collection.name}.{uid} {err}") from err
+
+    async def extend(self, job: evolve.TrainingJob, worker: str) -> bool:
+        return await self._update_leased(job, worker, {_LEASE_UNTIL: _now() + self._ttl})
+
+    async def complete(self, job: evolve.TrainingJob, worker: str) -> bool:
+        return await self._update_leased(
+            job,
+            worker,
+            {
+                _STATUS: job.status,
+                _ERROR: job.error,
+                _MINIMAL_RETURNS_DAYS: job.minimal_returns_days,
+                _LEASE_UNTIL: None,
+            },
+        )
+
+    async def _update_leased(self, job: evolve.TrainingJob, worker: str, fields: mongo.MongoDocument) -> bool:
+        try:
+            result = await self._collection.update_one(
+                {_MONGO_ID: job.uid, _WORKER: worker, _STATUS: evolve.JobStatus.QUEUED},
+                {"$set": fields, "$inc": {mongo.VER: 1}, "$unset": {trusted.CHK: ""}},
+            )
+        except PyMongoError as err:
+            raise errors.AdapterError(f"can't update {self._collection.name}.{job.uid}") from err
+
+        return result.matched_count == 1
+
+    async def wait(self, uids: Sequence[domain.UID]) -> bool:
+        """Ждет, пока хотя бы одно из заданий не будет выполнено или удалено.
+
+        Возвращает False, если за несколько сроков аренды ни одно задание не завершилось.
+        """
+        self._lgr.info("Waiting for %d training jobs", len(uids))
+        deadline = time.monotonic() + self._ttl.total_seconds() * _WAIT_TTLS
+
+        while True:
+            try:
+                queued = await self._collection.count_documents(
+                    {_MONGO_ID: {"$in": uids}, _STATUS: evolve.JobStatus.QUEUED}
+                )
+            except PyMongoError as err:
+                raise errors.AdapterError(f"can't count {self._collection.name}") from err
+
+            if queued < len(uids):
+                return True
+
+            if time.monotonic() > deadline:
+                return False
+
+            await asyncio.sleep(_POLL_INTERVAL.total_seconds())
+
+
+@asynccontextmanager
+async def queue(cfg: config.Cfg) -> AsyncIterator[Queue]:
+    if cfg.db_backend != "mongo":
+        raise errors.AdapterError("training queue requires mongo backend")
+
+    async with mongo.db(cfg.mongo_db_uri, cfg.mongo_db_db) as mongo_db:
+        yield Queue(mongo_db, cfg.evolution_workers)
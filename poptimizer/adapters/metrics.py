@@ -0,0 +1,374 @@
+import bisect
+import logging
+import math
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+from typing import Final, NamedTuple, Self
+
+from poptimizer.adapters import adapter
+from poptimizer.use_cases import handler
+
+_MEGABYTE: Final = 2**20
+_SUMMARY_QUANTILE: Final = 0.95
+
+LATENCY_BUCKETS: Final = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class HistogramSnapshot(NamedTuple):
+    buckets: tuple[float, ...]
+    counts: tuple[int, ...]
+    total: float
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> float:
+        """Верхняя граница корзины, в которую попадает квантиль, или inf."""
+        rank = q * self.count
+        seen = 0
+
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+
+        return float("inf")
+
+    def __sub__(self, other: HistogramSnapshot) -> HistogramSnapshot:
+        return HistogramSnapshot(
+            buckets=self.buckets,
+            counts=tuple(new - old for new, old in zip(self.counts, other.counts, strict=True)),
+            total=self.total - other.total,
+        )
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._total = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect.bisect_left(self._buckets, value)] += 1
+        self._total += value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(buckets=self._buckets, counts=tuple(self._counts), total=self._total)
+
+
+class OpStats(NamedTuple):
+    count: int
+    errors: int
+    docs: int
+    size: int
+    validation: float
+    latency: HistogramSnapshot
+
+    def __sub__(self, other: OpStats) -> OpStats:
+        return OpStats(
+            count=self.count - other.count,
+            errors=self.errors - other.errors,
+            docs=self.docs - other.docs,
+            size=self.size - other.size,
+            validation=self.validation - other.validation,
+            latency=self.latency - other.latency,
+        )
+
+
+type OpKey = tuple[adapter.Component, str]
+type Snapshot = dict[OpKey, OpStats]
+
+
+class OpRecorder:
+    def __init__(self) -> None:
+        self._count = 0
+        self._errors = 0
+        self._docs = 0
+        self._size = 0
+        self._validation = 0.0
+        self._latency = Histogram()
+
+    def add_doc(self, size: int) -> None:
+        self._docs += 1
+        self._size += size
+
+    @contextmanager
+    def validating(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._validation += time.perf_counter() - start
+
+    @contextmanager
+    def measure(self) -> Iterator[Self]:
+        start = time.perf_counter()
+
+        try:
+            yield self
+        except Exception:
+            self._errors += 1
+
+            raise
+        finally:
+            self._count += 1
+            self._latency.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> OpStats:
+        return OpStats(
+            count=self._count,
+            errors=self._errors,
+            docs=self._docs,
+            size=self._size,
+            validation=self._validation,
+            latency=self._latency.snapshot(),
+        )
+
+
+class RepoMetrics:
+    def __init__(self) -> None:
+        self._ops: defaultdict[OpKey, OpRecorder] = defaultdict(OpRecorder)
+
+    def measure(self, collection_name: adapter.Component, op: str) -> AbstractContextManager[OpRecorder]:
+        return self._ops[collection_name, op].measure()
+
+    def snapshot(self) -> Snapshot:
+        return {key: recorder.snapshot() for key, recorder in self._ops.items()}
+
+
+class HandlerStats(NamedTuple):
+    invocations: int
+    retries: int
+    failures: int
+    in_flight: int
+    duration: HistogramSnapshot
+    delay: HistogramSnapshot
+
+
+class HandlerRecorder:
+    def __init__(self) -> None:
+        self._invocations = 0
+        self._retries = 0
+        self._failures = 0
+        self._in_flight = 0
+        self._duration = Histogram()
+        self._delay = Histogram()
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        self._in_flight += 1
+
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+
+    def started(self, delay: float) -> None:
+        self._delay.observe(delay)
+
+    def attempt(self, duration: float, *, failed: bool) -> None:
+        self._invocations += 1
+        self._failures += failed
+        self._duration.observe(duration)
+
+    def retry(self) -> None:
+        self._retries += 1
+
+    def snapshot(self) -> HandlerStats:
+        return HandlerStats(
+            invocations=self._invocations,
+            retries=self._retries,
+            failures=self._failures,
+            in_flight=self._in_flight,
+            duration=self._duration.snapshot(),
+            delay=self._delay.snapshot(),
+        )
+
+
+class HostStats(NamedTuple):
+    limit: float
+    rate: float
+    in_flight: int
+    requests: int
+    throttled: int
+    retries: int
+    latency: HistogramSnapshot
+
+    def __sub__(self, other: HostStats) -> HostStats:
+        return self._replace(
+            requests=self.requests - other.requests,
+            throttled=self.throttled - other.throttled,
+            retries=self.retries - other.retries,
+            latency=self.latency - other.latency,
+        )
+
+
+type HTTPSnapshot = dict[str, HostStats]
+
+type Labels = dict[str, str]
+
+
+class Exposition:
+    """Метрики в текстовом формате Prometheus."""
+
+    def __init__(self) -> None:
+        self._lines: list[str] = []
+
+    def counter(self, name: str, help_text: str, samples: Iterable[tuple[Labels, float]]) -> None:
+        self._header(name, "counter", help_text)
+        self._lines.extend(f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples)
+
+    def gauge(self, name: str, help_text: str, samples: Iterable[tuple[Labels, float]]) -> None:
+        self._header(name, "gauge", help_text)
+        self._lines.extend(f"{name}{_labels(labels)} {_number(value)}" for labels, value in samples)
+
+    def histogram(self, name: str, help_text: str, samples: Iterable[tuple[Labels, HistogramSnapshot]]) -> None:
+        self._header(name, "histogram", help_text)
+
+        for labels, histogram in samples:
+            cumulative = 0
+
+            for bound, count in zip((*histogram.buckets, float("inf")), histogram.counts, strict=True):
+                cumulative += count
+                self._lines.append(f"{name}_bucket{_labels(labels | {'le': _number(bound)})} {cumulative}")
+
+            self._lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.total)}")
+            self._lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+    def text(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+    def _header(self, name: str, kind: str, help_text: str) -> None:
+        self._lines.append(f"# HELP {name} {help_text}")
+        self._lines.append(f"# TYPE {name} {kind}")
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+
+    if value == int(value):
+        return str(int(value))
+
+    return repr(float(value))
+
+
+def export_io(exposition: Exposition, snapshot: Snapshot) -> None:
+    def samples(field: Callable[[OpStats], float]) -> list[tuple[Labels, float]]:
+        return [({"collection": name, "op": op}, field(stats)) for (name, op), stats in sorted(snapshot.items())]
+
+    exposition.counter("poptimizer_repo_ops_total", "Repository operations.", samples(lambda stats: stats.count))
+    exposition.counter(
+        "poptimizer_repo_errors_total", "Failed repository operations.", samples(lambda stats: stats.errors)
+    )
+    exposition.counter("poptimizer_repo_docs_total", "Documents read or written.", samples(lambda stats: stats.docs))
+    exposition.counter("poptimizer_repo_bytes_total", "BSON bytes read or written.", samples(lambda stats: stats.size))
+    exposition.counter(
+        "poptimizer_repo_validation_seconds_total",
+        "Time spent validating and constructing entities.",
+        samples(lambda stats: stats.validation),
+    )
+    exposition.histogram(
+        "poptimizer_repo_latency_seconds",
+        "Repository operation latency.",
+        [({"collection": name, "op": op}, stats.latency) for (name, op), stats in sorted(snapshot.items())],
+    )
+
+
+def export_http(exposition: Exposition, snapshot: HTTPSnapshot) -> None:
+    def samples(field: Callable[[HostStats], float]) -> list[tuple[Labels, float]]:
+        return [({"host": host}, field(stats)) for host, stats in sorted(snapshot.items())]
+
+    exposition.counter("poptimizer_http_requests_total", "HTTP requests.", samples(lambda stats: stats.requests))
+    exposition.counter(
+        "poptimizer_http_throttled_total",
+        "HTTP requests failed with 429, 5xx or network error.",
+        samples(lambda stats: stats.throttled),
+    )
+    exposition.counter("poptimizer_http_retries_total", "HTTP request retries.", samples(lambda stats: stats.retries))
+    exposition.gauge(
+        "poptimizer_http_concurrency_limit", "Adaptive concurrency limit.", samples(lambda stats: stats.limit)
+    )
+    exposition.gauge("poptimizer_http_rate_limit", "Adaptive requests per second.", samples(lambda stats: stats.rate))
+    exposition.gauge("poptimizer_http_in_flight", "HTTP requests in progress.", samples(lambda stats: stats.in_flight))
+    exposition.histogram(
+        "poptimizer_http_latency_seconds",
+        "HTTP time to response headers.",
+        [({"host": host}, stats.latency) for host, stats in sorted(snapshot.items())],
+    )
+
+
+def diff(new: Snapshot, old: Snapshot) -> Snapshot:
+    return {key: stats - old[key] if key in old else stats for key, stats in new.items()}
+
+
+class RepoSummaryHandler:
+    def __init__(self, snapshot_fn: Callable[[], Snapshot]) -> None:
+        self._lgr = logging.getLogger()
+        self._snapshot_fn = snapshot_fn
+        self._last: Snapshot = {}
+
+    async def __call__(self, ctx: handler.Ctx, msg: handler.DataChecked) -> None:  # noqa: ARG002
+        snapshot = self._snapshot_fn()
+        cycle = diff(snapshot, self._last)
+        self._last = snapshot
+
+        for (collection_name, op), stats in sorted(cycle.items(), key=lambda item: -item[1].latency.total):
+            if not stats.count:
+                continue
+
+            self._lgr.info(
+                "Repo %s.%s - %d ops, %d errors, %d docs, %.1fMb, %.2fs total, p%.0f<=%gs, %.2fs validation",
+                collection_name,
+                op,
+                stats.count,
+                stats.errors,
+                stats.docs,
+                stats.size / _MEGABYTE,
+                stats.latency.total,
+                _SUMMARY_QUANTILE * 100,
+                stats.latency.quantile(_SUMMARY_QUANTILE),
+                stats.validation,
+            )
+
+
+class HTTPSummaryHandler:
+    def __init__(self, snapshot_fn: Callable[[], HTTPSnapshot]) -> None:
+        self._lgr = logging.getLogger()
+        self._snapshot_fn = snapshot_fn
+        self._last: HTTPSnapshot = {}
+
+    async def __call__(self, ctx: handler.Ctx, msg: handler.DataChecked) -> None:  # noqa: ARG002
+        snapshot = self._snapshot_fn()
+        cycle = {host: stats - self._last[host] if host in self._last else stats for host, stats in snapshot.items()}
+        self._last = snapshot
+
+        for host, stats in sorted(cycle.items()):
+            if not stats.requests:
+                continue
+
+            self._lgr.info(
+                "HTTP %s - %d requests, %d throttled, %d retries, limit %.1f, %.1f rps, p%.0f<=%gs",
+                host,
+                stats.requests,
+                stats.throttled,
+                stats.retries,
+                stats.limit,
+                stats.rate,
+                _SUMMARY_QUANTILE * 100,
+                stats.latency.quantile(_SUMMARY_QUANTILE),
+            )
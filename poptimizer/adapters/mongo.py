@@ -1,16 +1,19 @@
-import datetime
-import random
-from collections.abc import AsyncIterator
+import asyncio
+import datetime as dt
+import logging
+from collections import defaultdict
+from collections.abc import AsyncIterator, Iterable, Sequence
 from contextlib import asynccontextmanager
-from typing import Any, Final
+from typing import Any, Final, NamedTuple
 
+import bson
 import pymongo
 from pydantic import MongoDsn, ValidationError
 from pymongo.asynchronous import collection, database
-from pymongo.errors import PyMongoError
+from pymongo.errors import BulkWriteError, OperationFailure, PyMongoError
 
 from poptimizer import consts, errors
-from poptimizer.adapters import adapter
+from poptimizer.adapters import adapter, cache, columnar, metrics, trusted
 from poptimizer.domain import domain
 from poptimizer.domain.evolve import evolve
 
@@ -19,6 +22,23 @@ REV: Final = "rev"
 VER: Final = "ver"
 UID: Final = "uid"
 DAY: Final = "day"
+_LLH_MEAN: Final = "llh_mean"
+_ALFA_MEAN: Final = "alfa_mean"
+
+# Количество дописанных блоков колонок, после которого документ перезаписывается целиком
+_MAX_CHUNKS: Final = 32
+
+_CHANGE_STREAMS_NOT_SUPPORTED: Final = 40573
+_DUPLICATE_KEY: Final = 11000
+_WATCH_RETRY: Final = dt.timedelta(seconds=30)
+_POLL_INTERVAL: Final = dt.timedelta(seconds=5)
+_CHANGE_PROJECTION: Final = {
+    "operationType": True,
+    "ns": True,
+    "documentKey": True,
+    f"updateDescription.updatedFields.{VER}": True,
+    f"fullDocument.{VER}": True,
+}
 
 type MongoDocument = dict[str, Any]
 type MongoClient = pymongo.AsyncMongoClient[MongoDocument]
@@ -26,107 +46,240 @@ type MongoDatabase = database.AsyncDatabase[MongoDocument]
 type MongoCollection = collection.AsyncCollection[MongoDocument]
 
 
+class _UpdateOp(NamedTuple):
+    filter: MongoDocument
+    update: MongoDocument
+    snapshot: columnar.Snapshot | None
+
+
 @asynccontextmanager
 async def db(uri: MongoDsn, db: str) -> AsyncIterator[MongoDatabase]:
     mongo_client: MongoClient = pymongo.AsyncMongoClient(str(uri), tz_aware=False)
     try:
-        yield mongo_client[db]
+        mongo_db = mongo_client[db]
+        await _create_indexes(mongo_db)
+
+        yield mongo_db
     finally:
         await mongo_client.aclose()
 
 
+async def _create_indexes(mongo_db: MongoDatabase) -> None:
+    collection_name = adapter.get_component_name(evolve.Model)
+
+    try:
+        await mongo_db[collection_name].create_indexes(
+            [
+                pymongo.IndexModel([(_LLH_MEAN, pymongo.ASCENDING)]),
+                pymongo.IndexModel([(DAY, pymongo.ASCENDING), (_LLH_MEAN, pymongo.ASCENDING)]),
+                pymongo.IndexModel([(DAY, pymongo.ASCENDING), (_ALFA_MEAN, pymongo.ASCENDING)]),
+            ]
+        )
+    except PyMongoError as err:
+        raise errors.AdapterError(f"can't create {collection_name} indexes") from err
+
+
 class Repo:
-    def __init__(self, mongo_db: MongoDatabase) -> None:
+    def __init__(
+        self,
+        mongo_db: MongoDatabase,
+        entity_cache: cache.EntityCache | None = None,
+        *,
+        full_validation: bool = False,
+    ) -> None:
+        self._lgr = logging.getLogger()
         self._db = mongo_db
+        self._cache = entity_cache or cache.EntityCache()
+        self._metrics = metrics.RepoMetrics()
+        self._full_validation = full_validation
+        self._snapshots: dict[tuple[adapter.Component, domain.UID], columnar.Snapshot] = {}
+        # Пока изменения отслеживаются, закешированным версиям можно доверять без запроса к базе
+        self._trusted = False
+
+    async def watch(self, poll_interval: dt.timedelta = _POLL_INTERVAL) -> None:
+        try:
+            if not await self._watch_changes():
+                self._lgr.warning("Change streams are not supported - polling cached versions")
+                await self._poll_versions(poll_interval.total_seconds())
+        finally:
+            self._trusted = False
+
+    async def _watch_changes(self) -> bool:
+        while True:
+            try:
+                async with await self._db.watch([{"$project": _CHANGE_PROJECTION}]) as stream:
+                    self._cache.clear()
+                    self._trusted = True
+
+                    async for change in stream:
+                        self._on_change(change)
+
+                    self._trusted = False
+            except PyMongoError as err:
+                self._trusted = False
+
+                if isinstance(err, OperationFailure) and err.code == _CHANGE_STREAMS_NOT_SUPPORTED:
+                    return False
+
+                self._lgr.warning("Change stream failed - %s", err)
+                await asyncio.sleep(_WATCH_RETRY.total_seconds())
+
+    def _on_change(self, change: MongoDocument) -> None:
+        match change:
+            case {"operationType": "delete", "ns": {"coll": str(coll)}, "documentKey": {"_id": uid}}:
+                self._cache.invalidate((adapter.Component(coll), domain.UID(uid)))
+            case {
+                "ns": {"coll": str(coll)},
+                "documentKey": {"_id": uid},
+                "updateDescription": {"updatedFields": {"ver": int(ver)}},
+            } | {
+                "ns": {"coll": str(coll)},
+                "documentKey": {"_id": uid},
+                "fullDocument": {"ver": int(ver)},
+            }:
+                self._cache.invalidate_older((adapter.Component(coll), domain.UID(uid)), domain.Version(ver))
+            case {"ns": {"coll": str(coll)}, "documentKey": {"_id": uid}}:
+                self._cache.invalidate((adapter.Component(coll), domain.UID(uid)))
+            case {"ns": {"coll": str(coll)}}:
+                self._cache.invalidate_collection(adapter.Component(coll))
+            case _:
+                self._cache.clear()
+
+    async def _poll_versions(self, interval: float) -> None:
+        while True:
+            try:
+                await self._check_versions()
+            except errors.AdapterError as err:
+                self._lgr.warning("Can't poll cached versions - %s", err)
+                self._cache.clear()
+                self._trusted = False
+            else:
+                # Закешированным версиям можно доверять только после их первой проверки
+                self._trusted = True
+
+            await asyncio.sleep(interval)
+
+    async def _check_versions(self) -> None:
+        by_collection: defaultdict[adapter.Component, dict[domain.UID, domain.Version]] = defaultdict(dict)
+
+        for (collection_name, uid), ver in self._cache.versions().items():
+            by_collection[collection_name][uid] = ver
+
+        # Версии каждой коллекции загружаются одним запросом, а коллекции - параллельно
+        all_vers = await asyncio.gather(
+            *(self._load_vers(collection_name, list(cached)) for collection_name, cached in by_collection.items())
+        )
+
+        for (collection_name, cached), vers in zip(by_collection.items(), all_vers, strict=True):
+            for uid, ver in cached.items():
+                if vers.get(uid) != ver:
+                    self._cache.invalidate((collection_name, uid))
 
     async def next_model(self, uid: domain.UID) -> tuple[evolve.Model, bool]:
+        with self._metrics.measure(adapter.get_component_name(evolve.Model), "next_model"):
+            return await self._next_model(uid)
+
+    async def _next_model(self, uid: domain.UID) -> tuple[evolve.Model, bool]:
         collection_name = adapter.get_component_name(evolve.Model)
         collection = self._db[collection_name]
+        projection = [_MONGO_ID, DAY, _LLH_MEAN, _ALFA_MEAN]
 
-        projection = ["_id", "day", "llh_mean", "alfa_mean"]
-        docs = [doc async for doc in collection.find({}, projection=projection)]
+        try:
+            if (doc := await collection.find_one({_LLH_MEAN: {"$exists": False}}, projection=[_MONGO_ID])) is not None:
+                return await self.get(evolve.Model, domain.UID(doc[_MONGO_ID]), for_update=True), True
 
-        key_count = len(projection)
-        target: MongoDocument | None = None
-        min_day = docs[0]["day"]
+            if (target := await collection.find_one({_MONGO_ID: uid}, projection=projection)) is None:
+                return await self._random_model(collection), False
 
-        for doc in docs:
-            if len(doc) != key_count:
-                return await self.get(evolve.Model, domain.UID(doc["_id"])), True
+            oldest = await self._first(collection, {}, DAY, pymongo.ASCENDING)
 
-            if doc["_id"] == uid:
-                target = doc
+            if await collection.count_documents({DAY: oldest[DAY]}, limit=2) == 1:
+                return await self.get(evolve.Model, domain.UID(oldest[_MONGO_ID]), for_update=True), False
 
-            min_day = min(min_day, doc["day"])
+            return await self._farthest_from_target(collection, oldest[DAY], target)
+        except PyMongoError as err:
+            raise errors.AdapterError(f"can't select next model in {collection_name}") from err
 
-        if target is None:
-            return await self.get(evolve.Model, domain.UID(random.choice(docs)["_id"])), False  # noqa: S311
+    async def _random_model(self, collection: MongoCollection) -> evolve.Model:
+        pipeline = [{"$sample": {"size": 1}}, {"$project": {_MONGO_ID: True}}]
 
-        docs = [doc for doc in docs if doc["day"] == min_day]
+        async for doc in await collection.aggregate(pipeline):
+            return await self.get(evolve.Model, domain.UID(doc[_MONGO_ID]), for_update=True)
 
-        if len(docs) == 1:
-            return await self.get(evolve.Model, domain.UID(docs[0]["_id"])), False
+        raise errors.AdapterError(f"no models in {collection.name}")
 
-        return await self._farthest_from_target(docs, target)
+    async def _first(
+        self,
+        collection: MongoCollection,
+        query: MongoDocument,
+        field: str,
+        direction: int,
+    ) -> MongoDocument:
+        try:
+            doc = await collection.find_one(query, projection=[_MONGO_ID, field], sort=[(field, direction)])
+        except PyMongoError as err:
+            raise errors.AdapterError(f"can't load {collection.name} {field}") from err
+
+        if doc is None:
+            raise errors.AdapterError(f"no models in {collection.name}")
+
+        return doc
 
     async def _farthest_from_target(
         self,
-        docs: list[MongoDocument],
+        collection: MongoCollection,
+        min_day: dt.datetime,
         target: MongoDocument,
     ) -> tuple[evolve.Model, bool]:
-        min_llh = docs[0]
-        max_llh = docs[0]
-        min_alfa = docs[0]
-        max_alfa = docs[0]
+        async with asyncio.TaskGroup() as tg:
+            min_llh_task = tg.create_task(self._first(collection, {DAY: min_day}, _LLH_MEAN, pymongo.ASCENDING))
+            max_llh_task = tg.create_task(self._first(collection, {DAY: min_day}, _LLH_MEAN, pymongo.DESCENDING))
+            min_alfa_task = tg.create_task(self._first(collection, {DAY: min_day}, _ALFA_MEAN, pymongo.ASCENDING))
+            max_alfa_task = tg.create_task(self._first(collection, {DAY: min_day}, _ALFA_MEAN, pymongo.DESCENDING))
 
-        for doc in docs:
-            if doc["llh_mean"] < min_llh["llh_mean"]:
-                min_llh = doc
-
-            if doc["llh_mean"] > max_llh["llh_mean"]:
-                max_llh = doc
-
-            if doc["alfa_mean"] < min_alfa["alfa_mean"]:
-                min_alfa = doc
-
-            if doc["alfa_mean"] > max_alfa["alfa_mean"]:
-                max_alfa = doc
+        min_llh = await min_llh_task
+        max_llh = await max_llh_task
+        min_alfa = await min_alfa_task
+        max_alfa = await max_alfa_task
 
         selected = max(
             (
                 min_llh,
                 False,
-                (target["llh_mean"] - min_llh["llh_mean"]) / (max_llh["llh_mean"] - min_llh["llh_mean"]),
+                (target[_LLH_MEAN] - min_llh[_LLH_MEAN]) / (max_llh[_LLH_MEAN] - min_llh[_LLH_MEAN]),
             ),
             (
                 max_llh,
                 True,
-                (max_llh["llh_mean"] - target["llh_mean"]) / (max_llh["llh_mean"] - min_llh["llh_mean"]),
+                (max_llh[_LLH_MEAN] - target[_LLH_MEAN]) / (max_llh[_LLH_MEAN] - min_llh[_LLH_MEAN]),
             ),
             (
                 min_alfa,
                 False,
-                (target["alfa_mean"] - min_alfa["alfa_mean"]) / (max_alfa["alfa_mean"] - min_alfa["alfa_mean"]),
+                (target[_ALFA_MEAN] - min_alfa[_ALFA_MEAN]) / (max_alfa[_ALFA_MEAN] - min_alfa[_ALFA_MEAN]),
             ),
             (
                 max_alfa,
                 True,
-                (max_alfa["alfa_mean"] - target["alfa_mean"]) / (max_alfa["alfa_mean"] - min_alfa["alfa_mean"]),
+                (max_alfa[_ALFA_MEAN] - target[_ALFA_MEAN]) / (max_alfa[_ALFA_MEAN] - min_alfa[_ALFA_MEAN]),
             ),
             key=lambda x: x[2],
         )
 
-        return await self.get(evolve.Model, domain.UID(selected[0]["_id"])), selected[1]
+        return await self.get(evolve.Model, domain.UID(selected[0][_MONGO_ID]), for_update=True), selected[1]
 
     async def sample_models(self, n: int) -> list[evolve.Model]:
         collection_name = adapter.get_component_name(evolve.Model)
         collection = self._db[collection_name]
         pipeline = [{"$sample": {"size": n}}]
 
-        try:
-            return [self._create_entity(evolve.Model, doc) async for doc in await collection.aggregate(pipeline)]
-        except PyMongoError as err:
-            raise errors.AdapterError("can't sample organisms") from err
+        with self._metrics.measure(collection_name, "sample_models") as stats:
+            try:
+                docs = [doc async for doc in await collection.aggregate(pipeline)]
+            except PyMongoError as err:
+                raise errors.AdapterError("can't sample organisms") from err
+
+            return [self._load_entity(stats, evolve.Model, doc) for doc in docs]
 
     async def count_models(self) -> int:
         collection_name = adapter.get_component_name(evolve.Model)
@@ -141,14 +294,88 @@ class Repo:
         self,
         t_entity: type[E],
         uid: domain.UID | None = None,
+        *,
+        for_update: bool = False,
     ) -> E:
+        uid = uid or domain.UID(adapter.get_component_name(t_entity))
+
+        return (await self.get_many(t_entity, [uid], for_update=for_update))[0]
+
+    async def get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+        *,
+        for_update: bool = False,
+    ) -> list[E]:
+        entities = await self._get_many(t_entity, uids, create=True, for_update=for_update)
+
+        return [entities[uid] for uid in uids]
+
+    async def find_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]:
+        entities = await self._get_many(t_entity, uids, create=False, for_update=False)
+
+        return [entities[uid] for uid in uids if uid in entities]
+
+    async def _get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+        *,
+        create: bool,
+        for_update: bool,
+    ) -> dict[domain.UID, E]:
         collection_name = adapter.get_component_name(t_entity)
-        uid = uid or domain.UID(collection_name)
 
-        if (doc := await self._load(collection_name, uid)) is None:
-            doc = await self._create_new(collection_name, uid)
+        with self._metrics.measure(collection_name, "get") as stats:
+            unique_uids = list(dict.fromkeys(uids))
+
+            vers: dict[domain.UID, domain.Version] = {}
+            if self._trusted:
+                vers = {
+                    uid: ver for uid in unique_uids if (ver := self._cache.version((collection_name, uid))) is not None
+                }
+            elif cached_uids := [uid for uid in unique_uids if self._cache.version((collection_name, uid)) is not None]:
+                vers = await self._load_vers(collection_name, cached_uids)
 
-        return self._create_entity(t_entity, doc)
+            entities: dict[domain.UID, E] = {}
+
+            for uid in unique_uids:
+                if (entity := self._cache.get(t_entity, (collection_name, uid), vers.get(uid))) is not None:
+                    entities[uid] = entity
+
+            if missed_uids := [uid for uid in unique_uids if uid not in entities]:
+                epoch = self._cache.epoch()
+                docs = await self._load_many(collection_name, missed_uids)
+
+                if create and (new_uids := [uid for uid in missed_uids if uid not in docs]):
+                    docs |= await self._create_many(collection_name, new_uids)
+
+                for uid in missed_uids:
+                    if (doc := docs.get(uid)) is None:
+                        continue
+
+                    size = len(bson.encode(doc))
+                    stats.add_doc(size)
+
+                    with stats.validating():
+                        entities[uid] = self._create_entity(t_entity, doc)
+
+                    # Загруженная для изменения сущность после сохранения все равно устареет
+                    if not for_update:
+                        self._cache.put((collection_name, uid), entities[uid], size, epoch)
+
+            return entities
+
+    def cache_stats(self) -> cache.Stats:
+        return self._cache.stats()
+
+    def io_stats(self) -> metrics.Snapshot:
+        return self._metrics.snapshot()
 
     async def get_all[E: domain.Entity](
         self,
@@ -157,66 +384,238 @@ class Repo:
         collection_name = adapter.get_component_name(t_entity)
         db = self._db[collection_name]
 
+        with self._metrics.measure(collection_name, "get_all") as stats:
+            try:
+                async for doc in db.find({}):
+                    yield self._load_entity(stats, t_entity, doc)
+            except PyMongoError as err:
+                raise errors.AdapterError("can't load entities from {collection_name}") from err
+
+    async def _load_vers(
+        self,
+        collection_name: str,
+        uids: list[domain.UID],
+    ) -> dict[domain.UID, domain.Version]:
+        collection = self._db[collection_name]
+
         try:
-            async for doc in db.find({}):
-                yield self._create_entity(t_entity, doc)
+            return {
+                doc[_MONGO_ID]: domain.Version(doc[VER])
+                async for doc in collection.find({_MONGO_ID: {"$in": uids}}, projection={VER: True})
+            }
         except PyMongoError as err:
-            raise errors.AdapterError("can't load entities from {collection_name}") from err
+            raise errors.AdapterError(f"can't load {collection_name} versions") from err
 
-    async def _load(self, collection_name: str, uid: domain.UID) -> MongoDocument | None:
+    async def _load_many(self, collection_name: str, uids: list[domain.UID]) -> dict[domain.UID, MongoDocument]:
         collection = self._db[collection_name]
 
         try:
-            return await collection.find_one({_MONGO_ID: uid})
+            return {doc[_MONGO_ID]: doc async for doc in collection.find({_MONGO_ID: {"$in": uids}})}
         except PyMongoError as err:
-            raise errors.AdapterError("can't load {collection_name}.{uid}") from err
-
-    async def _create_new(self, collection_name: str, uid: domain.UID) -> MongoDocument | None:
-        doc = {
-            _MONGO_ID: uid,
-            VER: 0,
-            DAY: datetime.datetime(*consts.START_DAY.timetuple()[:3]),
+            raise errors.AdapterError(f"can't load {collection_name}") from err
+
+    async def _create_many(self, collection_name: str, uids: list[domain.UID]) -> dict[domain.UID, MongoDocument]:
+        docs = {
+            uid: {
+                _MONGO_ID: uid,
+                VER: 0,
+                DAY: dt.datetime(*consts.START_DAY.timetuple()[:3]),
+            }
+            for uid in uids
         }
 
         collection = self._db[collection_name]
 
         try:
-            await collection.insert_one(doc)
+            await collection.insert_many(list(docs.values()), ordered=False)
         except PyMongoError as err:
-            raise errors.AdapterError("can't create {collection_name}.{uid}") from err
+            raise errors.AdapterError(f"can't create {collection_name}.{uids}") from err
 
-        return doc
+        return docs
+
+    def _load_entity[E: domain.Entity](self, stats: metrics.OpRecorder, t_entity: type[E], doc: Any) -> E:
+        stats.add_doc(len(bson.encode(doc)))
+
+        with stats.validating():
+            return self._create_entity(t_entity, doc)
 
     def _create_entity[E: domain.Entity](self, t_entity: type[E], doc: Any) -> E:
         uid = doc.pop(_MONGO_ID)
-        doc[REV] = {
+        rev = {
             UID: uid,
             VER: doc.pop(VER),
         }
 
         try:
-            return t_entity.model_validate(doc)
-        except ValidationError as err:
+            if (table := columnar.table(t_entity)) is not None and columnar.is_packed(doc):
+                return self._create_columnar_entity(t_entity, table, doc, rev)
+
+            return trusted.load(t_entity, doc, rev, full_validation=self._full_validation)
+        except (ValidationError, ValueError) as err:
             collection_name = adapter.get_component_name(t_entity)
             raise errors.AdapterError(f"can't create entity {collection_name}.{uid} {err}") from err
 
+    def _create_columnar_entity[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        table: columnar.Table,
+        doc: Any,
+        rev: MongoDocument,
+    ) -> E:
+        chunks = doc.pop(columnar.DF, [])
+        rows, columns = table.unpack(chunks)
+        entity = trusted.load(t_entity, doc, rev, full_validation=self._full_validation)
+        setattr(entity, columnar.DF, rows)
+
+        self._snapshots[adapter.get_component_name(t_entity), entity.uid] = columnar.Snapshot(
+            ver=entity.ver,
+            rows=len(rows),
+            chunks=len(chunks),
+            digest=table.digest(columns, len(rows)),
+        )
+
+        return entity
+
     async def save(self, entity: domain.Entity) -> None:
         collection_name = adapter.get_component_name(entity)
 
-        doc = entity.model_dump()
-        doc.pop(REV)
+        with self._metrics.measure(collection_name, "save") as stats:
+            op = self._prepare_measured_update(stats, collection_name, entity)
+
+            try:
+                updated = await self._db[collection_name].find_one_and_update(
+                    op.filter,
+                    op.update,
+                    projection={_MONGO_ID: False},
+                )
+            except PyMongoError as err:
+                raise errors.AdapterError("can't save entities") from err
+
+            self._cache.invalidate((collection_name, entity.uid))
+
+            if updated is None:  # type: ignore[reportUnnecessaryComparison]
+                self._snapshots.pop((collection_name, entity.uid), None)
+
+                raise errors.VersionConflictError(f"wrong version {collection_name}.{entity.uid}")
+
+            if op.snapshot is not None:
+                self._snapshots[collection_name, entity.uid] = op.snapshot
+
+    async def save_many(self, entities: Iterable[domain.Entity]) -> None:
+        by_collection: defaultdict[adapter.Component, list[domain.Entity]] = defaultdict(list)
+
+        for entity in entities:
+            by_collection[adapter.get_component_name(entity)].append(entity)
+
+        async with asyncio.TaskGroup() as tg:
+            for collection_name, collection_entities in by_collection.items():
+                tg.create_task(self._save_collection(collection_name, collection_entities))
+
+    async def _save_collection(self, collection_name: adapter.Component, entities: list[domain.Entity]) -> None:
+        with self._metrics.measure(collection_name, "save") as stats:
+            await self._save_measured(stats, collection_name, entities)
+
+    async def _save_measured(
+        self,
+        stats: metrics.OpRecorder,
+        collection_name: adapter.Component,
+        entities: list[domain.Entity],
+    ) -> None:
+        ops = [self._prepare_measured_update(stats, collection_name, entity) for entity in entities]
+        # Сущности нулевой версии могут еще отсутствовать в базе и создаются при сохранении
+        requests = [
+            pymongo.UpdateOne(op.filter, op.update, upsert=entity.ver == 0)
+            for entity, op in zip(entities, ops, strict=True)
+        ]
 
         try:
-            updated = await self._db[collection_name].find_one_and_update(
-                {_MONGO_ID: entity.uid, VER: entity.ver, DAY: {"$lte": doc[DAY]}},
-                {"$inc": {VER: 1}, "$set": doc},
-                projection={_MONGO_ID: False},
-            )
+            result = await self._db[collection_name].bulk_write(requests, ordered=False)
+            written = result.matched_count + result.upserted_count
+        except BulkWriteError as err:
+            if any(error["code"] != _DUPLICATE_KEY for error in err.details["writeErrors"]):
+                raise errors.AdapterError(f"can't save {collection_name}") from err
+
+            written = err.details["nMatched"] + err.details["nUpserted"]
         except PyMongoError as err:
-            raise errors.AdapterError("can't save entities") from err
+            raise errors.AdapterError(f"can't save {collection_name}") from err
+
+        conflicts: set[domain.UID] = set()
+
+        if written != len(ops):
+            vers = await self._load_vers(collection_name, [entity.uid for entity in entities])
+            conflicts = {entity.uid for entity in entities if vers.get(entity.uid) != entity.ver + 1}
+
+        for entity, op in zip(entities, ops, strict=True):
+            self._cache.invalidate((collection_name, entity.uid))
 
-        if updated is None:  # type: ignore[reportUnnecessaryComparison]
-            raise errors.AdapterError(f"wrong version {collection_name}.{entity.uid}")
+            if entity.uid in conflicts:
+                self._snapshots.pop((collection_name, entity.uid), None)
+            elif op.snapshot is not None:
+                self._snapshots[collection_name, entity.uid] = op.snapshot
+
+        if written != len(ops):
+            raise errors.VersionConflictError(f"wrong version {collection_name}.{sorted(conflicts)}")
+
+    def _prepare_measured_update(
+        self,
+        stats: metrics.OpRecorder,
+        collection_name: adapter.Component,
+        entity: domain.Entity,
+    ) -> _UpdateOp:
+        with stats.validating():
+            op = self._prepare_update(collection_name, entity)
+
+        stats.add_doc(len(bson.encode(op.update)))
+
+        return op
+
+    def _prepare_update(self, collection_name: adapter.Component, entity: domain.Entity) -> _UpdateOp:
+        match columnar.table(entity.__class__):
+            case None:
+                update: MongoDocument = {"$inc": {VER: 1}, "$set": trusted.dump(entity)}
+                snapshot = None
+            case table:
+                update, snapshot = self._prepare_columnar_update(collection_name, table, entity)
+
+        return _UpdateOp(
+            filter={_MONGO_ID: entity.uid, VER: entity.ver, DAY: {"$lte": update["$set"][DAY]}},
+            update=update,
+            snapshot=snapshot,
+        )
+
+    def _prepare_columnar_update(
+        self,
+        collection_name: adapter.Component,
+        table: columnar.Table,
+        entity: domain.Entity,
+    ) -> tuple[MongoDocument, columnar.Snapshot]:
+        doc = trusted.dump(entity, exclude={columnar.DF})
+        columns = table.columns(getattr(entity, columnar.DF))
+        rows = table.size(columns)
+
+        try:
+            table.validate(columns)
+        except ValueError as err:
+            raise errors.AdapterError(f"can't save invalid entity {collection_name}.{entity.uid} {err}") from err
+        update: MongoDocument = {"$inc": {VER: 1}, "$set": doc}
+
+        match self._snapshots.get((collection_name, entity.uid)):
+            case columnar.Snapshot(ver=ver, chunks=chunks) as old if (
+                ver == entity.ver and chunks < _MAX_CHUNKS and table.is_appended(columns, old)
+            ):
+                if rows > old.rows:
+                    update["$push"] = {columnar.DF: table.chunk(columns, old.rows)}
+                    chunks += 1
+            case _:
+                doc[columnar.DF] = [table.chunk(columns)] if rows else []
+                chunks = len(doc[columnar.DF])
+
+        return update, columnar.Snapshot(
+            ver=domain.Version(entity.ver + 1),
+            rows=rows,
+            chunks=chunks,
+            digest=table.digest(columns, rows),
+        )
 
     async def delete(self, entity: domain.Entity) -> None:
         collection_name = adapter.get_component_name(entity)
@@ -227,9 +626,39 @@ class Repo:
         except PyMongoError as err:
             raise errors.AdapterError("can't delete organisms") from err
 
+        self._snapshots.pop((collection_name, entity.uid), None)
+        self._cache.invalidate((collection_name, entity.uid))
+
         if result.deleted_count != 1:
             raise errors.AdapterError(f"can't delete {collection_name}.{entity.uid}")
 
+    async def delete_many(self, entity_type: type[domain.Entity], uids: Iterable[domain.UID]) -> None:
+        if not (uids := list(uids)):
+            return
+
+        collection_name = adapter.get_component_name(entity_type)
+        collection = self._db[collection_name]
+
+        try:
+            await collection.delete_many({_MONGO_ID: {"$in": uids}})
+        except PyMongoError as err:
+            raise errors.AdapterError(f"can't delete {collection_name}") from err
+
+        for uid in uids:
+            self._snapshots.pop((collection_name, uid), None)
+            self._cache.invalidate((collection_name, uid))
+
+    async def unset(self, entity_type: type[domain.Entity], fields: Iterable[str]) -> None:
+        collection_name = adapter.get_component_name(entity_type)
+        collection = self._db[collection_name]
+
+        try:
+            await collection.update_many({}, {"$unset": dict.fromkeys(fields, "")})
+        except PyMongoError as err:
+            raise errors.AdapterError(f"can't unset {collection_name} fields") from err
+
+        self._cache.invalidate_collection(collection_name)
+
     async def drop(self, entity_type: type[domain.Entity]) -> None:
         collection_name = adapter.get_component_name(entity_type)
         collection = self._db[collection_name]
@@ -238,3 +667,6 @@ class Repo:
             await collection.drop()
         except PyMongoError as err:
             raise errors.AdapterError("can't delete {collection_name}") from err
+
+        self._snapshots = {key: snapshot for key, snapshot in self._snapshots.items() if key[0] != collection_name}
+        self._cache.invalidate_collection(collection_name)
@@ -0,0 +1,464 @@
+import asyncio
+import contextlib
+import itertools
+import sqlite3
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Final
+
+import bson
+from pydantic import ValidationError
+
+from poptimizer import consts, errors
+from poptimizer.adapters import adapter, columnar, metrics, trusted
+from poptimizer.domain import domain
+from poptimizer.domain.evolve import evolve
+
+VER: Final = "ver"
+UID: Final = "uid"
+DAY: Final = "day"
+_LLH_MEAN: Final = "llh_mean"
+_ALFA_MEAN: Final = "alfa_mean"
+
+# Ограничение на количество параметров в одном запросе SQLite
+_MAX_PARAMS: Final = 500
+
+type Document = dict[str, Any]
+
+
+@asynccontextmanager
+async def db(path: Path) -> AsyncIterator[sqlite3.Connection]:
+    conn = await asyncio.to_thread(_connect, path)
+    try:
+        yield conn
+    finally:
+        await asyncio.to_thread(conn.close)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+
+    return conn
+
+
+class Repo:
+    def __init__(self, conn: sqlite3.Connection, *, full_validation: bool = False) -> None:
+        self._conn = conn
+        self._lock = asyncio.Lock()
+        self._tables: set[adapter.Component] = set()
+        self._metrics = metrics.RepoMetrics()
+        self._full_validation = full_validation
+
+    async def watch(self) -> None:
+        # Сущности не кешируются - отслеживать изменения других процессов не нужно
+        return
+
+    def io_stats(self) -> metrics.Snapshot:
+        return self._metrics.snapshot()
+
+    async def next_model(self, uid: domain.UID) -> tuple[evolve.Model, bool]:
+        with self._metrics.measure(self._table(evolve.Model), "next_model"):
+            model_uid, good = await self._run("can't select next model", self._next_model, uid)
+
+            return await self.get(evolve.Model, model_uid), good
+
+    async def sample_models(self, n: int) -> list[evolve.Model]:
+        table = self._table(evolve.Model)
+
+        with self._metrics.measure(table, "sample_models") as stats:
+            rows = await self._run(
+                "can't sample organisms",
+                self._fetch,
+                table,
+                f'SELECT uid, ver, doc FROM "{table}" ORDER BY random() LIMIT ?',  # noqa: S608
+                (n,),
+            )
+
+            return [self._load_entity(stats, evolve.Model, uid, ver, doc) for uid, ver, doc in rows]
+
+    async def count_models(self) -> int:
+        table = self._table(evolve.Model)
+        rows = await self._run("can't count organisms", self._fetch, table, f'SELECT count(*) FROM "{table}"', ())  # noqa: S608
+
+        return rows[0][0]
+
+    async def get[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uid: domain.UID | None = None,
+        *,
+        for_update: bool = False,
+    ) -> E:
+        uid = uid or domain.UID(adapter.get_component_name(t_entity))
+
+        return (await self.get_many(t_entity, [uid], for_update=for_update))[0]
+
+    async def get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+        *,
+        for_update: bool = False,  # noqa: ARG002
+    ) -> list[E]:
+        # Сущности не кешируются - каждая загрузка возвращает новые экземпляры
+        entities = await self._get_many(t_entity, uids, create=True)
+
+        return [entities[uid] for uid in uids]
+
+    async def find_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]:
+        entities = await self._get_many(t_entity, uids, create=False)
+
+        return [entities[uid] for uid in uids if uid in entities]
+
+    async def _get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+        *,
+        create: bool,
+    ) -> dict[str, E]:
+        table = self._table(t_entity)
+
+        with self._metrics.measure(table, "get") as stats:
+            rows = await self._run(
+                f"can't load {table}",
+                self._load_or_create,
+                table,
+                list(dict.fromkeys(uids)),
+                create=create,
+            )
+
+            return {uid: self._load_entity(stats, t_entity, uid, ver, doc) for uid, ver, doc in rows}
+
+    async def get_all[E: domain.Entity](
+        self,
+        t_entity: type[E],
+    ) -> AsyncIterator[E]:
+        table = self._table(t_entity)
+
+        with self._metrics.measure(table, "get_all") as stats:
+            rows = await self._run(
+                f"can't load entities from {table}",
+                self._fetch,
+                table,
+                f'SELECT uid, ver, doc FROM "{table}"',  # noqa: S608
+                (),
+            )
+
+            for uid, ver, doc in rows:
+                yield self._load_entity(stats, t_entity, uid, ver, doc)
+
+    async def save(self, entity: domain.Entity) -> None:
+        await self.save_many([entity])
+
+    async def save_many(self, entities: Iterable[domain.Entity]) -> None:
+        entities = list(entities)
+
+        with contextlib.ExitStack() as stack:
+            stats = {
+                table: stack.enter_context(self._metrics.measure(table, "save"))
+                for table in dict.fromkeys(self._table(entity) for entity in entities)
+            }
+            updates: list[tuple[adapter.Component, domain.UID, domain.Version, Document]] = []
+
+            for entity in entities:
+                table = self._table(entity)
+
+                with stats[table].validating():
+                    updates.append((table, entity.uid, entity.ver, self._dump(entity)))
+
+            conflicts, sizes = await self._run("can't save entities", self._update, updates)
+
+            for table, size in sizes:
+                stats[table].add_doc(size)
+
+            if conflicts:
+                raise errors.VersionConflictError(f"wrong version {conflicts}")
+
+    async def delete(self, entity: domain.Entity) -> None:
+        table = self._table(entity)
+        deleted = await self._run(
+            f"can't delete {table}.{entity.uid}",
+            self._execute,
+            table,
+            f'DELETE FROM "{table}" WHERE uid = ?',  # noqa: S608
+            (entity.uid,),
+        )
+
+        if deleted != 1:
+            raise errors.AdapterError(f"can't delete {table}.{entity.uid}")
+
+    async def delete_many(self, entity_type: type[domain.Entity], uids: Iterable[domain.UID]) -> None:
+        table = self._table(entity_type)
+
+        if uids := list(uids):
+            await self._run(f"can't delete {table}", self._delete_many, table, uids)
+
+    async def unset(self, entity_type: type[domain.Entity], fields: Iterable[str]) -> None:
+        table = self._table(entity_type)
+        await self._run(f"can't unset {table} fields", self._unset, table, list(fields))
+
+    async def drop(self, entity_type: type[domain.Entity]) -> None:
+        table = self._table(entity_type)
+        await self._run(f"can't delete {table}", self._drop, table)
+
+    def _table(self, entity: Any) -> adapter.Component:
+        return adapter.get_component_name(entity)
+
+    async def _run[**P, T](self, msg: str, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        async with self._lock:
+            try:
+                return await asyncio.to_thread(fn, *args, **kwargs)
+            except sqlite3.Error as err:
+                raise errors.AdapterError(msg) from err
+
+    def _load_entity[E: domain.Entity](
+        self,
+        stats: metrics.OpRecorder,
+        t_entity: type[E],
+        uid: str,
+        ver: int,
+        blob: bytes,
+    ) -> E:
+        stats.add_doc(len(blob))
+
+        with stats.validating():
+            return self._create_entity(t_entity, uid, ver, blob)
+
+    def _create_entity[E: domain.Entity](self, t_entity: type[E], uid: str, ver: int, blob: bytes) -> E:
+        doc = bson.decode(blob)
+        rev = {UID: uid, VER: ver}
+
+        try:
+            if (table := columnar.table(t_entity)) is not None and columnar.is_packed(doc):
+                rows, _ = table.unpack(doc.pop(columnar.DF, []))
+                entity = trusted.load(t_entity, doc, rev, full_validation=self._full_validation)
+                setattr(entity, columnar.DF, rows)
+
+                return entity
+
+            return trusted.load(t_entity, doc, rev, full_validation=self._full_validation)
+        except (ValidationError, ValueError) as err:
+            raise errors.AdapterError(f"can't create entity {self._table(t_entity)}.{uid} {err}") from err
+
+    def _dump(self, entity: domain.Entity) -> Document:
+        if (table := columnar.table(entity.__class__)) is None:
+            return trusted.dump(entity)
+
+        doc = trusted.dump(entity, exclude={columnar.DF})
+        columns = table.columns(getattr(entity, columnar.DF))
+
+        try:
+            table.validate(columns)
+        except ValueError as err:
+            raise errors.AdapterError(f"can't save invalid entity {self._table(entity)}.{entity.uid} {err}") from err
+
+        doc[columnar.DF] = [table.chunk(columns)] if table.size(columns) else []
+
+        return doc
+
+    def _ensure_table(self, table: adapter.Component) -> None:
+        if table in self._tables:
+            return
+
+        with self._conn:
+            self._conn.execute(
+                f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                "uid TEXT PRIMARY KEY, "
+                "ver INTEGER NOT NULL, "
+                "day TEXT NOT NULL, "
+                "llh_mean REAL, "
+                "alfa_mean REAL, "
+                "doc BLOB NOT NULL)"
+            )
+
+            if table == self._table(evolve.Model):
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_llh" ON "{table}" (llh_mean)')
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_day_llh" ON "{table}" (day, llh_mean)')
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS "{table}_day_alfa" ON "{table}" (day, alfa_mean)')
+
+        self._tables.add(table)
+
+    def _fetch(self, table: adapter.Component, sql: str, params: Sequence[Any]) -> list[tuple[Any, ...]]:
+        self._ensure_table(table)
+
+        return self._conn.execute(sql, params).fetchall()
+
+    def _execute(self, table: adapter.Component, sql: str, params: Sequence[Any]) -> int:
+        self._ensure_table(table)
+
+        with self._conn:
+            return self._conn.execute(sql, params).rowcount
+
+    def _load_or_create(
+        self,
+        table: adapter.Component,
+        uids: list[domain.UID],
+        *,
+        create: bool,
+    ) -> list[tuple[str, int, bytes]]:
+        self._ensure_table(table)
+        rows: list[tuple[str, int, bytes]] = []
+
+        for batch in itertools.batched(uids, _MAX_PARAMS, strict=False):
+            rows.extend(
+                self._conn.execute(
+                    f'SELECT uid, ver, doc FROM "{table}" WHERE uid IN ({", ".join("?" * len(batch))})',  # noqa: S608
+                    batch,
+                ).fetchall()
+            )
+
+        loaded = {row[0] for row in rows}
+
+        if create and (new := [uid for uid in uids if uid not in loaded]):
+            start_day = datetime(*consts.START_DAY.timetuple()[:3])
+            blob = bson.encode({DAY: start_day})
+
+            with self._conn:
+                self._conn.executemany(
+                    f'INSERT OR IGNORE INTO "{table}" (uid, ver, day, doc) VALUES (?, 0, ?, ?)',  # noqa: S608
+                    [(uid, _day(start_day), blob) for uid in new],
+                )
+
+            rows.extend((uid, 0, blob) for uid in new)
+
+        return rows
+
+    def _delete_many(self, table: adapter.Component, uids: list[domain.UID]) -> None:
+        self._ensure_table(table)
+
+        with self._conn:
+            for batch in itertools.batched(uids, _MAX_PARAMS, strict=False):
+                self._conn.execute(
+                    f'DELETE FROM "{table}" WHERE uid IN ({", ".join("?" * len(batch))})',  # noqa: S608
+                    batch,
+                )
+
+    def _update(
+        self,
+        updates: list[tuple[adapter.Component, domain.UID, domain.Version, Document]],
+    ) -> tuple[list[str], list[tuple[adapter.Component, int]]]:
+        conflicts: list[str] = []
+        sizes: list[tuple[adapter.Component, int]] = []
+
+        for table, *_ in updates:
+            self._ensure_table(table)
+
+        with self._conn:
+            for table, uid, ver, doc in updates:
+                blob = bson.encode(doc)
+                sizes.append((table, len(blob)))
+                cursor = self._conn.execute(
+                    f'UPDATE "{table}" SET ver = ver + 1, day = ?, llh_mean = ?, alfa_mean = ?, doc = ? '  # noqa: S608
+                    "WHERE uid = ? AND ver = ? AND day <= ?",
+                    (
+                        _day(doc[DAY]),
+                        doc.get(_LLH_MEAN),
+                        doc.get(_ALFA_MEAN),
+                        blob,
+                        uid,
+                        ver,
+                        _day(doc[DAY]),
+                    ),
+                )
+
+                # Сущности нулевой версии могут еще отсутствовать в базе и создаются при сохранении
+                if cursor.rowcount != 1 and ver == 0:
+                    cursor = self._conn.execute(
+                        f'INSERT OR IGNORE INTO "{table}" (uid, ver, day, llh_mean, alfa_mean, doc) '  # noqa: S608
+                        "VALUES (?, 1, ?, ?, ?, ?)",
+                        (uid, _day(doc[DAY]), doc.get(_LLH_MEAN), doc.get(_ALFA_MEAN), blob),
+                    )
+
+                if cursor.rowcount != 1:
+                    conflicts.append(f"{table}.{uid}")
+
+        return conflicts, sizes
+
+    def _unset(self, table: adapter.Component, fields: list[str]) -> None:
+        self._ensure_table(table)
+
+        with self._conn:
+            for uid, blob in self._conn.execute(f'SELECT uid, doc FROM "{table}"').fetchall():  # noqa: S608
+                doc = bson.decode(blob)
+
+                for field in fields:
+                    doc.pop(field, None)
+
+                self._conn.execute(f'UPDATE "{table}" SET doc = ? WHERE uid = ?', (bson.encode(doc), uid))  # noqa: S608
+
+    def _drop(self, table: adapter.Component) -> None:
+        with self._conn:
+            self._conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+
+        self._tables.discard(table)
+
+    def _next_model(self, uid: domain.UID) -> tuple[domain.UID, bool]:
+        table = self._table(evolve.Model)
+        self._ensure_table(table)
+
+        if row := self._one(f'SELECT uid FROM "{table}" WHERE llh_mean IS NULL LIMIT 1'):  # noqa: S608
+            return domain.UID(row[0]), True
+
+        target = self._one(f'SELECT llh_mean, alfa_mean FROM "{table}" WHERE uid = ?', (uid,))  # noqa: S608
+        if target is None:
+            return domain.UID(self._first(f'SELECT uid FROM "{table}" ORDER BY random() LIMIT 1')[0]), False  # noqa: S608
+
+        oldest_uid, min_day = self._first(f'SELECT uid, day FROM "{table}" ORDER BY day LIMIT 1')  # noqa: S608
+        (count,) = self._first(
+            f'SELECT count(*) FROM (SELECT 1 FROM "{table}" WHERE day = ? LIMIT 2)',  # noqa: S608
+            (min_day,),
+        )
+
+        if count == 1:
+            return domain.UID(oldest_uid), False
+
+        extremes = [
+            self._first(
+                f'SELECT uid, {field} FROM "{table}" WHERE day = ? ORDER BY {field} {order} LIMIT 1',  # noqa: S608
+                (min_day,),
+            )
+            for field, order in itertools.product((_LLH_MEAN, _ALFA_MEAN), ("ASC", "DESC"))
+        ]
+
+        return _farthest_from_target(target, extremes)
+
+    def _one(self, sql: str, params: Sequence[Any] = ()) -> tuple[Any, ...] | None:
+        return self._conn.execute(sql, params).fetchone()
+
+    def _first(self, sql: str, params: Sequence[Any] = ()) -> tuple[Any, ...]:
+        if (row := self._one(sql, params)) is None:
+            raise errors.AdapterError("no models")
+
+        return row
+
+
+def _farthest_from_target(
+    target: tuple[float, float],
+    extremes: list[tuple[Any, ...]],
+) -> tuple[domain.UID, bool]:
+    (min_llh_uid, min_llh), (max_llh_uid, max_llh), (min_alfa_uid, min_alfa), (max_alfa_uid, max_alfa) = extremes
+    target_llh, target_alfa = target
+
+    selected = max(
+        (min_llh_uid, False, (target_llh - min_llh) / (max_llh - min_llh)),
+        (max_llh_uid, True, (max_llh - target_llh) / (max_llh - min_llh)),
+        (min_alfa_uid, False, (target_alfa - min_alfa) / (max_alfa - min_alfa)),
+        (max_alfa_uid, True, (max_alfa - target_alfa) / (max_alfa - min_alfa)),
+        key=lambda x: x[2],
+    )
+
+    return domain.UID(selected[0]), selected[1]
+
+
+def _day(day: datetime) -> str:
+    return day.isoformat()
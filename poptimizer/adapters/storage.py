@@ -0,0 +1,70 @@
+from collections.abc import AsyncIterator, Iterable, Sequence
+from contextlib import asynccontextmanager
+from typing import Protocol
+
+from poptimizer import config
+from poptimizer.adapters import metrics, mongo, sqlite
+from poptimizer.domain import domain
+from poptimizer.domain.evolve import evolve
+
+
+class Repo(Protocol):
+    async def get[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uid: domain.UID | None = None,
+        *,
+        for_update: bool = False,
+    ) -> E: ...
+
+    async def get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+        *,
+        for_update: bool = False,
+    ) -> list[E]: ...
+
+    async def find_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
+
+    def get_all[E: domain.Entity](
+        self,
+        t_entity: type[E],
+    ) -> AsyncIterator[E]: ...
+
+    async def save(self, entity: domain.Entity) -> None: ...
+
+    async def save_many(self, entities: Iterable[domain.Entity]) -> None: ...
+
+    async def delete(self, entity: domain.Entity) -> None: ...
+
+    async def delete_many(self, entity_type: type[domain.Entity], uids: Iterable[domain.UID]) -> None: ...
+
+    async def unset(self, entity_type: type[domain.Entity], fields: Iterable[str]) -> None: ...
+
+    async def drop(self, entity_type: type[domain.Entity]) -> None: ...
+
+    async def next_model(self, uid: domain.UID) -> tuple[evolve.Model, bool]: ...
+
+    async def sample_models(self, n: int) -> list[evolve.Model]: ...
+
+    async def count_models(self) -> int: ...
+
+    async def watch(self) -> None: ...
+
+    def io_stats(self) -> metrics.Snapshot: ...
+
+
+@asynccontextmanager
+async def repo(cfg: config.Cfg) -> AsyncIterator[Repo]:
+    match cfg.db_backend:
+        case "mongo":
+            async with mongo.db(cfg.mongo_db_uri, cfg.mongo_db_db) as mongo_db:
+                yield mongo.Repo(mongo_db, full_validation=cfg.db_full_validation)
+        case "sqlite":
+            async with sqlite.db(cfg.sqlite_path) as conn:
+                yield sqlite.Repo(conn, full_validation=cfg.db_full_validation)
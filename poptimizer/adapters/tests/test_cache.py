@@ -0,0 +1,150 @@
+from datetime import date
+
+from poptimizer.adapters import adapter, cache
+from poptimizer.domain import domain
+
+_COLLECTION = adapter.Component("Entity")
+
+
+def _entity(uid: str, ver: int = 1) -> domain.Entity:
+    return domain.Entity(
+        rev=domain.Revision(uid=domain.UID(uid), ver=domain.Version(ver)),
+        day=date(2025, 1, 27),
+    )
+
+
+def _key(uid: str) -> cache.Key:
+    return _COLLECTION, domain.UID(uid)
+
+
+def test_get_miss():
+    entity_cache = cache.EntityCache()
+
+    assert entity_cache.get(domain.Entity, _key("a"), domain.Version(1)) is None
+    assert entity_cache.stats() == cache.Stats(hits=0, misses=1, evictions=0, entries=0, size=0)
+
+
+def test_get_hit_returns_copy():
+    entity_cache = cache.EntityCache()
+    entity = _entity("a")
+    entity_cache.put(_key("a"), entity, 10)
+
+    cached = entity_cache.get(domain.Entity, _key("a"), domain.Version(1))
+
+    assert cached == entity
+    assert cached is not entity
+    assert entity_cache.version(_key("a")) == 1
+    assert entity_cache.stats() == cache.Stats(hits=1, misses=0, evictions=0, entries=1, size=10)
+
+
+def test_mutations_do_not_leak():
+    entity_cache = cache.EntityCache()
+    entity = _entity("a")
+    entity_cache.put(_key("a"), entity, 10)
+    entity.day = date(2025, 1, 28)
+
+    cached = entity_cache.get(domain.Entity, _key("a"), domain.Version(1))
+    assert cached is not None
+    cached.day = date(2025, 1, 29)
+
+    assert entity_cache.get(domain.Entity, _key("a"), domain.Version(1)) == _entity("a")
+
+
+def test_get_stale_version():
+    entity_cache = cache.EntityCache()
+    entity_cache.put(_key("a"), _entity("a"), 10)
+
+    assert entity_cache.get(domain.Entity, _key("a"), domain.Version(2)) is None
+    assert entity_cache.get(domain.Entity, _key("a"), None) is None
+    assert entity_cache.stats().misses == 2
+
+
+def test_lru_eviction_by_entries():
+    entity_cache = cache.EntityCache(max_entries=2)
+    entity_cache.put(_key("a"), _entity("a"), 1)
+    entity_cache.put(_key("b"), _entity("b"), 1)
+    entity_cache.get(domain.Entity, _key("a"), domain.Version(1))
+    entity_cache.put(_key("c"), _entity("c"), 1)
+
+    assert entity_cache.version(_key("a")) is not None
+    assert entity_cache.version(_key("b")) is None
+    assert entity_cache.version(_key("c")) is not None
+    assert entity_cache.stats().evictions == 1
+
+
+def test_eviction_by_size():
+    entity_cache = cache.EntityCache(max_bytes=10)
+    entity_cache.put(_key("a"), _entity("a"), 6)
+    entity_cache.put(_key("b"), _entity("b"), 6)
+    entity_cache.put(_key("c"), _entity("c"), 11)
+
+    assert entity_cache.version(_key("a")) is None
+    assert entity_cache.version(_key("b")) is not None
+    assert entity_cache.version(_key("c")) is None
+    assert entity_cache.stats().size == 6
+
+
+def test_invalidate():
+    entity_cache = cache.EntityCache()
+    entity_cache.put(_key("a"), _entity("a"), 1)
+    entity_cache.put(_key("b"), _entity("b"), 1)
+
+    entity_cache.invalidate(_key("a"))
+
+    assert entity_cache.version(_key("a")) is None
+    assert entity_cache.stats().entries == 1
+
+    entity_cache.invalidate_collection(_COLLECTION)
+
+    assert entity_cache.stats() == cache.Stats(hits=0, misses=0, evictions=0, entries=0, size=0)
+
+
+def test_put_loaded_before_invalidation():
+    entity_cache = cache.EntityCache()
+    epoch = entity_cache.epoch()
+    entity_cache.invalidate(_key("a"))
+
+    entity_cache.put(_key("a"), _entity("a"), 1, epoch)
+    entity_cache.put(_key("b"), _entity("b"), 1, epoch)
+
+    assert entity_cache.version(_key("a")) is None
+    assert entity_cache.version(_key("b")) == 1
+
+    entity_cache.put(_key("a"), _entity("a"), 1, entity_cache.epoch())
+
+    assert entity_cache.version(_key("a")) == 1
+
+
+def test_put_loaded_before_forgotten_invalidation():
+    entity_cache = cache.EntityCache(max_entries=1)
+    epoch = entity_cache.epoch()
+    entity_cache.invalidate(_key("a"))
+    entity_cache.invalidate(_key("b"))
+
+    entity_cache.put(_key("a"), _entity("a"), 1, epoch)
+
+    assert entity_cache.version(_key("a")) is None
+
+
+def test_invalidate_older():
+    entity_cache = cache.EntityCache()
+    entity_cache.put(_key("a"), _entity("a", 2), 1)
+
+    entity_cache.invalidate_older(_key("a"), domain.Version(2))
+
+    assert entity_cache.versions() == {_key("a"): 2}
+
+    entity_cache.invalidate_older(_key("a"), domain.Version(3))
+
+    assert entity_cache.versions() == {}
+
+
+def test_clear():
+    entity_cache = cache.EntityCache()
+    epoch = entity_cache.epoch()
+    entity_cache.put(_key("a"), _entity("a"), 1)
+
+    entity_cache.clear()
+    entity_cache.put(_key("b"), _entity("b"), 1, epoch)
+
+    assert entity_cache.stats() == cache.Stats(hits=0, misses=0, evictions=0, entries=0, size=0)
@@ -0,0 +1,71 @@
+import time
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from poptimizer import config, errors
+from poptimizer.adapters import cassette
+
+
+class _Source:
+    def __init__(self) -> None:
+        self.requests = 0
+
+    async def __call__(self, request: web.Request) -> web.Response:
+        self.requests += 1
+
+        return web.json_response({"query": request.query_string}, headers={"X-Source": "live"})
+
+
+@pytest.fixture
+def source() -> _Source:
+    return _Source()
+
+
+@pytest.fixture
+async def url(source) -> AsyncIterator[str]:
+    app = web.Application()
+    app.router.add_get("/data", source)
+
+    async with TestServer(app) as server:
+        yield str(server.make_url("/data"))
+
+
+async def _get_json(cfg: config.Cfg, url: str) -> tuple[int, dict[str, str], str]:
+    async with (
+        cassette.cassette(cfg) as recorder,
+        aiohttp.ClientSession(middlewares=(recorder,) if recorder else ()) as session,
+        session.get(url, params={"a": "1"}) as resp,
+    ):
+        return resp.status, await resp.json(), resp.headers.get("X-Source", "")
+
+
+async def test_record_and_replay(source, url, tmp_path):
+    recorded = await _get_json(config.Cfg(http_cassette="record", http_cassette_path=tmp_path), url)
+    replayed = await _get_json(config.Cfg(http_cassette="replay", http_cassette_path=tmp_path), url)
+
+    assert recorded == replayed == (200, {"query": "a=1"}, "live")
+    assert source.requests == 1
+
+
+async def test_replay_latency(url, tmp_path):
+    await _get_json(config.Cfg(http_cassette="record", http_cassette_path=tmp_path), url)
+
+    start = time.monotonic()
+    await _get_json(
+        config.Cfg(http_cassette="replay", http_cassette_path=tmp_path, http_replay_latency=timedelta(seconds=0.2)),
+        url,
+    )
+
+    assert time.monotonic() - start >= 0.2
+
+
+async def test_replay_missing(source, url, tmp_path):
+    with pytest.raises(errors.AdapterError, match="no recorded response"):
+        await _get_json(config.Cfg(http_cassette="replay", http_cassette_path=tmp_path), url)
+
+    assert source.requests == 0
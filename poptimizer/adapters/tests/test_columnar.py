@@ -0,0 +1,148 @@
+from datetime import date, timedelta
+
+import pytest
+
+from poptimizer import consts
+from poptimizer.adapters import columnar
+from poptimizer.domain import domain, settings
+from poptimizer.domain.div import div
+from poptimizer.domain.moex import quotes
+
+
+def _quotes_rows() -> list[quotes.Row]:
+    return [
+        quotes.Row(day=date(2025, 1, 27), open=1.0, close=2.0, high=3.0, low=0.5, turnover=0.0),
+        quotes.Row(day=date(2025, 1, 28), open=2.0, close=3.0, high=4.0, low=1.5, turnover=10.0),
+        quotes.Row(day=date(2025, 1, 29), open=3.0, close=4.0, high=5.0, low=2.5, turnover=20.0),
+    ]
+
+
+def _pack(table: columnar.Table, rows) -> list[columnar.Chunk]:
+    return [table.chunk(table.columns(rows))]
+
+
+def test_table_for_non_columnar_entity():
+    assert columnar.table(settings.Settings) is None
+
+
+def test_pack_unpack_roundtrip():
+    table = columnar.table(quotes.Quotes)
+    assert table is not None
+
+    rows = _quotes_rows()
+    chunks = _pack(table, rows)
+
+    assert set(chunks[0]) == {"day", "open", "close", "high", "low", "turnover"}
+
+    unpacked, columns = table.unpack([{name: bytes(values) for name, values in chunk.items()} for chunk in chunks])
+
+    assert unpacked == rows
+    assert table.size(columns) == len(rows)
+
+
+def test_unpack_chunks():
+    table = columnar.table(quotes.Quotes)
+    assert table is not None
+
+    rows = _quotes_rows()
+    columns = table.columns(rows)
+    chunks = [table.chunk(table.columns(rows[:1])), table.chunk(columns, 1)]
+
+    unpacked, _ = table.unpack(chunks)
+
+    assert unpacked == rows
+
+
+def test_unpack_empty():
+    table = columnar.table(div.Dividends)
+    assert table is not None
+
+    rows, columns = table.unpack([])
+
+    assert rows == []
+    assert table.size(columns) == 0
+
+
+def test_unpack_not_sorted():
+    table = columnar.table(quotes.Quotes)
+    assert table is not None
+
+    chunks = _pack(table, list(reversed(_quotes_rows())))
+
+    with pytest.raises(ValueError, match="df not sorted by day"):
+        table.unpack(chunks)
+
+
+def test_unpack_before_start_day():
+    table = columnar.table(div.Dividends)
+    assert table is not None
+
+    chunks = _pack(table, [div.Row(day=consts.START_DAY - timedelta(days=1), dividend=1)])
+
+    with pytest.raises(ValueError, match="day before start day"):
+        table.unpack(chunks)
+
+
+@pytest.mark.parametrize(
+    ("column", "value", "msg"),
+    [
+        ("close", 0.0, "close should be greater than 0"),
+        ("turnover", -1.0, "turnover should be greater than or equal to 0"),
+    ],
+)
+def test_unpack_invalid_value(column, value, msg):
+    table = columnar.table(quotes.Quotes)
+    assert table is not None
+
+    rows = _quotes_rows()
+    rows[0] = rows[0].model_copy(update={column: value})
+
+    with pytest.raises(ValueError, match=msg):
+        table.unpack(_pack(table, rows))
+
+
+def test_unpack_missing_column():
+    table = columnar.table(quotes.Quotes)
+    assert table is not None
+
+    chunks = _pack(table, _quotes_rows())
+    chunks[0].pop("low")
+
+    with pytest.raises(ValueError, match="column 'low' is missing"):
+        table.unpack(chunks)
+
+
+def _snapshot(table: columnar.Table, rows: list[quotes.Row]) -> columnar.Snapshot:
+    columns = table.columns(rows)
+
+    return columnar.Snapshot(
+        ver=domain.Version(1),
+        rows=len(rows),
+        chunks=1,
+        digest=table.digest(columns, len(rows)),
+    )
+
+
+def test_is_appended():
+    table = columnar.table(quotes.Quotes)
+    assert table is not None
+
+    rows = _quotes_rows()
+    snapshot = _snapshot(table, rows[:2])
+
+    assert table.is_appended(table.columns(rows), snapshot)
+    assert table.is_appended(table.columns(rows[:2]), snapshot)
+
+
+def test_is_not_appended():
+    table = columnar.table(quotes.Quotes)
+    assert table is not None
+
+    rows = _quotes_rows()
+    snapshot = _snapshot(table, rows[:2])
+
+    assert not table.is_appended(table.columns(rows[:1]), snapshot)
+
+    rows[1] = rows[1].model_copy(update={"close": 10.0})
+
+    assert not table.is_appended(table.columns(rows), snapshot)
@@ -0,0 +1,123 @@
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from poptimizer import errors
+from poptimizer.adapters import http_cache
+
+
+class _Source:
+    def __init__(self) -> None:
+        self.body = b"v1"
+        self.etag = '"1"'
+        self.cache_control = ""
+        self.status = 200
+        self.requests: list[str] = []
+
+    async def __call__(self, request: web.Request) -> web.Response:
+        self.requests.append(request.headers.get(aiohttp.hdrs.IF_NONE_MATCH, ""))
+
+        if self.status != 200:
+            return web.Response(status=self.status)
+
+        headers = {aiohttp.hdrs.ETAG: self.etag, aiohttp.hdrs.CACHE_CONTROL: self.cache_control}
+
+        if request.headers.get(aiohttp.hdrs.IF_NONE_MATCH) == self.etag:
+            return web.Response(status=304, headers=headers)
+
+        return web.Response(body=self.body, headers=headers)
+
+
+@pytest.fixture
+def source() -> _Source:
+    return _Source()
+
+
+@pytest.fixture
+async def url(source) -> AsyncIterator[str]:
+    app = web.Application()
+    app.router.add_get("/data", source)
+
+    async with TestServer(app) as server:
+        yield str(server.make_url("/data"))
+
+
+@pytest.fixture
+async def cache(tmp_path) -> AsyncIterator[http_cache.Cache]:
+    async with aiohttp.ClientSession() as client:
+        yield http_cache.Cache(client, tmp_path)
+
+
+async def test_revalidates_with_etag(cache, source, url):
+    first = await cache.get(url)
+    second = await cache.get(url)
+
+    assert first.body == second.body == b"v1"
+    assert not first.unchanged
+    assert second.unchanged
+    assert first.digest == second.digest
+    assert source.requests == ["", '"1"']
+
+
+async def test_changed_body(cache, source, url):
+    first = await cache.get(url)
+
+    source.body = b"v2"
+    source.etag = '"2"'
+    second = await cache.get(url)
+
+    assert second.body == b"v2"
+    assert not second.unchanged
+    assert second.digest != first.digest
+
+
+async def test_fresh_without_request(cache, source, url):
+    await cache.get(url, timedelta(hours=1))
+    cached = await cache.get(url, timedelta(hours=1))
+
+    assert cached.unchanged
+    assert cached.body == b"v1"
+    assert source.requests == [""]
+
+
+async def test_max_age(cache, source, url):
+    source.cache_control = "public, max-age=3600"
+
+    await cache.get(url)
+    await cache.get(url)
+
+    assert source.requests == [""]
+
+
+async def test_no_store(cache, source, url):
+    source.cache_control = "no-store"
+
+    await cache.get(url)
+    second = await cache.get(url)
+
+    assert not second.unchanged
+    assert source.requests == ["", ""]
+
+
+async def test_corrupted_body_downloads_again(cache, source, url, tmp_path):
+    await cache.get(url)
+
+    for path in tmp_path.glob("*.body"):
+        path.write_bytes(b"broken")
+
+    second = await cache.get(url)
+
+    assert second.body == b"v1"
+    assert not second.unchanged
+    assert source.requests == ["", ""]
+
+
+async def test_bad_status(cache, source, url):
+    source.status = 500
+
+    with pytest.raises(errors.AdapterError, match="bad"):
+        await cache.get(url)
@@ -0,0 +1,105 @@
+import pytest
+
+from poptimizer.adapters import adapter, metrics
+
+_COLLECTION = adapter.Component("Entity")
+
+
+def test_histogram_quantile():
+    histogram = metrics.Histogram((1, 2, 3))
+
+    for value in (0.5, 1.5, 1.5, 2.5, 10):
+        histogram.observe(value)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot.counts == (1, 2, 1, 1)
+    assert snapshot.count == 5
+    assert snapshot.total == 16
+    assert snapshot.quantile(0.5) == 2
+    assert snapshot.quantile(1) == float("inf")
+
+
+def test_measure_counts_errors():
+    repo_metrics = metrics.RepoMetrics()
+
+    with repo_metrics.measure(_COLLECTION, "get") as stats:
+        stats.add_doc(10)
+        stats.add_doc(20)
+
+    with pytest.raises(ValueError, match="boom"), repo_metrics.measure(_COLLECTION, "get"):
+        raise ValueError("boom")
+
+    stats = repo_metrics.snapshot()[_COLLECTION, "get"]
+
+    assert stats.count == 2
+    assert stats.errors == 1
+    assert stats.docs == 2
+    assert stats.size == 30
+    assert stats.latency.count == 2
+
+
+def test_diff():
+    repo_metrics = metrics.RepoMetrics()
+
+    with repo_metrics.measure(_COLLECTION, "get") as stats:
+        stats.add_doc(10)
+
+    old = repo_metrics.snapshot()
+
+    with repo_metrics.measure(_COLLECTION, "get") as stats:
+        stats.add_doc(5)
+
+    with repo_metrics.measure(_COLLECTION, "save") as stats:
+        stats.add_doc(1)
+
+    cycle = metrics.diff(repo_metrics.snapshot(), old)
+
+    assert cycle[_COLLECTION, "get"].count == 1
+    assert cycle[_COLLECTION, "get"].size == 5
+    assert cycle[_COLLECTION, "get"].latency.count == 1
+    assert cycle[_COLLECTION, "save"].count == 1
+
+
+def test_exposition():
+    histogram = metrics.Histogram((0.5, 1))
+    histogram.observe(0.25)
+    histogram.observe(2)
+
+    exposition = metrics.Exposition()
+    exposition.counter("requests_total", "Requests.", [({"handler": 'a"b'}, 3)])
+    exposition.histogram("latency_seconds", "Latency.", [({"handler": "a"}, histogram.snapshot())])
+
+    assert exposition.text() == (
+        "# HELP requests_total Requests.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{handler="a\\"b"} 3\n'
+        "# HELP latency_seconds Latency.\n"
+        "# TYPE latency_seconds histogram\n"
+        'latency_seconds_bucket{handler="a",le="0.5"} 1\n'
+        'latency_seconds_bucket{handler="a",le="1"} 1\n'
+        'latency_seconds_bucket{handler="a",le="+Inf"} 2\n'
+        'latency_seconds_sum{handler="a"} 2.25\n'
+        'latency_seconds_count{handler="a"} 2\n'
+    )
+
+
+def test_handler_recorder():
+    recorder = metrics.HandlerRecorder()
+
+    with recorder.running():
+        assert recorder.snapshot().in_flight == 1
+
+        recorder.started(0.1)
+        recorder.attempt(1, failed=True)
+        recorder.retry()
+        recorder.attempt(2, failed=False)
+
+    stats = recorder.snapshot()
+
+    assert stats.invocations == 2
+    assert stats.retries == 1
+    assert stats.failures == 1
+    assert stats.in_flight == 0
+    assert stats.duration.total == 3
+    assert stats.delay.count == 1
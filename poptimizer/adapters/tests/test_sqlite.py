@@ -0,0 +1,150 @@
+from datetime import date
+
+import pytest
+
+from poptimizer import consts, errors
+from poptimizer.adapters import sqlite
+from poptimizer.domain import domain, settings
+from poptimizer.domain.evolve import evolve
+from poptimizer.domain.moex import quotes
+
+
+async def test_get_creates_new(repo):
+    entity = await repo.get(settings.Settings)
+
+    assert entity.uid == "Settings"
+    assert entity.ver == 0
+    assert entity.day == consts.START_DAY
+
+
+async def test_save_increments_version(repo):
+    entity = await repo.get(settings.Settings)
+    entity.update_theme(settings.Theme.DARK)
+    await repo.save(entity)
+
+    loaded = await repo.get(settings.Settings)
+
+    assert loaded.ver == 1
+    assert loaded.theme is settings.Theme.DARK
+
+
+async def test_save_wrong_version(repo):
+    entity = await repo.get(settings.Settings)
+    await repo.save(entity)
+
+    with pytest.raises(errors.VersionConflictError, match="wrong version"):
+        await repo.save(entity)
+
+
+async def test_save_many_reports_conflicts(repo):
+    first, second = await repo.get_many(settings.Settings, [domain.UID("a"), domain.UID("b")])
+    await repo.save(second)
+
+    with pytest.raises(errors.AdapterError, match=r"Settings\.b"):
+        await repo.save_many([first, second])
+
+    assert (await repo.get(settings.Settings, domain.UID("a"))).ver == 1
+
+
+async def test_get_many_keeps_order(repo):
+    uids = [domain.UID("b"), domain.UID("a"), domain.UID("b")]
+
+    entities = await repo.get_many(settings.Settings, uids)
+
+    assert [entity.uid for entity in entities] == uids
+
+
+async def test_columnar_roundtrip(repo):
+    table = await repo.get(quotes.Quotes, domain.UID("AKRN"))
+    table.update(
+        date(2025, 1, 28),
+        [
+            quotes.Row(day=date(2025, 1, 27), open=1, close=2, high=3, low=0.5, turnover=0),
+            quotes.Row(day=date(2025, 1, 28), open=2, close=3, high=4, low=1.5, turnover=10),
+        ],
+    )
+    await repo.save(table)
+
+    loaded = await repo.get(quotes.Quotes, domain.UID("AKRN"))
+
+    assert loaded.df == table.df
+    assert loaded.day == date(2025, 1, 28)
+
+
+async def test_delete_and_drop(repo):
+    entity = await repo.get(settings.Settings)
+    await repo.delete(entity)
+
+    with pytest.raises(errors.AdapterError, match="can't delete"):
+        await repo.delete(entity)
+
+    await repo.get(settings.Settings)
+    await repo.drop(settings.Settings)
+
+    assert [entity async for entity in repo.get_all(settings.Settings)] == []
+
+
+async def _model(repo: sqlite.Repo, uid: str, day: date, llh: float, alfa: float) -> None:
+    model = await repo.get(evolve.Model, domain.UID(uid))
+    model.day = day
+    model.llh = [llh]
+    model.alfa = [alfa]
+    await repo.save(model)
+
+
+async def test_next_model_unevaluated_first(repo):
+    await _model(repo, "a", date(2025, 1, 27), 1, 1)
+    await repo.get(evolve.Model, domain.UID("b"))
+
+    model, good = await repo.next_model(domain.UID("a"))
+
+    assert model.uid == "b"
+    assert good
+    assert await repo.count_models() == 2
+
+
+async def test_next_model_oldest_and_farthest(repo):
+    await _model(repo, "base", date(2025, 1, 28), 1, 0.5)
+    await _model(repo, "single", date(2025, 1, 27), 1, 0.5)
+
+    model, good = await repo.next_model(domain.UID("base"))
+
+    assert model.uid == "single"
+    assert not good
+
+    await _model(repo, "single", date(2025, 1, 28), 1, 0.4)
+    await _model(repo, "best", date(2025, 1, 28), 2, 0.6)
+
+    model, good = await repo.next_model(domain.UID("base"))
+
+    assert model.uid == "best"
+    assert good
+
+
+async def test_io_stats(repo):
+    entity = await repo.get(settings.Settings)
+    await repo.save(entity)
+
+    stats = repo.io_stats()
+
+    assert stats["Settings", "get"].count == 1
+    assert stats["Settings", "get"].docs == 1
+    assert stats["Settings", "save"].count == 1
+    assert stats["Settings", "save"].size > 0
+
+
+async def test_find_many_skips_missing(repo):
+    await repo.save(await repo.get(settings.Settings, domain.UID("a")))
+
+    found = await repo.find_many(settings.Settings, [domain.UID("b"), domain.UID("a")])
+
+    assert [entity.uid for entity in found] == ["a"]
+    assert [entity.uid async for entity in repo.get_all(settings.Settings)] == ["a"]
+
+
+async def test_delete_many_tolerates_missing(repo):
+    await repo.get_many(settings.Settings, [domain.UID("a"), domain.UID("b")])
+
+    await repo.delete_many(settings.Settings, [domain.UID("a"), domain.UID("c")])
+
+    assert [entity.uid async for entity in repo.get_all(settings.Settings)] == ["b"]
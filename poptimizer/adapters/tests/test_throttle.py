@@ -0,0 +1,98 @@
+from collections.abc import AsyncIterator
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from poptimizer.adapters import throttle
+
+
+class _Source:
+    def __init__(self) -> None:
+        self.statuses: list[int] = []
+        self.requests = 0
+
+    async def __call__(self, request: web.Request) -> web.Response:  # noqa: ARG002
+        self.requests += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+
+        return web.Response(status=status, headers={aiohttp.hdrs.RETRY_AFTER: "0"})
+
+
+@pytest.fixture
+def source() -> _Source:
+    return _Source()
+
+
+@pytest.fixture
+async def server(source) -> AsyncIterator[TestServer]:
+    app = web.Application()
+    app.router.add_route("*", "/data", source)
+
+    async with TestServer(app) as test_server:
+        yield test_server
+
+
+@pytest.fixture
+def limiter() -> throttle.Limiter:
+    return throttle.Limiter(max_concurrency=4, retries=2)
+
+
+@pytest.fixture
+async def client(limiter) -> AsyncIterator[aiohttp.ClientSession]:
+    async with aiohttp.ClientSession(middlewares=(limiter,)) as session:
+        yield session
+
+
+async def test_retries_throttled(client, limiter, server, source):
+    source.statuses = [429, 503]
+
+    async with client.get(server.make_url("/data")) as resp:
+        assert resp.status == 200
+
+    (stats,) = limiter.stats().values()
+
+    assert source.requests == 3
+    assert stats.requests == 3
+    assert stats.throttled == 2
+    assert stats.retries == 2
+    assert stats.in_flight == 0
+
+
+async def test_gives_up_after_retries(client, server, source):
+    source.statuses = [503, 503, 503]
+
+    async with client.get(server.make_url("/data")) as resp:
+        assert resp.status == 503
+
+    assert source.requests == 3
+
+
+async def test_no_retry_for_post(client, server, source):
+    source.statuses = [503]
+
+    async with client.post(server.make_url("/data")) as resp:
+        assert resp.status == 503
+
+    assert source.requests == 1
+
+
+async def test_limit_grows_and_shrinks(client, limiter, server, source):
+    for _ in range(10):
+        async with client.get(server.make_url("/data")):
+            pass
+
+    (grown,) = limiter.stats().values()
+
+    source.statuses = [503, 503, 503]
+
+    async with client.get(server.make_url("/data")):
+        pass
+
+    (shrunk,) = limiter.stats().values()
+
+    assert grown.limit > 1
+    assert grown.limit <= limiter.max_concurrency
+    assert shrunk.limit < grown.limit
+    assert shrunk.rate < grown.rate
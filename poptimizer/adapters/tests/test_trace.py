@@ -0,0 +1,57 @@
+from poptimizer.adapters import trace
+
+
+def _span(span_id: str, parent_id: str, start: float, end: float) -> trace.Span:
+    return trace.Span(
+        span_id=span_id,
+        parent_id=parent_id,
+        kind=trace.SpanKind.HANDLER,
+        name=span_id,
+        start=start,
+        end=end,
+    )
+
+
+def test_critical_path_follows_last_finished_chain():
+    saved = trace.Trace(
+        trace_id="t",
+        root="NewDataPublished",
+        spans=[
+            _span("root", "", 0, 1),
+            _span("fast", "root", 1, 2),
+            _span("slow", "root", 1, 5),
+            _span("after_fast", "fast", 2, 4),
+            _span("after_slow", "slow", 5, 6),
+        ],
+    )
+
+    assert [span.span_id for span in saved.critical_path()] == ["root", "slow", "after_slow"]
+
+
+def test_trace_saved_when_work_finished(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = trace.Tracer(path)
+
+    root = tracer.start("NewDataPublished")
+    tracer.enter(root.trace_id)
+    span = tracer.open(root, trace.SpanKind.HANDLER, "Handler", "NewDataPublished")
+    span.attempt()
+    tracer.close(span.child(trace.SpanKind.COMMIT, "UOW"))
+
+    tracer.enter(root.trace_id)
+    tracer.close(span)
+    tracer.leave(root.trace_id)
+
+    assert not path.exists()
+
+    tracer.leave(root.trace_id)
+
+    (saved,) = trace.read(path)
+
+    assert saved.trace_id == root.trace_id
+    assert saved.root == "NewDataPublished"
+    assert [(saved_span.kind, saved_span.parent_id) for saved_span in saved.spans] == [
+        (trace.SpanKind.COMMIT, span.ctx.span_id),
+        (trace.SpanKind.HANDLER, ""),
+    ]
+    assert saved.spans[1].attempts == 1
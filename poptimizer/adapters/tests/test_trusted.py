@@ -0,0 +1,96 @@
+from datetime import date
+from typing import Any
+
+import bson
+
+from poptimizer.adapters import trusted
+from poptimizer.domain import domain
+from poptimizer.domain.dl import features
+from poptimizer.domain.evolve import evolve
+from poptimizer.domain.portfolio import forecasts
+
+_REV = domain.Revision(uid=domain.UID("AKRN"), ver=domain.Version(3))
+_DAY = date(2025, 1, 27)
+
+
+def _roundtrip(entity: domain.Entity) -> dict[str, Any]:
+    return bson.decode(bson.encode(entity.model_dump()))
+
+
+def test_construct_features():
+    feat = features.Features(
+        rev=_REV,
+        day=_DAY,
+        numerical=[{features.NumFeat.OPEN: 1.0, features.NumFeat.CLOSE: 2.0}],
+        embedding={features.EmbFeat.TICKER: features.EmbeddingFeatDesc(value=1, size=3)},
+        embedding_seq={features.EmbSeqFeat.WEEK: features.EmbeddingSeqFeatDesc(sequence=[4], size=53)},
+    )
+
+    constructed = trusted.construct(features.Features, _roundtrip(feat))
+
+    assert constructed == feat
+    assert constructed.day == _DAY
+    assert type(constructed.day) is date
+    assert all(type(key) is features.NumFeat for key in constructed.numerical[0])
+    assert type(next(iter(constructed.embedding))) is features.EmbFeat
+    assert isinstance(constructed.embedding_seq[features.EmbSeqFeat.WEEK], features.EmbeddingSeqFeatDesc)
+
+
+def test_construct_model():
+    model = evolve.Model(
+        rev=_REV,
+        day=_DAY,
+        tickers=(domain.Ticker("AKRN"), domain.Ticker("GAZP")),
+        alfa=[0.1, 0.2],
+        llh=[1.0, 2.0],
+    )
+
+    constructed = trusted.construct(evolve.Model, _roundtrip(model))
+
+    assert constructed == model
+    assert constructed.tickers == model.tickers
+    assert constructed.llh_mean == model.llh_mean
+    assert isinstance(constructed.alfa_diff, evolve.Stats)
+
+
+def test_construct_sets_and_nested_lists():
+    forecast = forecasts.Forecast(
+        rev=_REV,
+        day=_DAY,
+        models={domain.UID("a"), domain.UID("b")},
+        positions=[
+            forecasts.Position(
+                ticker=domain.Ticker("AKRN"),
+                weight=0.5,
+                mean=0.1,
+                std=0.2,
+                beta=1,
+                grad=0.01,
+                grad_lower=0,
+                grad_upper=0.02,
+                accounts=[domain.AccName("acc")],
+            ),
+        ],
+    )
+
+    constructed = trusted.construct(forecasts.Forecast, _roundtrip(forecast))
+
+    assert constructed == forecast
+    assert constructed.models == {"a", "b"}
+    assert isinstance(constructed.positions[0], forecasts.Position)
+
+
+def test_construct_missing_fields_use_defaults():
+    constructed = trusted.construct(evolve.Model, {"rev": _REV.model_dump(), "day": _DAY})
+
+    assert constructed.tickers == ()
+    assert constructed.alfa == []
+    assert constructed.rev == _REV
+
+
+def test_checksum_ignores_top_level_order():
+    assert trusted.checksum({"a": 1, "b": [1.0, 2.0]}) == trusted.checksum({"b": [1.0, 2.0], "a": 1})
+
+
+def test_checksum_detects_changes():
+    assert trusted.checksum({"a": 1, "b": [1.0, 2.0]}) != trusted.checksum({"a": 1, "b": [1.0, 2.5]})
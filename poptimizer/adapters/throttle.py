@@ -0,0 +1,211 @@
+import asyncio
+import random
+import time
+from collections import defaultdict, deque
+from http import HTTPStatus
+from typing import Final
+
+import aiohttp
+
+from poptimizer.adapters import metrics
+
+_MAX_CONCURRENCY: Final = 10
+_MAX_RATE: Final = 50.0
+_MIN_RATE: Final = 1.0
+_RATE_STEP: Final = 0.5
+_DECREASE: Final = 0.5
+# Рост задержки относительно минимальной, после которого сервер считается перегруженным
+_LATENCY_TOLERANCE: Final = 4.0
+_LATENCY_DECREASE: Final = 0.9
+# Минимальная задержка постепенно забывается, чтобы подстраиваться под изменение сети
+_MIN_LATENCY_DECAY: Final = 1.01
+
+_RETRIES: Final = 4
+_FIRST_RETRY: Final = 0.5
+_MAX_RETRY: Final = 30.0
+_IDEMPOTENT: Final = frozenset({aiohttp.hdrs.METH_GET, aiohttp.hdrs.METH_HEAD})
+
+
+class _Host:
+    """Ограничение запросов к хосту: корзина токенов для частоты и окно параллельных запросов.
+
+    Окно и частота растут после успешных ответов и уменьшаются в разы после 429, 5xx, сетевых ошибок
+    и резкого роста задержки.
+    """
+
+    def __init__(self, max_concurrency: int) -> None:
+        self._max_concurrency = max_concurrency
+        self._limit = 1.0
+        # До первой перегрузки окно растет экспоненциально
+        self._slow_start = True
+        self._rate = _MAX_RATE
+        self._tokens = 1.0
+        self._refilled = time.monotonic()
+        self._blocked_until = 0.0
+        self._min_latency = float("inf")
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._requests = 0
+        self._throttled = 0
+        self._retries = 0
+        self._latency = metrics.Histogram()
+
+    async def acquire(self) -> None:
+        while True:
+            if self._in_flight >= int(self._limit):
+                await self._wait_slot()
+
+                continue
+
+            if (delay := self._take_token()) > 0:
+                await asyncio.sleep(delay)
+
+                continue
+
+            self._in_flight += 1
+            self._requests += 1
+
+            return
+
+    def release(self, latency: float, *, throttled: bool, retry_after: float = 0) -> None:
+        self._in_flight -= 1
+        self._latency.observe(latency)
+
+        if throttled:
+            self._throttled += 1
+            self._slow_start = False
+            self._limit = max(1, self._limit * _DECREASE)
+            self._rate = max(_MIN_RATE, self._rate * _DECREASE)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+        elif latency > self._min_latency * _LATENCY_TOLERANCE:
+            self._slow_start = False
+            self._limit = max(1, self._limit * _LATENCY_DECREASE)
+        else:
+            step = 1 if self._slow_start else 1 / self._limit
+            self._limit = min(self._max_concurrency, self._limit + step)
+            self._rate = min(_MAX_RATE, self._rate + _RATE_STEP)
+
+        self._min_latency = min(self._min_latency * _MIN_LATENCY_DECAY, latency)
+        self._wake()
+
+    def abort(self) -> None:
+        self._in_flight -= 1
+        self._wake()
+
+    def retry(self) -> None:
+        self._retries += 1
+
+    def stats(self) -> metrics.HostStats:
+        return metrics.HostStats(
+            limit=self._limit,
+            rate=self._rate,
+            in_flight=self._in_flight,
+            requests=self._requests,
+            throttled=self._throttled,
+            retries=self._retries,
+            latency=self._latency.snapshot(),
+        )
+
+    def _take_token(self) -> float:
+        now = time.monotonic()
+
+        if now < self._blocked_until:
+            return self._blocked_until - now
+
+        self._tokens = min(max(1, self._rate / 2), self._tokens + (now - self._refilled) * self._rate)
+        self._refilled = now
+
+        if self._tokens < 1:
+            return (1 - self._tokens) / self._rate
+
+        self._tokens -= 1
+
+        return 0
+
+    async def _wait_slot(self) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except BaseException:
+            # Разбуженный, но отмененный запрос передает освободившееся место следующему
+            if waiter.done() and not waiter.cancelled():
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+
+            raise
+
+    def _wake(self) -> None:
+        free = int(self._limit) - self._in_flight
+
+        while free > 0 and self._waiters:
+            self._waiters.popleft().set_result(None)
+            free -= 1
+
+
+class Limiter:
+    """Промежуточный слой клиентской сессии aiohttp с подстройкой частоты и параллельности запросов к хостам.
+
+    Идемпотентные запросы, получившие 429, 5xx или сетевую ошибку, повторяются с экспоненциальной задержкой
+    со случайным разбросом, поэтому временные ограничения сервера не доходят до обработчиков.
+    """
+
+    def __init__(self, max_concurrency: int = _MAX_CONCURRENCY, retries: int = _RETRIES) -> None:
+        self._max_concurrency = max_concurrency
+        self._retries = retries
+        self._hosts: defaultdict[str, _Host] = defaultdict(lambda: _Host(max_concurrency))
+
+    @property
+    def max_concurrency(self) -> int:
+        return self._max_concurrency
+
+    async def __call__(self, req: aiohttp.ClientRequest, handler: aiohttp.ClientHandlerType) -> aiohttp.ClientResponse:
+        host = self._hosts[req.url.host or ""]
+        retries = self._retries if req.method in _IDEMPOTENT else 0
+        attempt = 0
+
+        while True:
+            await host.acquire()
+            start = time.monotonic()
+
+            try:
+                resp = await handler(req)
+            except TimeoutError, aiohttp.ClientConnectionError:
+                host.release(time.monotonic() - start, throttled=True)
+
+                if attempt >= retries:
+                    raise
+            except BaseException:
+                host.abort()
+
+                raise
+            else:
+                throttled = _is_throttled(resp.status)
+                host.release(time.monotonic() - start, throttled=throttled, retry_after=_retry_after(resp))
+
+                if not throttled or attempt >= retries:
+                    return resp
+
+                resp.release()
+
+            host.retry()
+            await asyncio.sleep(random.uniform(0, min(_MAX_RETRY, _FIRST_RETRY * 2**attempt)))  # noqa: S311
+            attempt += 1
+
+    def stats(self) -> metrics.HTTPSnapshot:
+        return {name: host.stats() for name, host in self._hosts.items()}
+
+
+def _is_throttled(status: int) -> bool:
+    return status == HTTPStatus.TOO_MANY_REQUESTS or status >= HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def _retry_after(resp: aiohttp.ClientResponse) -> float:
+    value = resp.headers.get(aiohttp.hdrs.RETRY_AFTER, "")
+
+    if not value.isdigit():
+        return 0
+
+    return min(_MAX_RETRY, float(value))
@@ -0,0 +1,203 @@
+import logging
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from enum import StrEnum
+from pathlib import Path
+from typing import Final, NamedTuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+# Файл с трассировками переименовывается в резервный после достижения размера
+_MAX_FILE_SIZE: Final = 64 * 2**20
+
+
+class SpanKind(StrEnum):
+    HANDLER = "handler"
+    COMMIT = "commit"
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+
+    def __str__(self) -> str:
+        return f"{self.trace_id}:{self.span_id}"
+
+
+class Span(BaseModel):
+    span_id: str
+    parent_id: str = ""
+    kind: SpanKind
+    name: str
+    event: str = ""
+    start: float
+    end: float
+    queued: float = 0
+    attempts: int = 0
+    failed: bool = False
+    # Спэны других трассировок, события которых обработаны вместе с основным
+    links: list[str] = Field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class Trace(BaseModel):
+    trace_id: str
+    root: str
+    # Спэн из предыдущей трассировки, опубликовавший корневое событие
+    link: str = ""
+    spans: list[Span]
+
+    @property
+    def start(self) -> float:
+        return min(span.start for span in self.spans)
+
+    @property
+    def end(self) -> float:
+        return max(span.end for span in self.spans)
+
+    def critical_path(self) -> list[Span]:
+        """Цепочка обработчиков, определяющая длительность трассировки.
+
+        Начинается с последнего завершившегося обработчика и идет по родительским спэнам к корню.
+        """
+        handlers = {span.span_id: span for span in self.spans if span.kind is SpanKind.HANDLER}
+        if not handlers:
+            return []
+
+        span: Span | None = max(handlers.values(), key=lambda span: span.end)
+        path: list[Span] = []
+
+        while span is not None:
+            path.append(span)
+            span = handlers.get(span.parent_id)
+
+        return path[::-1]
+
+
+class OpenSpan:
+    def __init__(self, trace_id: str, span: Span) -> None:
+        self.ctx = SpanContext(trace_id, span.span_id)
+        self._span = span
+        self._queued: float | None = None
+        self._attempts = 0
+
+    @property
+    def attempts(self) -> int:
+        return self._attempts
+
+    def child(self, kind: SpanKind, name: str) -> OpenSpan:
+        return OpenSpan(self.ctx.trace_id, _new_span(self.ctx.span_id, kind, name))
+
+    def attempt(self) -> None:
+        if self._queued is None:
+            self._queued = time.time() - self._span.start
+
+        self._attempts += 1
+
+    def finish(self, *, failed: bool) -> Span:
+        return self._span.model_copy(
+            update={
+                "end": time.time(),
+                "queued": self._queued or 0,
+                "attempts": self._attempts,
+                "failed": failed,
+            }
+        )
+
+
+class _Pending:
+    def __init__(self, root: str, link: str) -> None:
+        self.root = root
+        self.link = link
+        self.spans: list[Span] = []
+        self.active = 0
+
+
+class Tracer:
+    """Собирает спэны трассировок и сохраняет трассировку, когда в ней не остается незавершенной работы."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._lgr = logging.getLogger()
+        self._path = path
+        self._pending: dict[str, _Pending] = {}
+
+    def start(self, root: str, link: SpanContext | None = None) -> SpanContext:
+        trace_id = _new_id()
+        self._pending[trace_id] = _Pending(root, "" if link is None else str(link))
+
+        return SpanContext(trace_id, "")
+
+    def open(
+        self,
+        parent: SpanContext,
+        kind: SpanKind,
+        name: str,
+        event: str = "",
+        links: Iterable[SpanContext] = (),
+    ) -> OpenSpan:
+        return OpenSpan(parent.trace_id, _new_span(parent.span_id, kind, name, event, [str(link) for link in links]))
+
+    def close(self, span: OpenSpan, *, failed: bool = False) -> None:
+        if (pending := self._pending.get(span.ctx.trace_id)) is not None:
+            pending.spans.append(span.finish(failed=failed))
+
+    def enter(self, trace_id: str) -> None:
+        if (pending := self._pending.get(trace_id)) is not None:
+            pending.active += 1
+
+    def leave(self, trace_id: str) -> None:
+        if (pending := self._pending.get(trace_id)) is None:
+            return
+
+        pending.active -= 1
+
+        if not pending.active:
+            del self._pending[trace_id]
+            self._save(Trace(trace_id=trace_id, root=pending.root, link=pending.link, spans=pending.spans))
+
+    def _save(self, trace: Trace) -> None:
+        if self._path is None or not trace.spans:
+            return
+
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+
+            if self._path.exists() and self._path.stat().st_size > _MAX_FILE_SIZE:
+                self._path.replace(self._path.with_suffix(f"{self._path.suffix}.1"))
+
+            with self._path.open("a", encoding="utf-8") as file:
+                file.write(trace.model_dump_json() + "\n")
+        except OSError as err:
+            self._lgr.warning("Can't save trace %s - %s", trace.trace_id, err)
+
+
+def read(path: Path) -> Iterator[Trace]:
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            try:
+                yield Trace.model_validate_json(line)
+            except ValidationError:
+                continue
+
+
+def _new_span(parent_id: str, kind: SpanKind, name: str, event: str = "", links: list[str] | None = None) -> Span:
+    now = time.time()
+
+    return Span(
+        span_id=_new_id(),
+        parent_id=parent_id,
+        kind=kind,
+        name=name,
+        event=event,
+        start=now,
+        end=now,
+        links=links or [],
+    )
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
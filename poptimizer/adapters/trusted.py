@@ -0,0 +1,164 @@
+import functools
+import types
+import zlib
+from collections.abc import Callable, Mapping
+from datetime import date, datetime
+from enum import Enum
+from typing import Annotated, Any, Final, TypeAliasType, Union, get_args, get_origin
+
+import bson
+from pydantic import BaseModel, ValidationError
+
+from poptimizer import errors
+from poptimizer.adapters import adapter
+from poptimizer.domain import domain
+
+CHK: Final = "chk"
+_REV: Final = "rev"
+
+type _Converter = Callable[[Any], Any] | None
+
+
+def checksum(doc: Mapping[str, Any]) -> int:
+    return zlib.crc32(bson.encode(dict(sorted(doc.items()))))
+
+
+def dump(entity: domain.Entity, exclude: set[str] | None = None) -> dict[str, Any]:
+    doc = entity.model_dump(exclude=exclude)
+
+    try:
+        entity.__class__.model_validate(doc)
+    except ValidationError as err:
+        collection_name = adapter.get_component_name(entity)
+        raise errors.AdapterError(f"can't save invalid entity {collection_name}.{entity.uid} {err}") from err
+
+    doc.pop(_REV)
+    doc[CHK] = checksum(doc)
+
+    return doc
+
+
+def load[E: domain.Entity](
+    t_entity: type[E],
+    doc: dict[str, Any],
+    rev: dict[str, Any],
+    *,
+    full_validation: bool,
+) -> E:
+    chk = doc.pop(CHK, None)
+    is_intact = not full_validation and chk is not None and chk == checksum(doc)
+    doc[_REV] = rev
+
+    if is_intact:
+        return construct(t_entity, doc)
+
+    return t_entity.model_validate(doc)
+
+
+def construct[M: BaseModel](t_model: type[M], data: Mapping[str, Any]) -> M:
+    values: dict[str, Any] = {}
+
+    for name, converter in _fields(t_model):
+        if name not in data:
+            continue
+
+        value = data[name]
+        values[name] = value if converter is None else converter(value)
+
+    return t_model.model_construct(**values)
+
+
+@functools.cache
+def _fields(t_model: type[BaseModel]) -> list[tuple[str, _Converter]]:
+    return [(name, _converter(field.annotation)) for name, field in t_model.model_fields.items()]
+
+
+def _converter(annotation: Any) -> _Converter:  # noqa: PLR0911
+    if isinstance(annotation, TypeAliasType):
+        return _converter(annotation.__value__)
+
+    if (supertype := getattr(annotation, "__supertype__", None)) is not None:
+        return _converter(supertype)
+
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin is None:
+        return _type_converter(annotation) if isinstance(annotation, type) else None
+
+    if origin is Annotated:
+        return _converter(args[0])
+
+    if origin in {Union, types.UnionType}:
+        return _optional_converter(args)
+
+    if origin is list:
+        return _iterable_converter(list, _converter(args[0]), convert_container=False)
+
+    if origin in {set, frozenset} or (origin is tuple and args[-1:] == (Ellipsis,)):
+        return _iterable_converter(origin, _converter(args[0]), convert_container=True)
+
+    if origin is dict:
+        return _dict_converter(_converter(args[0]), _converter(args[1]))
+
+    return None
+
+
+def _type_converter(annotation: type) -> _Converter:
+    if issubclass(annotation, BaseModel):
+        return functools.partial(construct, annotation)
+
+    if issubclass(annotation, Enum):
+        return annotation
+
+    if annotation is date:
+        return _to_date
+
+    return None
+
+
+def _optional_converter(args: tuple[Any, ...]) -> _Converter:
+    match [arg for arg in args if arg is not type(None)]:
+        case [arg]:
+            if (converter := _converter(arg)) is None:
+                return None
+
+            return lambda value: None if value is None else converter(value)
+        case _:
+            return None
+
+
+def _iterable_converter(
+    container: Callable[[Any], Any],
+    item: _Converter,
+    *,
+    convert_container: bool,
+) -> _Converter:
+    match item:
+        case None if not convert_container:
+            return None
+        case None:
+            return container
+        case _:
+            return lambda values: container(item(value) for value in values)
+
+
+def _dict_converter(key: _Converter, value: _Converter) -> _Converter:
+    if key is None and value is None:
+        return None
+
+    key_fn = key or _identity
+    value_fn = value or _identity
+
+    return lambda data: {key_fn(k): value_fn(v) for k, v in data.items()}
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _to_date(value: date) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+
+    return value
@@ -10,7 +10,7 @@ import torch
 import uvloop
 
 from poptimizer import config
-from poptimizer.adapters import http_session, logger, mongo
+from poptimizer.adapters import cassette, http_cache, http_session, lease, logger, storage, throttle, trace
 from poptimizer.cli import safe
 from poptimizer.controllers.bus import bus
 from poptimizer.controllers.server import server
@@ -36,8 +36,10 @@ async def _run(*, check_memory: bool = False) -> int:
     cfg = config.Cfg()
 
     async with contextlib.AsyncExitStack() as stack:
-        http_client = await stack.enter_async_context(http_session.client())
-        mongo_db = await stack.enter_async_context(mongo.db(cfg.mongo_db_uri, cfg.mongo_db_db))
+        http_limiter = throttle.Limiter()
+        http_recorder = await stack.enter_async_context(cassette.cassette(cfg))
+        http_client = await stack.enter_async_context(http_session.client(http_limiter, http_recorder, cfg.iss_url))
+        repo = await stack.enter_async_context(storage.repo(cfg))
 
         lgr = await stack.enter_async_context(
             logger.init(
@@ -47,10 +49,26 @@ async def _run(*, check_memory: bool = False) -> int:
             )
         )
 
-        msg_bus = bus.build(http_client, mongo_db, cancel_fn)
+        training_queue = None
+        if cfg.evolution_workers:
+            training_queue = await stack.enter_async_context(lease.queue(cfg))
+
+        msg_bus = bus.build(
+            http_client,
+            http_cache.Cache(http_client, cfg.http_cache_path),
+            repo,
+            cancel_fn,
+            training_queue=training_queue,
+            tracer=trace.Tracer(cfg.trace_path),
+            http_stats=http_limiter.stats,
+        )
         http_server = server.Server(cfg.server_url, msg_bus)
 
-        return await safe.run(lgr, msg_bus.run(), http_server.run())
+        coroutines = [msg_bus.run(), http_server.run()]
+        if cfg.db_watch_changes:
+            coroutines.append(repo.watch())
+
+        return await safe.run(lgr, *coroutines)
 
     return 1
 
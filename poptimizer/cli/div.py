@@ -3,7 +3,7 @@ import contextlib
 import uvloop
 
 from poptimizer import config
-from poptimizer.adapters import backup, logger, mongo
+from poptimizer.adapters import backup, logger, storage
 from poptimizer.cli import safe
 
 
@@ -13,8 +13,7 @@ async def _run() -> None:
     async with contextlib.AsyncExitStack() as stack:
         lgr = await stack.enter_async_context(logger.init())
 
-        mongo_db = await stack.enter_async_context(mongo.db(cfg.mongo_db_uri, cfg.mongo_db_db))
-        repo = mongo.Repo(mongo_db)
+        repo = await stack.enter_async_context(storage.repo(cfg))
         backup.BackupHandler(repo)
 
         await safe.run(lgr, backup.BackupHandler(repo).restore())
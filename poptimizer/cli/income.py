@@ -5,7 +5,7 @@ import typer
 import uvloop
 
 from poptimizer import config
-from poptimizer.adapters import logger, mongo
+from poptimizer.adapters import logger, storage
 from poptimizer.cli import safe
 from poptimizer.domain.funds import funds
 from poptimizer.reports.income import report
@@ -15,9 +15,8 @@ async def _run(investor: funds.Investor, months: int) -> None:
     cfg = config.Cfg()
 
     async with contextlib.AsyncExitStack() as stack:
-        mongo_db = await stack.enter_async_context(mongo.db(cfg.mongo_db_uri, cfg.mongo_db_db))
+        repo = await stack.enter_async_context(storage.repo(cfg))
         lgr = await stack.enter_async_context(logger.init())
-        repo = mongo.Repo(mongo_db)
 
         await safe.run(lgr, report(repo, investor, months))
 
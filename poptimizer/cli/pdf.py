@@ -6,7 +6,7 @@ import typer
 import uvloop
 
 from poptimizer import config
-from poptimizer.adapters import logger, mongo
+from poptimizer.adapters import logger, storage
 from poptimizer.cli import safe
 from poptimizer.domain.funds import funds
 from poptimizer.reports.pdf.pdf import report
@@ -15,7 +15,7 @@ _AMOUNT_SEP: Final = ":"
 
 
 async def _report(
-    repo: mongo.Repo,
+    repo: storage.Repo,
     day: date,
     dividends: float,
     raw_inflows: list[str],
@@ -40,8 +40,7 @@ async def _run(
     async with contextlib.AsyncExitStack() as stack:
         lgr = await stack.enter_async_context(logger.init())
 
-        mongo_db = await stack.enter_async_context(mongo.db(cfg.mongo_db_uri, cfg.mongo_db_db))
-        repo = mongo.Repo(mongo_db)
+        repo = await stack.enter_async_context(storage.repo(cfg))
 
         await safe.run(lgr, _report(repo, day, dividends, raw_inflows))
 
@@ -5,7 +5,7 @@ import typer
 import uvloop
 
 from poptimizer import config
-from poptimizer.adapters import logger, mongo
+from poptimizer.adapters import logger, storage
 from poptimizer.cli import safe
 from poptimizer.reports.risk import report
 
@@ -14,9 +14,8 @@ async def _run(months: int) -> None:
     cfg = config.Cfg()
 
     async with contextlib.AsyncExitStack() as stack:
-        mongo_db = await stack.enter_async_context(mongo.db(cfg.mongo_db_uri, cfg.mongo_db_db))
+        repo = await stack.enter_async_context(storage.repo(cfg))
         lgr = await stack.enter_async_context(logger.init())
-        repo = mongo.Repo(mongo_db)
 
         await safe.run(lgr, report(repo, months))
 
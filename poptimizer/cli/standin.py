@@ -0,0 +1,58 @@
+import contextlib
+from datetime import date, timedelta
+from typing import Annotated
+
+import typer
+import uvloop
+from pydantic import HttpUrl
+
+from poptimizer.adapters import logger
+from poptimizer.cli import safe
+from poptimizer.controllers.standin import market
+from poptimizer.controllers.standin import standin as iss
+
+
+async def _run(url: HttpUrl, knobs: market.Knobs, faults: iss.Faults) -> None:
+    async with contextlib.AsyncExitStack() as stack:
+        lgr = await stack.enter_async_context(logger.init())
+
+        synthetic = market.Market(knobs, date.today() - timedelta(days=1))
+
+        await safe.run(lgr, iss.Server(url, iss.StandIn(synthetic, faults)).run())
+
+
+def standin(  # noqa: PLR0913
+    *,
+    securities: Annotated[
+        int,
+        typer.Option(help="Number of synthetic securities", min=1),
+    ] = 1000,
+    years: Annotated[
+        int,
+        typer.Option(help="Years of synthetic history", min=1),
+    ] = 10,
+    error_rate: Annotated[
+        float,
+        typer.Option(help="Share of requests answered with 503", min=0, max=1),
+    ] = 0,
+    throttle_rate: Annotated[
+        float,
+        typer.Option(help="Share of requests answered with 429", min=0, max=1),
+    ] = 0,
+    seed: Annotated[
+        int,
+        typer.Option(help="Seed of synthetic market and faults"),
+    ] = 0,
+    url: Annotated[
+        str,
+        typer.Option(help="Stand-in address, set ISS_URL in .env to use it"),
+    ] = "http://localhost:8765",
+) -> None:
+    """Run MOEX ISS stand-in with synthetic market for load tests."""
+    uvloop.run(
+        _run(
+            HttpUrl(url),
+            market.Knobs(securities=securities, years=years, seed=seed),
+            iss.Faults(error_rate=error_rate, throttle_rate=throttle_rate, seed=seed),
+        )
+    )
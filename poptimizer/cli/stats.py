@@ -3,7 +3,7 @@ import contextlib
 import uvloop
 
 from poptimizer import config
-from poptimizer.adapters import logger, mongo
+from poptimizer.adapters import logger, storage
 from poptimizer.cli import safe
 from poptimizer.reports.stats import report
 
@@ -14,8 +14,7 @@ async def _run() -> None:
     async with contextlib.AsyncExitStack() as stack:
         lgr = await stack.enter_async_context(logger.init())
 
-        mongo_db = await stack.enter_async_context(mongo.db(cfg.mongo_db_uri, cfg.mongo_db_db))
-        repo = mongo.Repo(mongo_db)
+        repo = await stack.enter_async_context(storage.repo(cfg))
 
         await safe.run(lgr, report(repo))
 
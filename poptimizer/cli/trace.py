@@ -0,0 +1,34 @@
+import asyncio
+import contextlib
+from typing import Annotated
+
+import typer
+import uvloop
+
+from poptimizer import config
+from poptimizer.adapters import logger
+from poptimizer.cli import safe
+from poptimizer.reports.trace import report
+
+
+async def _run(trace_id: str, root: str) -> None:
+    cfg = config.Cfg()
+
+    async with contextlib.AsyncExitStack() as stack:
+        lgr = await stack.enter_async_context(logger.init())
+
+        await safe.run(lgr, asyncio.to_thread(report, cfg.trace_path, trace_id, root))
+
+
+def trace(
+    trace_id: Annotated[
+        str,
+        typer.Option(help="Trace id, last trace with root event if empty", show_default=False),
+    ] = "",
+    root: Annotated[
+        str,
+        typer.Option(help="Root event of trace"),
+    ] = "NewDataPublished",
+) -> None:
+    """Print timeline and critical path of event trace."""
+    uvloop.run(_run(trace_id, root))
@@ -0,0 +1,42 @@
+import contextlib
+import sys
+
+import uvloop
+
+from poptimizer import config
+from poptimizer.adapters import http_session, lease, logger, storage
+from poptimizer.cli import safe
+from poptimizer.controllers.worker import worker as training_worker
+from poptimizer.use_cases.evolve import evolve
+
+
+async def _run() -> int:
+    cfg = config.Cfg()
+
+    async with contextlib.AsyncExitStack() as stack:
+        http_client = await stack.enter_async_context(http_session.client())
+        repo = await stack.enter_async_context(storage.repo(cfg))
+        queue = await stack.enter_async_context(lease.queue(cfg))
+
+        lgr = await stack.enter_async_context(
+            logger.init(
+                http_client,
+                cfg.telegram_token,
+                cfg.telegram_chat_id,
+            )
+        )
+
+        job_worker = training_worker.Worker(repo, queue, evolve.TrainingHandler())
+
+        return await safe.run(lgr, job_worker.run())
+
+    return 1
+
+
+def worker() -> None:
+    """Run evolution worker.
+
+    Trains models queued by the main process with EVOLUTION_WORKERS > 0. Workers on several hosts can share
+    one MongoDB. Can be stopped with Ctrl-C/SIGINT. Settings from .env.
+    """
+    sys.exit(uvloop.run(_run()))
@@ -1,15 +1,30 @@
+from datetime import timedelta
 from pathlib import Path
+from typing import Literal
 
-from pydantic import HttpUrl, MongoDsn
+from pydantic import HttpUrl, MongoDsn, NonNegativeInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from poptimizer import consts
+
 
 class Cfg(BaseSettings):
     telegram_token: str = ""
     telegram_chat_id: str = ""
     server_url: HttpUrl = HttpUrl("http://localhost:5000")
+    db_backend: Literal["mongo", "sqlite"] = "mongo"
+    db_full_validation: bool = False
+    db_watch_changes: bool = False
+    evolution_workers: NonNegativeInt = 0
     mongo_db_uri: MongoDsn = MongoDsn("mongodb://localhost:27017")
     mongo_db_db: str = "poptimizer"
+    sqlite_path: Path = consts.ROOT / "db" / "poptimizer.sqlite"
+    trace_path: Path = consts.ROOT / "db" / "traces.jsonl"
+    http_cache_path: Path = consts.ROOT / "db" / "http_cache"
+    http_cassette: Literal["off", "record", "replay"] = "off"
+    http_cassette_path: Path = consts.ROOT / "db" / "cassettes"
+    http_replay_latency: timedelta = timedelta(0)
+    iss_url: HttpUrl | None = None
 
     model_config = SettingsConfigDict(
         env_file=Path(".env"),
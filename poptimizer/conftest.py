@@ -0,0 +1,12 @@
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import pytest
+
+from poptimizer.adapters import sqlite
+
+
+@pytest.fixture
+async def repo(tmp_path: Path) -> AsyncIterator[sqlite.Repo]:
+    async with sqlite.db(tmp_path / "test.sqlite") as conn:
+        yield sqlite.Repo(conn)
@@ -1,9 +1,10 @@
 from collections.abc import Callable
-from typing import TYPE_CHECKING
+from datetime import timedelta
+from typing import TYPE_CHECKING, Final
 
-from poptimizer.adapters import backup, mongo
+from poptimizer.adapters import backup, metrics, storage, trace
 from poptimizer.controllers.bus import msg
-from poptimizer.use_cases import cpi
+from poptimizer.use_cases import cpi, handler
 from poptimizer.use_cases.div import div, reestry, status
 from poptimizer.use_cases.dl.features import day as day_features
 from poptimizer.use_cases.dl.features import index as index_features
@@ -16,23 +17,44 @@ from poptimizer.use_cases.portfolio import forecasts, portfolio
 if TYPE_CHECKING:
     import aiohttp
 
+# Пока прогноз пересчитывается, оценки моделей с воркеров накапливаются и учитываются одним пересчетом
+_FORECAST_COALESCE_WINDOW: Final = timedelta(seconds=10)
 
-def build(
+
+def build(  # noqa: PLR0913
     http_client: aiohttp.ClientSession,
-    mongo_db: mongo.MongoDatabase,
+    http_cache: handler.HTTPCache,
+    repo: storage.Repo,
     stop_fn: Callable[[], bool] | None,
+    *,
+    training_queue: evolve.TrainingQueue | None = None,
+    tracer: trace.Tracer | None = None,
+    http_stats: Callable[[], metrics.HTTPSnapshot] | None = None,
 ) -> msg.Bus:
-    repo = mongo.Repo(mongo_db)
+    bus = msg.Bus(repo, tracer=tracer, http_stats=http_stats)
 
-    bus = msg.Bus(repo)
+    # Ежедневное обновление данных и шаги эволюции трассируются отдельно
+    bus.register_trace_root(handler.NewDataPublished)
+    bus.register_trace_root(handler.DataChecked)
 
     bus.register_event_handler(backup.BackupHandler(repo), msg.IgnoreErrorsPolicy)
+    bus.register_event_handler(
+        metrics.RepoSummaryHandler(repo.io_stats),
+        msg.IgnoreErrorsPolicy,
+        msg.Priority.BACKGROUND,
+    )
+    if http_stats is not None:
+        bus.register_event_handler(
+            metrics.HTTPSummaryHandler(http_stats),
+            msg.IgnoreErrorsPolicy,
+            msg.Priority.BACKGROUND,
+        )
 
     bus.register_event_handler(data.DataHandler(http_client, stop_fn), msg.IndefiniteRetryPolicy)
-    bus.register_event_handler(cpi.CPIHandler(http_client), msg.IgnoreErrorsPolicy)
+    bus.register_event_handler(cpi.CPIHandler(http_cache), msg.IgnoreErrorsPolicy)
     bus.register_event_handler(usd.USDHandler(http_client), msg.IgnoreErrorsPolicy)
     bus.register_event_handler(index.IndexesHandler(http_client), msg.IndefiniteRetryPolicy)
-    bus.register_event_handler(securities.SecuritiesHandler(http_client), msg.IndefiniteRetryPolicy)
+    bus.register_event_handler(securities.SecuritiesHandler(http_client, http_cache), msg.IndefiniteRetryPolicy)
     bus.register_event_handler(quotes.QuotesHandler(http_client), msg.IndefiniteRetryPolicy)
     bus.register_event_handler(div.DivHandler(), msg.IndefiniteRetryPolicy)
     bus.register_event_handler(portfolio.PortfolioHandler(), msg.IndefiniteRetryPolicy)
@@ -40,9 +62,20 @@ def build(
     bus.register_event_handler(index_features.IndexesFeatHandler(), msg.IndefiniteRetryPolicy)
     bus.register_event_handler(day_features.DayFeatHandler(), msg.IndefiniteRetryPolicy)
     bus.register_event_handler(tickers_features.SecFeatHandler(), msg.IndefiniteRetryPolicy)
-    bus.register_event_handler(status.DivStatusHandler(http_client), msg.IgnoreErrorsPolicy)
+    bus.register_event_handler(status.DivStatusHandler(http_cache), msg.IgnoreErrorsPolicy)
     bus.register_event_handler(reestry.ReestryHandler(http_client), msg.IgnoreErrorsPolicy)
-    bus.register_event_handler(evolve.EvolutionHandler(), msg.IndefiniteRetryPolicy)
-    bus.register_event_handler(forecasts.ForecastHandler(), msg.IndefiniteRetryPolicy)
+    bus.register_event_handler(
+        evolve.EvolutionHandler(training_queue),
+        msg.IndefiniteRetryPolicy,
+        msg.Priority.BACKGROUND,
+        max_concurrency=1,
+    )
+    bus.register_event_handler(
+        forecasts.ForecastHandler(),
+        msg.IndefiniteRetryPolicy,
+        msg.Priority.BACKGROUND,
+        max_concurrency=1,
+        coalesce_window=_FORECAST_COALESCE_WINDOW,
+    )
 
     return bus
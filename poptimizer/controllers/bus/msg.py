@@ -1,27 +1,56 @@
 import asyncio
+import contextlib
 import functools
+import heapq
+import itertools
 import logging
+import random
+import time
 import traceback
 from collections import defaultdict
-from collections.abc import Iterable
+from collections.abc import AsyncIterator, Callable, Coroutine, Iterable, Sequence
 from datetime import timedelta
+from enum import IntEnum
 from typing import (
     Any,
     Final,
+    NamedTuple,
     Protocol,
     get_args,
+    get_origin,
     get_type_hints,
 )
 
+from pydantic import ValidationError
+
 from poptimizer import errors
-from poptimizer.adapters import adapter, logger, mongo
-from poptimizer.controllers.bus import uow
+from poptimizer.adapters import adapter, logger, metrics, storage, trace
+from poptimizer.controllers.bus import outbox, uow
 from poptimizer.domain import domain
 from poptimizer.domain.evolve import evolve
 from poptimizer.use_cases.handler import AppStarted, Event
 
 _DEFAULT_FIRST_RETRY: Final = timedelta(seconds=30)
 _DEFAULT_BACKOFF_FACTOR: Final = 2
+# Ограничивает общее число одновременно работающих обработчиков и соединений с базой
+_DEFAULT_MAX_CONCURRENCY: Final = 16
+
+
+# Конфликт версий повторяется сразу со свежими данными, а не через паузы политики повторов
+_MAX_CONFLICT_RETRIES: Final = 5
+_CONFLICT_JITTER: Final = timedelta(milliseconds=100)
+
+
+class _Outcome(IntEnum):
+    HANDLED = 0
+    CONFLICT = 1
+    FAILED = 2
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    INGESTION = 1
+    BACKGROUND = 2
 
 
 class Ctx(Protocol):
@@ -39,8 +68,28 @@ class Ctx(Protocol):
         uid: domain.UID | None = None,
     ) -> E: ...
 
+    async def get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
+
+    async def get_many_for_update[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
+
+    async def find_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
+
     async def delete(self, entity: domain.Entity) -> None: ...
 
+    async def delete_many(self, t_entity: type[domain.Entity], uids: Sequence[domain.UID]) -> None: ...
+
     async def count_models(self) -> int: ...
 
     async def next_model_for_update(self, uid: domain.UID) -> tuple[evolve.Model, bool]: ...
@@ -52,6 +101,10 @@ class EventHandler[E: Event](Protocol):
     async def __call__(self, ctx: Ctx, msg: E) -> None: ...
 
 
+class BatchEventHandler[E: Event](Protocol):
+    async def __call__(self, ctx: Ctx, msg: list[E]) -> None: ...
+
+
 class RequestHandler[Req: Any, Resp: Any](Protocol):
     async def __call__(self, ctx: Ctx, req: Req) -> Resp: ...
 
@@ -60,15 +113,34 @@ class WrappedRequestHandler[Req: Any, Resp: Any](Protocol):
     async def __call__(self, req: Req) -> Resp: ...
 
 
-def _handler_types(handler: EventHandler[Any]) -> Iterable[adapter.Component]:
+def _msg_type(handler: EventHandler[Any] | BatchEventHandler[Any]) -> Any:
     if not (msg_type := get_type_hints(handler.__call__).get("msg")):
         msg_type = get_type_hints(handler)["msg"]
 
+    return msg_type
+
+
+def _is_batch_handler(handler: EventHandler[Any] | BatchEventHandler[Any]) -> bool:
+    return get_origin(_msg_type(handler)) is list
+
+
+def _handler_types(handler: EventHandler[Any] | BatchEventHandler[Any]) -> Iterable[type[Event]]:
+    msg_type = _msg_type(handler)
+    if get_origin(msg_type) is list:
+        (msg_type,) = get_args(msg_type)
+
     msg_type_union = get_args(msg_type)
     if not msg_type_union:
         msg_type_union = (msg_type,)
 
-    return (adapter.get_component_name(msg_subtype) for msg_subtype in msg_type_union)
+    return msg_type_union
+
+
+def _event_name(msg: Event | list[Event]) -> adapter.Component:
+    if isinstance(msg, list):
+        return adapter.Component("+".join(sorted({adapter.get_component_name(event) for event in msg})))
+
+    return adapter.get_component_name(msg)
 
 
 class Policy(Protocol):
@@ -99,98 +171,421 @@ class IndefiniteRetryPolicy:
         return True
 
 
+class _PriorityLimiter:
+    def __init__(self, slots: int) -> None:
+        self._free = slots
+        self._waiters: list[tuple[Priority, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: Priority) -> AsyncIterator[None]:
+        if self._free and not self._waiters:
+            self._free -= 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._counter), waiter))
+
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+
+                raise
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+
+            if not waiter.done():
+                waiter.set_result(None)
+
+                return
+
+        self._free += 1
+
+
+class _Registration(NamedTuple):
+    handler: EventHandler[Any] | BatchEventHandler[Any]
+    policy_type: type[Policy]
+    priority: Priority
+    limiter: contextlib.AbstractAsyncContextManager[Any]
+    # Для обработчиков списков событий - время накопления пачки, пока обрабатывается предыдущая
+    window: timedelta | None
+
+
 class Bus:
     def __init__(
         self,
-        repo: mongo.Repo,
+        repo: storage.Repo,
+        max_concurrency: int = _DEFAULT_MAX_CONCURRENCY,
+        tracer: trace.Tracer | None = None,
+        http_stats: Callable[[], metrics.HTTPSnapshot] | None = None,
     ) -> None:
         self._lgr = logging.getLogger()
         self._repo = repo
+        self._http_stats = http_stats
+        self._tracer = tracer or trace.Tracer()
+        self._trace_roots: set[adapter.Component] = set()
         self._tg = asyncio.TaskGroup()
-        self._event_handlers: dict[adapter.Component, list[tuple[EventHandler[Any], type[Policy]]]] = defaultdict(list)
+        self._limiter = _PriorityLimiter(max_concurrency)
+        self._outbox = outbox.Outbox(repo)
+        self._tasks = 0
+        self._resumed = False
+        self._batches: dict[_Registration, list[tuple[Event, outbox.Delivery | None, trace.SpanContext]]] = {}
+        self._batch_locks: defaultdict[_Registration, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._event_types: dict[adapter.Component, type[Event]] = {}
+        self._event_handlers: dict[adapter.Component, list[_Registration]] = defaultdict(list)
+        self._metrics: defaultdict[tuple[adapter.Component, adapter.Component], metrics.HandlerRecorder] = defaultdict(
+            metrics.HandlerRecorder
+        )
 
     def register_event_handler(
         self,
-        handler: EventHandler[Any],
+        handler: EventHandler[Any] | BatchEventHandler[Any],
         policy_type: type[Policy],
+        priority: Priority = Priority.INGESTION,
+        max_concurrency: int | None = None,
+        coalesce_window: timedelta = timedelta(),
     ) -> None:
-        for msg_name in _handler_types(handler):
-            self._event_handlers[msg_name].append((handler, policy_type))
+        registration = _Registration(
+            handler=handler,
+            policy_type=policy_type,
+            priority=priority,
+            limiter=contextlib.nullcontext() if max_concurrency is None else asyncio.Semaphore(max_concurrency),
+            window=coalesce_window if _is_batch_handler(handler) else None,
+        )
+
+        for msg_type in _handler_types(handler):
+            msg_name = adapter.get_component_name(msg_type)
+            self._event_types[msg_name] = msg_type
+            self._event_handlers[msg_name].append(registration)
             self._lgr.info(
-                "%s was registered as event handler for %s with %s",
+                "%s was registered as event handler for %s with %s and %s priority",
                 adapter.get_component_name(handler),
                 msg_name,
                 adapter.get_component_name(policy_type),
+                priority.name,
             )
 
+    def register_trace_root(self, msg_type: type[Event]) -> None:
+        """События заданного типа начинают новую трассировку со ссылкой на спэн, который их опубликовал."""
+        self._trace_roots.add(adapter.get_component_name(msg_type))
+
     async def run(self) -> None:
         self._lgr.info("Message bus started")
         try:
             async with self._tg:
-                self.publish(AppStarted())
+                self._spawn(self._start())
         except asyncio.CancelledError:
             self._lgr.info("Message bus shutdown finished")
 
-    def publish(self, msg: Event) -> None:
-        self._tg.create_task(self._route_event(msg))
+    async def _start(self) -> None:
+        try:
+            deliveries = await self._outbox.pending()
+        except errors.AdapterError as err:
+            self._lgr.warning("Can't load outbox - %s", err)
+            deliveries = []
+
+        if deliveries:
+            self._lgr.info("Resuming %d undelivered events", len(deliveries))
+
+        self._resumed = bool(deliveries)
+        self.publish(AppStarted(resumed=self._resumed))
+
+        for delivery in deliveries:
+            self._redeliver(delivery)
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        self._tasks += 1
+        self._tg.create_task(coro).add_done_callback(self._task_done)
 
-    async def _route_event(self, msg: Event) -> None:
+    def _task_done(self, task: asyncio.Task[None]) -> None:
+        self._tasks -= 1
+
+        # Если восстановленная цепочка событий оборвалась, цикл запускается заново
+        if not self._tasks and self._resumed and not task.cancelled():
+            self._resumed = False
+            self.publish(AppStarted())
+
+    def _redeliver(self, delivery: outbox.Delivery) -> None:
+        for registration in self._event_handlers.get(adapter.Component(delivery.event), []):
+            if adapter.get_component_name(registration.handler) != delivery.handler:
+                continue
+
+            try:
+                msg = self._event_types[adapter.Component(delivery.event)].model_validate(delivery.payload)
+            except ValidationError as err:
+                self._lgr.warning("Can't restore %s for %s - %s", delivery.event, delivery.handler, err)
+
+                break
+
+            parent = self._tracer.start(delivery.event, delivery.parent)
+            self._dispatch(registration, msg, time.perf_counter(), delivery, parent)
+
+            return
+
+        self._spawn(self._outbox.done([delivery]))
+
+    def _handler_names(self, msg: Event) -> list[adapter.Component]:
+        return [
+            adapter.get_component_name(registration.handler)
+            for registration in self._event_handlers.get(adapter.get_component_name(msg), [])
+        ]
+
+    def handler_stats(self) -> dict[tuple[adapter.Component, adapter.Component], metrics.HandlerStats]:
+        return {key: recorder.snapshot() for key, recorder in self._metrics.items()}
+
+    def prometheus_metrics(self) -> str:
+        exposition = metrics.Exposition()
+        stats = sorted(self.handler_stats().items())
+
+        def samples(field: Callable[[metrics.HandlerStats], float]) -> list[tuple[metrics.Labels, float]]:
+            return [({"handler": handler, "event": event}, field(stat)) for (handler, event), stat in stats]
+
+        exposition.counter(
+            "poptimizer_handler_invocations_total",
+            "Event handler attempts.",
+            samples(lambda stat: stat.invocations),
+        )
+        exposition.counter(
+            "poptimizer_handler_retries_total",
+            "Event handler retries granted by policy.",
+            samples(lambda stat: stat.retries),
+        )
+        exposition.counter(
+            "poptimizer_handler_failures_total",
+            "Failed event handler attempts.",
+            samples(lambda stat: stat.failures),
+        )
+        exposition.gauge(
+            "poptimizer_handler_in_flight",
+            "Event handler tasks in progress including retry backoff.",
+            samples(lambda stat: stat.in_flight),
+        )
+        exposition.histogram(
+            "poptimizer_handler_duration_seconds",
+            "Event handler attempt duration.",
+            [({"handler": handler, "event": event}, stat.duration) for (handler, event), stat in stats],
+        )
+        exposition.histogram(
+            "poptimizer_handler_delay_seconds",
+            "Time from event publishing to handler start including queueing.",
+            [({"handler": handler, "event": event}, stat.delay) for (handler, event), stat in stats],
+        )
+        metrics.export_io(exposition, self._repo.io_stats())
+
+        if self._http_stats is not None:
+            metrics.export_http(exposition, self._http_stats())
+
+        return exposition.text()
+
+    def publish(
+        self,
+        msg: Event,
+        deliveries: dict[adapter.Component, outbox.Delivery] | None = None,
+        parent: trace.SpanContext | None = None,
+    ) -> None:
+        name = adapter.get_component_name(msg)
+
+        if parent is None or name in self._trace_roots:
+            parent = self._tracer.start(name, parent)
+
+        self._tracer.enter(parent.trace_id)
+        self._spawn(self._route_event(msg, time.perf_counter(), deliveries or {}, parent))
+
+    async def _route_event(
+        self,
+        msg: Event,
+        published: float,
+        deliveries: dict[adapter.Component, outbox.Delivery],
+        parent: trace.SpanContext,
+    ) -> None:
         name = adapter.get_component_name(msg)
         self._lgr.info("%r published", msg)
 
-        handlers = self._event_handlers.get(name)
-        if not handlers:
-            raise errors.ControllersError(f"No event handler for {name}")
+        try:
+            handlers = self._event_handlers.get(name)
+            if not handlers:
+                raise errors.ControllersError(f"No event handler for {name}")
 
-        for handler, policy_type in handlers:
-            self._tg.create_task(self._handle_event(handler, msg, policy_type()))
+            for registration in handlers:
+                delivery = deliveries.get(adapter.get_component_name(registration.handler))
+                self._dispatch(registration, msg, published, delivery, parent)
+        finally:
+            self._tracer.leave(parent.trace_id)
 
-    async def _handle_event(
+    def _dispatch(
         self,
-        handler: EventHandler[Any],
+        registration: _Registration,
         msg: Event,
-        policy: Policy,
+        published: float,
+        delivery: outbox.Delivery | None,
+        parent: trace.SpanContext,
     ) -> None:
-        attempt = 1
+        self._tracer.enter(parent.trace_id)
 
-        while await self._handle_event_safe(handler, msg, attempt):
-            attempt += 1
+        if registration.window is None:
+            self._spawn(self._handle_event(registration, msg, published, [delivery], [parent]))
+        elif (batch := self._batches.get(registration)) is not None:
+            batch.append((msg, delivery, parent))
+        else:
+            # Свободный обработчик получает событие сразу, а занятый - пачку накопленных за время его работы
+            window = registration.window if self._batch_locks[registration].locked() else timedelta()
+            self._batches[registration] = [(msg, delivery, parent)]
+            self._spawn(self._handle_batch(registration, window, published))
+
+    async def _handle_batch(self, registration: _Registration, window: timedelta, published: float) -> None:
+        await asyncio.sleep(window.total_seconds())
+
+        async with self._batch_locks[registration]:
+            batch = self._batches.pop(registration)
+
+            await self._handle_event(
+                registration,
+                [msg for msg, _, _ in batch],
+                published,
+                [delivery for _, delivery, _ in batch],
+                [parent for _, _, parent in batch],
+            )
 
-            if not await policy.try_again():
-                return
+    async def _handle_event(
+        self,
+        registration: _Registration,
+        msg: Event | list[Event],
+        published: float,
+        deliveries: list[outbox.Delivery | None],
+        parents: list[trace.SpanContext],
+    ) -> None:
+        # Пачка событий обрабатывается в трассировке первого, остальные становятся ссылками
+        first, *others = parents
+        span = self._tracer.open(
+            first,
+            trace.SpanKind.HANDLER,
+            adapter.get_component_name(registration.handler),
+            _event_name(msg),
+            others,
+        )
+        handled = False
+
+        try:
+            handled = await self._handle_event_with_retries(registration, msg, published, span)
+        finally:
+            self._tracer.close(span, failed=not handled)
+
+            for parent in parents:
+                self._tracer.leave(parent.trace_id)
+
+        await self._outbox.done(delivery for delivery in deliveries if delivery is not None)
+
+    async def _handle_event_with_retries(
+        self,
+        registration: _Registration,
+        msg: Event | list[Event],
+        published: float,
+        span: trace.OpenSpan,
+    ) -> bool:
+        recorder = self._metrics[adapter.get_component_name(registration.handler), _event_name(msg)]
+        policy = registration.policy_type()
+
+        with recorder.running():
+            conflicts = 0
+
+            while (
+                outcome := await self._handle_event_attempt(registration, recorder, msg, published, span)
+            ) is not _Outcome.HANDLED:
+                if outcome is _Outcome.CONFLICT and conflicts < _MAX_CONFLICT_RETRIES:
+                    conflicts += 1
+                    await _conflict_pause()
+                elif not await policy.try_again():
+                    return False
+
+                recorder.retry()
 
         self._lgr.info(
             "%s handled %r",
-            adapter.get_component_name(handler),
+            adapter.get_component_name(registration.handler),
             msg,
         )
 
+        return True
+
+    async def _handle_event_attempt(
+        self,
+        registration: _Registration,
+        recorder: metrics.HandlerRecorder,
+        msg: Event | list[Event],
+        published: float,
+        span: trace.OpenSpan,
+    ) -> _Outcome:
+        async with registration.limiter, self._limiter.slot(registration.priority):
+            start = time.perf_counter()
+            outcome = _Outcome.FAILED
+            span.attempt()
+
+            if span.attempts == 1:
+                recorder.started(start - published)
+
+            try:
+                outcome = await self._handle_event_safe(registration.handler, msg, span)
+            finally:
+                recorder.attempt(time.perf_counter() - start, failed=outcome is not _Outcome.HANDLED)
+
+            return outcome
+
     async def _handle_event_safe(
         self,
-        handler: EventHandler[Any],
-        msg: Event,
-        attempt: int,
-    ) -> bool:
+        handler: EventHandler[Any] | BatchEventHandler[Any],
+        msg: Event | list[Event],
+        span: trace.OpenSpan,
+    ) -> _Outcome:
+        ctx = uow.UOW(self._repo)
+        outcome = _Outcome.HANDLED
+        staged: list[dict[adapter.Component, outbox.Delivery]] = []
+        commit: trace.OpenSpan | None = None
+
         try:
-            async with uow.UOW(self._repo) as ctx:
+            async with ctx:
                 await handler(ctx, msg)
-
-                for event in ctx.events():
-                    self.publish(event)
-
+                staged = self._outbox.stage(ctx, list(ctx.events()), self._handler_names, span.ctx)
+                commit = span.child(trace.SpanKind.COMMIT, "UOW")
+        except* errors.VersionConflictError as err:
+            self._lgr.info(
+                "%s met version conflict handling %r in %d attempt: %s",
+                adapter.get_component_name(handler),
+                msg,
+                span.attempts,
+                logger.get_root_error(err),
+            )
+            outcome = _Outcome.CONFLICT
         except* errors.POError as err:
             self._lgr.warning(
                 "%s can't handle %r in %d attempt: %s",
                 adapter.get_component_name(handler),
                 msg,
-                attempt,
+                span.attempts,
                 logger.get_root_error(err),
             )
             traceback.print_exception(err, colorize=True)  # type: ignore[reportCallIssue]
-        else:
-            return False
+            outcome = _Outcome.FAILED
 
-        return True
+        if commit is not None:
+            self._tracer.close(commit, failed=outcome is not _Outcome.HANDLED)
+
+        if outcome is not _Outcome.HANDLED:
+            await self._outbox.done(delivery for deliveries in staged for delivery in deliveries.values())
+
+            return outcome
+
+        for event, deliveries in zip(ctx.events(), staged, strict=True):
+            self.publish(event, deliveries, span.ctx)
+
+        return outcome
 
     def wrap[Req: Any, Resp: Any](
         self,
@@ -198,12 +593,40 @@ class Bus:
     ) -> WrappedRequestHandler[Req, Resp]:
         @functools.wraps(handler)
         async def wrapped(req: Req) -> Resp:
-            async with uow.UOW(self._repo) as ctx:
-                resp = await handler(ctx, req)
+            conflicts = 0
+
+            while True:
+                try:
+                    return await self._handle_request(handler, req)
+                except* errors.VersionConflictError:
+                    if conflicts == _MAX_CONFLICT_RETRIES:
+                        raise
 
-                for event in ctx.events():
-                    self.publish(event)
+                    conflicts += 1
 
-                return resp
+                await _conflict_pause()
 
         return wrapped
+
+    async def _handle_request[Req: Any, Resp: Any](self, handler: RequestHandler[Req, Resp], req: Req) -> Resp:
+        ctx = uow.UOW(self._repo)
+
+        staged: list[dict[adapter.Component, outbox.Delivery]] = []
+
+        try:
+            async with self._limiter.slot(Priority.INTERACTIVE), ctx:
+                resp = await handler(ctx, req)
+                staged = self._outbox.stage(ctx, list(ctx.events()), self._handler_names)
+        except BaseException:
+            await self._outbox.done(delivery for deliveries in staged for delivery in deliveries.values())
+
+            raise
+
+        for event, deliveries in zip(ctx.events(), staged, strict=True):
+            self.publish(event, deliveries)
+
+        return resp
+
+
+async def _conflict_pause() -> None:
+    await asyncio.sleep(random.uniform(0, _CONFLICT_JITTER.total_seconds()))  # noqa: S311
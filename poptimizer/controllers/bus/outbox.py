@@ -0,0 +1,82 @@
+import logging
+import uuid
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from pydantic import Field
+
+from poptimizer import consts, errors
+from poptimizer.adapters import adapter, storage, trace
+from poptimizer.controllers.bus import uow
+from poptimizer.domain import domain
+from poptimizer.use_cases.handler import Event
+
+
+class Delivery(domain.Entity):
+    event: str = ""
+    handler: str = ""
+    payload: dict[str, Any] = Field(default_factory=dict)
+    # Спэн, опубликовавший событие
+    trace_id: str = ""
+    span_id: str = ""
+
+    def update(self, event: Event, handler: adapter.Component, parent: trace.SpanContext | None) -> None:
+        self.event = adapter.get_component_name(event)
+        self.handler = handler
+        self.payload = event.model_dump()
+
+        if parent is not None:
+            self.trace_id, self.span_id = parent
+
+    @property
+    def parent(self) -> trace.SpanContext | None:
+        if not self.trace_id:
+            return None
+
+        return trace.SpanContext(self.trace_id, self.span_id)
+
+
+class Outbox:
+    """Недоставленные события сохраняются вместе с изменениями и удаляются после обработки."""
+
+    def __init__(self, repo: storage.Repo) -> None:
+        self._lgr = logging.getLogger()
+        self._repo = repo
+
+    def stage(
+        self,
+        ctx: uow.UOW,
+        events: Sequence[Event],
+        handlers: Callable[[Event], Iterable[adapter.Component]],
+        parent: trace.SpanContext | None = None,
+    ) -> list[dict[adapter.Component, Delivery]]:
+        staged: list[dict[adapter.Component, Delivery]] = [{} for _ in events]
+        targets = [(n, event, handler) for n, event in enumerate(events) for handler in handlers(event)]
+
+        if not targets:
+            return staged
+
+        for n, event, handler in targets:
+            delivery = Delivery(
+                rev=domain.Revision(uid=domain.UID(uuid.uuid4().hex), ver=domain.Version(0)),
+                day=consts.START_DAY,
+            )
+            delivery.update(event, handler, parent)
+            ctx.add(delivery)
+            staged[n][handler] = delivery
+
+        return staged
+
+    async def pending(self) -> list[Delivery]:
+        deliveries = [delivery async for delivery in self._repo.get_all(Delivery)]
+
+        # Пустые записи, оставшиеся от неудачно завершившихся единиц работы
+        await self.done([delivery for delivery in deliveries if not delivery.event])
+
+        return [delivery for delivery in deliveries if delivery.event]
+
+    async def done(self, deliveries: Iterable[Delivery]) -> None:
+        try:
+            await self._repo.delete_many(Delivery, [delivery.uid for delivery in deliveries])
+        except errors.AdapterError as err:
+            self._lgr.warning("Can't remove deliveries from outbox - %s", err)
@@ -0,0 +1,73 @@
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import timedelta
+
+import pytest
+
+from poptimizer.controllers.bus import msg
+from poptimizer.use_cases import handler
+
+
+class _Ping(handler.Event):
+    n: int
+
+
+class _Started:
+    async def __call__(self, ctx: handler.Ctx, msg: handler.AppStarted) -> None: ...
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.calls: list[list[int]] = []
+        self.called = asyncio.Event()
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def __call__(self, ctx: handler.Ctx, msg: list[_Ping]) -> None:  # noqa: ARG002
+        self.calls.append([event.n for event in msg])
+        self.called.set()
+        await self.gate.wait()
+
+
+@pytest.fixture
+def batch() -> _Batch:
+    return _Batch()
+
+
+@pytest.fixture
+async def bus(repo, batch) -> AsyncIterator[msg.Bus]:
+    bus = msg.Bus(repo)
+    bus.register_event_handler(_Started(), msg.IgnoreErrorsPolicy)
+    bus.register_event_handler(batch, msg.IgnoreErrorsPolicy, coalesce_window=timedelta(seconds=0.1))
+
+    task = asyncio.create_task(bus.run())
+    await asyncio.sleep(0.1)
+
+    yield bus
+
+    task.cancel()
+    await task
+
+
+async def test_idle_handler_is_not_delayed(bus, batch):
+    bus.publish(_Ping(n=1))
+
+    await asyncio.wait_for(batch.called.wait(), timeout=0.05)
+
+    assert batch.calls == [[1]]
+
+
+async def test_events_coalesce_while_handler_busy(bus, batch):
+    batch.gate.clear()
+    bus.publish(_Ping(n=1))
+    await batch.called.wait()
+
+    batch.called.clear()
+    bus.publish(_Ping(n=2))
+    bus.publish(_Ping(n=3))
+    await asyncio.sleep(0.2)
+    batch.gate.set()
+
+    await asyncio.wait_for(batch.called.wait(), timeout=1)
+
+    assert batch.calls == [[1], [2, 3]]
@@ -0,0 +1,59 @@
+from datetime import date
+
+import pytest
+
+from poptimizer.adapters import adapter
+from poptimizer.controllers.bus import outbox, uow
+from poptimizer.use_cases import handler
+
+_HANDLERS = (adapter.Component("First"), adapter.Component("Second"))
+
+
+async def test_staged_deliveries_pending_until_done(repo):
+    events = [handler.DataChecked(day=date(2025, 1, 27)), handler.AppStarted()]
+    box = outbox.Outbox(repo)
+
+    async with uow.UOW(repo) as ctx:
+        staged = box.stage(ctx, events, lambda _: _HANDLERS)
+
+    assert [sorted(deliveries) for deliveries in staged] == [list(_HANDLERS), list(_HANDLERS)]
+
+    pending = await box.pending()
+
+    assert len(pending) == 4
+    assert {(delivery.event, delivery.handler) for delivery in pending} == {
+        (event, handler_name) for event in ("DataChecked", "AppStarted") for handler_name in _HANDLERS
+    }
+    assert handler.DataChecked.model_validate(staged[0]["First"].payload) == events[0]
+
+    await box.done(staged[0].values())
+
+    assert {delivery.event for delivery in await box.pending()} == {"AppStarted"}
+
+
+async def test_pending_drops_uncommitted(repo):
+    box = outbox.Outbox(repo)
+
+    async def stage_and_fail() -> None:
+        async with uow.UOW(repo) as ctx:
+            box.stage(ctx, [handler.AppStarted()], lambda _: _HANDLERS)
+
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        await stage_and_fail()
+
+    assert await box.pending() == []
+    assert [delivery async for delivery in repo.get_all(outbox.Delivery)] == []
+
+
+async def test_done_tolerates_removed(repo):
+    box = outbox.Outbox(repo)
+
+    async with uow.UOW(repo) as ctx:
+        (staged,) = box.stage(ctx, [handler.AppStarted()], lambda _: _HANDLERS)
+
+    await box.done(staged.values())
+    await box.done(staged.values())
+
+    assert await box.pending() == []
@@ -0,0 +1,62 @@
+import asyncio
+from collections.abc import Sequence
+from datetime import date
+
+from poptimizer.controllers.bus import uow
+from poptimizer.domain import domain, settings
+
+
+class _FakeRepo:
+    def __init__(self) -> None:
+        self.loads: list[list[domain.UID]] = []
+
+    async def get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+        *,
+        for_update: bool = False,  # noqa: ARG002
+    ) -> list[E]:
+        self.loads.append(list(uids))
+        await asyncio.sleep(0)
+
+        return [t_entity(rev=domain.Revision(uid=uid, ver=domain.Version(0)), day=date(2025, 1, 27)) for uid in uids]
+
+
+async def test_same_key_loaded_once():
+    repo = _FakeRepo()
+    ctx = uow.UOW(repo)  # type: ignore[reportArgumentType]
+
+    first, second = await asyncio.gather(
+        ctx.get_for_update(settings.Settings),
+        ctx.get_for_update(settings.Settings),
+    )
+
+    assert first is second
+    assert repo.loads == [["Settings"]]
+
+
+async def test_different_keys_loaded_concurrently():
+    repo = _FakeRepo()
+    ctx = uow.UOW(repo)  # type: ignore[reportArgumentType]
+
+    await asyncio.gather(
+        ctx.get(settings.Settings, domain.UID("a")),
+        ctx.get(settings.Settings, domain.UID("b")),
+        ctx.get(settings.Settings, domain.UID("a")),
+    )
+
+    assert repo.loads == [["a"], ["b"]]
+
+
+async def test_read_waits_for_update_load():
+    repo = _FakeRepo()
+    ctx = uow.UOW(repo)  # type: ignore[reportArgumentType]
+
+    for_update, read = await asyncio.gather(
+        ctx.get_for_update(settings.Settings),
+        ctx.get(settings.Settings),
+    )
+
+    assert for_update is read
+    assert list(ctx._identity_map) == [for_update]
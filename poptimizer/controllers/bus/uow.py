@@ -1,36 +1,28 @@
 import asyncio
-from collections.abc import Iterable, Iterator
+import functools
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Sequence
 from types import TracebackType
-from typing import Self
+from typing import Self, cast
 
 from poptimizer import errors
-from poptimizer.adapters import adapter, mongo
+from poptimizer.adapters import adapter, storage
 from poptimizer.domain import domain
 from poptimizer.domain.evolve import evolve
 from poptimizer.use_cases.handler import Event
 
+type _Key = tuple[type, domain.UID]
+
 
 class _IdentityMap:
     def __init__(self) -> None:
-        self._seen: dict[tuple[type, domain.UID], domain.Entity] = {}
-        self._lock = asyncio.Lock()
+        self._seen: dict[_Key, domain.Entity] = {}
+        # Загрузки в процессе - одновременные запросы одного ключа ждут общий результат
+        self._loading: dict[_Key, asyncio.Future[domain.Entity]] = {}
+        self._reading: dict[_Key, asyncio.Future[domain.Entity]] = {}
 
     def __iter__(self) -> Iterator[domain.Entity]:
         yield from self._seen.values()
 
-    async def __aenter__(self) -> Self:
-        await self._lock.acquire()
-
-        return self
-
-    async def __aexit__(
-        self,
-        exc_type: type[BaseException] | None,
-        exc_value: BaseException | None,
-        traceback: TracebackType | None,
-    ) -> None:
-        self._lock.release()
-
     def get[E: domain.Entity](self, t_entity: type[E], uid: domain.UID) -> E | None:
         entity = self._seen.get((t_entity, uid))
         if entity is None:
@@ -41,19 +33,92 @@ class _IdentityMap:
 
         return entity
 
-    def save(self, entity: domain.Entity) -> None:
-        saved = self._seen.get((entity.__class__, entity.uid))
-        if saved is not None:
-            raise errors.ControllersError(f"{entity.__class__}({entity.uid}) in identity map ")
+    def save(self, entity: domain.Entity) -> domain.Entity:
+        return self._seen.setdefault((entity.__class__, entity.uid), entity)
+
+    def delete(self, t_entity: type[domain.Entity], uid: domain.UID) -> None:
+        self._seen.pop((t_entity, uid), None)
+
+    async def load[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+        load_many: Callable[[list[domain.UID]], Awaitable[list[E]]],
+        *,
+        for_update: bool,
+    ) -> list[E]:
+        loaded: dict[domain.UID, E] = {}
+        waiting: dict[domain.UID, asyncio.Future[domain.Entity]] = {}
+        missed: list[domain.UID] = []
+
+        for uid in dict.fromkeys(uids):
+            key = (t_entity, uid)
+
+            if (entity := self.get(t_entity, uid)) is not None:
+                loaded[uid] = entity
+            elif (future := self._in_flight(key, for_update=for_update)) is not None:
+                waiting[uid] = future
+            else:
+                missed.append(uid)
+
+        if missed:
+            loaded.update(await self._load_missed(t_entity, missed, load_many, for_update=for_update))
+
+        for uid, future in waiting.items():
+            loaded[uid] = cast("E", await future)
+
+        return [loaded[uid] for uid in uids]
 
-        self._seen[entity.__class__, entity.uid] = entity
+    def _in_flight(self, key: _Key, *, for_update: bool) -> asyncio.Future[domain.Entity] | None:
+        if (future := self._loading.get(key)) is not None or for_update:
+            return future
 
-    def delete(self, entity: domain.Entity) -> None:
-        self._seen.pop((entity.__class__, entity.uid), None)
+        return self._reading.get(key)
+
+    async def _load_missed[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: list[domain.UID],
+        load_many: Callable[[list[domain.UID]], Awaitable[list[E]]],
+        *,
+        for_update: bool,
+    ) -> dict[domain.UID, E]:
+        in_flight = self._loading if for_update else self._reading
+        loop = asyncio.get_running_loop()
+        futures = {uid: loop.create_future() for uid in uids}
+
+        for uid, future in futures.items():
+            in_flight[t_entity, uid] = future
+
+        try:
+            entities = await load_many(uids)
+        except Exception as err:
+            for future in futures.values():
+                future.set_exception(err)
+                # Ошибка обрабатывается загрузившим, ожидающие могли и не появиться
+                future.exception()
+
+            raise
+        except BaseException:
+            for future in futures.values():
+                future.cancel()
+
+            raise
+        finally:
+            for uid in uids:
+                in_flight.pop((t_entity, uid), None)
+
+        loaded: dict[domain.UID, E] = {}
+
+        for uid, entity in zip(uids, entities, strict=True):
+            loaded[uid] = cast("E", self.save(entity)) if for_update else entity
+            futures[uid].set_result(loaded[uid])
+
+        return loaded
 
 
 class UOW:
-    def __init__(self, repo: mongo.Repo) -> None:
+    def __init__(self, repo: storage.Repo) -> None:
         self._repo = repo
         self._identity_map = _IdentityMap()
         self._events: list[Event] = []
@@ -70,8 +135,8 @@ class UOW:
         uid: domain.UID | None = None,
     ) -> E:
         uid = uid or domain.UID(adapter.get_component_name(t_entity))
-        async with self._identity_map as identity_map:
-            return identity_map.get(t_entity, uid) or await self._repo.get(t_entity, uid)
+
+        return (await self.get_many(t_entity, [uid]))[0]
 
     async def get_for_update[E: domain.Entity](
         self,
@@ -79,32 +144,68 @@ class UOW:
         uid: domain.UID | None = None,
     ) -> E:
         uid = uid or domain.UID(adapter.get_component_name(t_entity))
-        async with self._identity_map as identity_map:
-            if loaded := identity_map.get(t_entity, uid):
-                return loaded
 
-            entity = await self._repo.get(t_entity, uid)
+        return (await self.get_many_for_update(t_entity, [uid]))[0]
 
-            identity_map.save(entity)
+    async def get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]:
+        return await self._identity_map.load(
+            t_entity,
+            uids,
+            functools.partial(self._repo.get_many, t_entity),
+            for_update=False,
+        )
+
+    async def get_many_for_update[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]:
+        return await self._identity_map.load(
+            t_entity,
+            uids,
+            functools.partial(self._repo.get_many, t_entity, for_update=True),
+            for_update=True,
+        )
+
+    def add(self, entity: domain.Entity) -> None:
+        """Новая сущность создается при фиксации изменений вместе с остальными."""
+        self._identity_map.save(entity)
+
+    async def find_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]:
+        """Загружает только существующие сущности, не создавая отсутствующие."""
+        found = {uid: entity for uid in uids if (entity := self._identity_map.get(t_entity, uid)) is not None}
+
+        if missed := [uid for uid in dict.fromkeys(uids) if uid not in found]:
+            found |= {entity.uid: entity for entity in await self._repo.find_many(t_entity, missed)}
 
-            return entity
+        return [found[uid] for uid in uids if uid in found]
 
     async def delete(self, entity: domain.Entity) -> None:
-        async with self._identity_map as identity_map:
-            identity_map.delete(entity)
-            await self._repo.delete(entity)
+        self._identity_map.delete(entity.__class__, entity.uid)
+        await self._repo.delete(entity)
+
+    async def delete_many(self, t_entity: type[domain.Entity], uids: Sequence[domain.UID]) -> None:
+        """Удаляет сущности по идентификаторам, отсутствующие пропускаются."""
+        for uid in uids:
+            self._identity_map.delete(t_entity, uid)
+
+        await self._repo.delete_many(t_entity, uids)
 
     async def count_models(self) -> int:
         return await self._repo.count_models()
 
     async def next_model_for_update(self, uid: domain.UID) -> tuple[evolve.Model, bool]:
-        async with self._identity_map as identity_map:
-            entity, good = await self._repo.next_model(uid)
-
-            if not identity_map.get(evolve.Model, entity.uid):
-                identity_map.save(entity)
+        entity, good = await self._repo.next_model(uid)
 
-            return entity, good
+        return cast("evolve.Model", self._identity_map.save(entity)), good
 
     async def sample_models(self, n: int) -> list[evolve.Model]:
         return await self._repo.sample_models(n)
@@ -121,6 +222,4 @@ class UOW:
         if exc_value is not None:
             return
 
-        async with asyncio.TaskGroup() as tg:
-            for entity in self._identity_map:
-                tg.create_task(self._repo.save(entity))
+        await self._repo.save_many(self._identity_map)
@@ -0,0 +1,222 @@
+import bisect
+import random
+import string
+from datetime import date, timedelta
+from typing import Final, NamedTuple
+
+from poptimizer.domain.moex import securities
+
+_SHARES_BOARD: Final = "TQBR"
+_ETF_BOARD: Final = "TQTF"
+_ORDINARY_TYPE: Final = "1"
+_PREFERRED_TYPE: Final = "2"
+_ETF_TYPE: Final = "9"
+_TICKER_LEN: Final = 4
+
+# Доли привилегированных акций, ETF и бумаг, начавших торговаться позже начала истории
+_PREFERRED_SHARE: Final = 0.05
+_ETF_SHARE: Final = 0.1
+_LATE_LISTING_SHARE: Final = 0.3
+
+_DAILY_DRIFT: Final = 0.0003
+_DAILY_VOLATILITY: Final = 0.02
+_GAP_VOLATILITY: Final = 0.005
+_RANGE_VOLATILITY: Final = 0.01
+_MIN_PRICE: Final = 0.01
+_TURNOVER_MU: Final = 15.0
+_TURNOVER_SIGMA: Final = 1.5
+
+_DAY_INTERVAL: Final = 24
+_MINUTE_INTERVAL: Final = 1
+_DAYS_IN_YEAR: Final = 365
+_WEEKDAYS: Final = 5
+
+type Row = dict[str, str | int | float]
+
+
+class Knobs(NamedTuple):
+    securities: int = 1000
+    years: int = 10
+    seed: int = 0
+
+
+class _Security(NamedTuple):
+    ticker: str
+    board: str
+    type: str
+    sector: securities.SectorIndex
+
+
+class _Candle(NamedTuple):
+    day: date
+    open: float
+    close: float
+    high: float
+    low: float
+    turnover: float
+
+
+class Market:
+    """Синтетический рынок: заданное количество бумаг со случайными блужданиями цен за заданное число лет.
+
+    Одинаковые параметры дают одинаковые данные, а история каждой бумаги строится при первом обращении.
+    """
+
+    def __init__(self, knobs: Knobs, last_day: date) -> None:
+        self._knobs = knobs
+        first_day = last_day - timedelta(days=_DAYS_IN_YEAR * knobs.years)
+        all_days = (first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1))
+        self._days = [day for day in all_days if day.weekday() < _WEEKDAYS]
+        self._securities = _make_securities(knobs)
+        self._history: dict[str, list[_Candle]] = {}
+
+    @property
+    def first_day(self) -> date:
+        return self._days[0]
+
+    @property
+    def last_day(self) -> date:
+        return self._days[-1]
+
+    def securities(self, board: str) -> list[Row]:
+        return [
+            {
+                "SECID": sec.ticker,
+                "LOTSIZE": 1 if sec.board == _ETF_BOARD else 10,
+                "ISIN": f"RU{n:09d}0",
+                "BOARDID": sec.board,
+                "SECTYPE": sec.type,
+                "INSTRID": "EQTF" if sec.board == _ETF_BOARD else "EQIN",
+            }
+            for n, sec in enumerate(self._securities)
+            if sec.board == board
+        ]
+
+    def index_tickers(self, index: str) -> list[Row]:
+        return [
+            {
+                "ticker": sec.ticker,
+                "from": str(self._candles(sec.ticker)[0].day),
+                "till": str(self.last_day),
+                "tradingsession": 3,
+            }
+            for sec in self._securities
+            if sec.board == _SHARES_BOARD and sec.sector == index
+        ]
+
+    def candle_borders(self) -> list[Row]:
+        return [
+            {
+                "begin": f"{self.first_day} 00:00:00",
+                "end": f"{self.last_day} 00:00:00",
+                "board_group_id": 57,
+                "interval": interval,
+            }
+            for interval in (_MINUTE_INTERVAL, _DAY_INTERVAL)
+        ]
+
+    def candles(self, ticker: str, start: date, end: date) -> list[Row]:
+        candles = self._candles(ticker)
+        first = bisect.bisect_left(candles, start, key=lambda candle: candle.day)
+        last = bisect.bisect_right(candles, end, key=lambda candle: candle.day)
+
+        return [
+            {
+                "open": candle.open,
+                "close": candle.close,
+                "high": candle.high,
+                "low": candle.low,
+                "value": candle.turnover,
+                "volume": round(candle.turnover / candle.close),
+                "begin": f"{candle.day} 00:00:00",
+                "end": f"{candle.day} 23:59:59",
+            }
+            for candle in candles[first:last]
+        ]
+
+    def snapshot(self, board: str, day: date) -> list[Row]:
+        rows: list[Row] = []
+
+        for sec in self._securities:
+            if sec.board != board:
+                continue
+
+            candles = self._candles(sec.ticker)
+            pos = bisect.bisect_left(candles, day, key=lambda candle: candle.day)
+
+            if pos < len(candles) and (candle := candles[pos]).day == day:
+                rows.append(
+                    {
+                        "SECID": sec.ticker,
+                        "TRADEDATE": str(day),
+                        "OPEN": candle.open,
+                        "CLOSE": candle.close,
+                        "HIGH": candle.high,
+                        "LOW": candle.low,
+                        "VALUE": candle.turnover,
+                    }
+                )
+
+        return rows
+
+    def _candles(self, ticker: str) -> list[_Candle]:
+        if (candles := self._history.get(ticker)) is None:
+            candles = self._history[ticker] = self._generate(ticker)
+
+        return candles
+
+    def _generate(self, ticker: str) -> list[_Candle]:
+        rng = random.Random(f"{self._knobs.seed}:{ticker}")  # noqa: S311
+        days = self._days
+
+        if rng.random() < _LATE_LISTING_SHARE:
+            days = days[rng.randrange(len(days) // 2) :]
+
+        close = rng.uniform(10, 5000)
+        candles: list[_Candle] = []
+
+        for day in days:
+            open_ = max(_MIN_PRICE, close * (1 + rng.gauss(0, _GAP_VOLATILITY)))
+            close = max(_MIN_PRICE, open_ * (1 + rng.gauss(_DAILY_DRIFT, _DAILY_VOLATILITY)))
+            candles.append(
+                _Candle(
+                    day=day,
+                    open=round(open_, 4),
+                    close=round(close, 4),
+                    high=round(max(open_, close) * (1 + abs(rng.gauss(0, _RANGE_VOLATILITY))), 4),
+                    low=round(max(_MIN_PRICE, min(open_, close) * (1 - abs(rng.gauss(0, _RANGE_VOLATILITY)))), 4),
+                    turnover=round(rng.lognormvariate(_TURNOVER_MU, _TURNOVER_SIGMA), 2),
+                )
+            )
+
+        return candles
+
+
+def _make_securities(knobs: Knobs) -> list[_Security]:
+    rng = random.Random(knobs.seed)  # noqa: S311
+    sectors = list(securities.SectorIndex)
+    secs: list[_Security] = []
+
+    for n in range(knobs.securities):
+        ticker = _ticker(n)
+        sector = rng.choice(sectors)
+
+        match rng.random():
+            case share if share < _ETF_SHARE:
+                secs.append(_Security(ticker, _ETF_BOARD, _ETF_TYPE, sector))
+            case share if share < _ETF_SHARE + _PREFERRED_SHARE:
+                secs.append(_Security(f"{ticker}P", _SHARES_BOARD, _PREFERRED_TYPE, sector))
+            case _:
+                secs.append(_Security(ticker, _SHARES_BOARD, _ORDINARY_TYPE, sector))
+
+    return secs
+
+
+def _ticker(n: int) -> str:
+    letters: list[str] = []
+
+    for _ in range(_TICKER_LEN):
+        n, pos = divmod(n, len(string.ascii_uppercase))
+        letters.append(string.ascii_uppercase[pos])
+
+    return "".join(reversed(letters))
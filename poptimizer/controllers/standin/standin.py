@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import random
+from datetime import date
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Final, NamedTuple
+
+from aiohttp import typedefs, web
+
+from poptimizer.controllers.standin import market
+
+if TYPE_CHECKING:
+    from pydantic import HttpUrl
+
+_CANDLES_PAGE: Final = 500
+_HISTORY_PAGE: Final = 100
+_TICKERS_PAGE: Final = 100
+_RETRY_AFTER: Final = "1"
+
+
+class Faults(NamedTuple):
+    error_rate: float = 0
+    throttle_rate: float = 0
+    seed: int = 0
+
+
+class StandIn:
+    """Заменитель MOEX ISS с синтетическим рынком для нагрузочных тестов.
+
+    Отвечает на запросы aiomoex и обработчиков: свечи и их границы, бумаги режима торгов, снимки торгов
+    режима за дату и состав отраслевых индексов. Заданная доля запросов получает 5xx или 429.
+    """
+
+    def __init__(self, synthetic: market.Market, faults: Faults) -> None:
+        self._market = synthetic
+        self._faults = faults
+        self._rng = random.Random(faults.seed)  # noqa: S311
+
+    def __call__(self) -> web.Application:
+        app = web.Application(middlewares=[self._inject_faults])
+        app.router.add_get(
+            "/iss/engines/{engine}/markets/{market}/securities/{security}/candles.json",
+            self._candles,
+        )
+        app.router.add_get(
+            "/iss/engines/{engine}/markets/{market}/securities/{security}/candleborders.json",
+            self._candle_borders,
+        )
+        app.router.add_get(
+            "/iss/engines/{engine}/markets/{market}/boards/{board}/securities.json",
+            self._securities,
+        )
+        app.router.add_get(
+            "/iss/history/engines/{engine}/markets/{market}/boards/{board}/securities.json",
+            self._snapshot,
+        )
+        app.router.add_get(
+            "/iss/statistics/engines/{engine}/markets/index/analytics/{index}/tickers.json",
+            self._index_tickers,
+        )
+
+        return app
+
+    @web.middleware
+    async def _inject_faults(self, request: web.Request, handler: typedefs.Handler) -> web.StreamResponse:
+        fault = self._rng.random()
+
+        if fault < self._faults.error_rate:
+            return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE)
+
+        if fault < self._faults.error_rate + self._faults.throttle_rate:
+            return web.Response(status=HTTPStatus.TOO_MANY_REQUESTS, headers={"Retry-After": _RETRY_AFTER})
+
+        return await handler(request)
+
+    async def _candles(self, request: web.Request) -> web.Response:
+        rows = self._market.candles(
+            request.match_info["security"],
+            _day(request.query.get("from"), self._market.first_day),
+            _day(request.query.get("till"), self._market.last_day),
+        )
+        start = _start(request)
+
+        return _respond({"candles": rows[start : start + _CANDLES_PAGE]})
+
+    async def _candle_borders(self, request: web.Request) -> web.Response:  # noqa: ARG002
+        return _respond({"borders": self._market.candle_borders()})
+
+    async def _securities(self, request: web.Request) -> web.Response:
+        return _respond({"securities": self._market.securities(request.match_info["board"])})
+
+    async def _snapshot(self, request: web.Request) -> web.Response:
+        rows = self._market.snapshot(
+            request.match_info["board"],
+            _day(request.query.get("date"), self._market.last_day),
+        )
+        start = _start(request)
+
+        return _respond(
+            {
+                "history": rows[start : start + _HISTORY_PAGE],
+                "history.cursor": [{"INDEX": start, "TOTAL": len(rows), "PAGESIZE": _HISTORY_PAGE}],
+            }
+        )
+
+    async def _index_tickers(self, request: web.Request) -> web.Response:
+        rows = self._market.index_tickers(request.match_info["index"])
+        start = _start(request)
+
+        return _respond({"tickers": rows[start : start + _TICKERS_PAGE]})
+
+
+class Server:
+    def __init__(self, url: HttpUrl, stand_in: StandIn) -> None:
+        self._lgr = logging.getLogger()
+        self._app = stand_in
+        self._url = url
+
+    async def run(self) -> None:
+        runner = web.AppRunner(self._app(), handle_signals=False, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, self._url.host, self._url.port)
+
+        await site.start()
+
+        self._lgr.info("MOEX ISS stand-in started on %s - press CTRL+C to quit", self._url)
+
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            await runner.cleanup()
+            self._lgr.info("MOEX ISS stand-in shutdown finished")
+
+
+def _day(value: str | None, default: date) -> date:
+    if not value:
+        return default
+
+    try:
+        return date.fromisoformat(value)
+    except ValueError as err:
+        raise web.HTTPBadRequest(reason=f"invalid date {value}") from err
+
+
+def _start(request: web.Request) -> int:
+    try:
+        return max(0, int(request.query.get("start", 0)))
+    except ValueError as err:
+        raise web.HTTPBadRequest(reason="invalid start") from err
+
+
+def _respond(tables: dict[str, list[market.Row]]) -> web.Response:
+    return web.json_response([{"charsetinfo": {"name": "utf-8"}}, tables])
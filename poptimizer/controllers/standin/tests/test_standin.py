@@ -0,0 +1,80 @@
+from datetime import date
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from poptimizer.controllers.standin import market, standin
+
+_LAST_DAY = date(2025, 1, 31)
+
+
+@pytest.fixture
+def synthetic() -> market.Market:
+    return market.Market(market.Knobs(securities=50, years=2, seed=1), _LAST_DAY)
+
+
+def _client(stand_in: standin.StandIn) -> TestClient:
+    return TestClient(TestServer(stand_in()))
+
+
+def test_market_is_deterministic(synthetic):
+    other = market.Market(market.Knobs(securities=50, years=2, seed=1), _LAST_DAY)
+    ticker = str(synthetic.securities("TQBR")[0]["SECID"])
+
+    assert synthetic.securities("TQBR") == other.securities("TQBR")
+    assert synthetic.candles(ticker, synthetic.first_day, _LAST_DAY) == other.candles(
+        ticker,
+        synthetic.first_day,
+        _LAST_DAY,
+    )
+
+
+def test_candles_are_consistent(synthetic):
+    ticker = str(synthetic.securities("TQBR")[0]["SECID"])
+    candles = synthetic.candles(ticker, date(2024, 1, 1), date(2024, 12, 31))
+
+    assert candles
+    for candle in candles:
+        assert candle["low"] <= min(candle["open"], candle["close"])
+        assert candle["high"] >= max(candle["open"], candle["close"])
+        assert str(candle["begin"]).startswith("2024")
+
+
+async def test_candles_pages(synthetic):
+    ticker = str(synthetic.securities("TQBR")[0]["SECID"])
+    total = len(synthetic.candles(ticker, synthetic.first_day, _LAST_DAY))
+    rows = 0
+
+    async with _client(standin.StandIn(synthetic, standin.Faults())) as client:
+        while True:
+            resp = await client.get(
+                f"/iss/engines/stock/markets/shares/securities/{ticker}/candles.json",
+                params={"interval": "24", "start": str(rows)},
+            )
+            _, tables = await resp.json()
+            if not (page := tables["candles"]):
+                break
+
+            rows += len(page)
+
+    assert rows == total
+
+
+async def test_snapshot_cursor(synthetic):
+    async with _client(standin.StandIn(synthetic, standin.Faults())) as client:
+        resp = await client.get(
+            "/iss/history/engines/stock/markets/shares/boards/TQBR/securities.json",
+            params={"date": str(_LAST_DAY)},
+        )
+        _, tables = await resp.json()
+
+    assert tables["history.cursor"][0]["TOTAL"] == len(synthetic.snapshot("TQBR", _LAST_DAY))
+    assert {row["TRADEDATE"] for row in tables["history"]} == {str(_LAST_DAY)}
+
+
+async def test_faults(synthetic):
+    async with _client(standin.StandIn(synthetic, standin.Faults(throttle_rate=1))) as client:
+        resp = await client.get("/iss/engines/stock/markets/shares/boards/TQBR/securities.json")
+
+    assert resp.status == 429
+    assert resp.headers["Retry-After"] == "1"
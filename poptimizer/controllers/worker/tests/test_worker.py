@@ -0,0 +1,62 @@
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from poptimizer import errors
+from poptimizer.controllers.worker import worker
+from poptimizer.domain import domain
+from poptimizer.domain.evolve import evolve
+
+
+class _FakeQueue:
+    def __init__(self, *jobs: evolve.TrainingJob) -> None:
+        self._jobs = list(jobs)
+        self.completed: list[evolve.TrainingJob] = []
+
+    @property
+    def ttl(self) -> timedelta:
+        return timedelta(minutes=1)
+
+    async def claim(self, worker: str) -> evolve.TrainingJob | None:  # noqa: ARG002
+        if not self._jobs:
+            raise asyncio.CancelledError
+
+        return self._jobs.pop(0)
+
+    async def extend(self, job: evolve.TrainingJob, worker: str) -> bool:  # noqa: ARG002
+        return True
+
+    async def complete(self, job: evolve.TrainingJob, worker: str) -> bool:  # noqa: ARG002
+        self.completed.append(job)
+
+        return True
+
+
+class _FakeHandler:
+    async def __call__(self, ctx: object, job: evolve.TrainingJob) -> None:  # noqa: ARG002
+        if job.uid == "broken":
+            raise errors.AdapterError("broken")
+
+        if job.uid == "crash":
+            raise RuntimeError("crash")
+
+        job.trained()
+
+
+def _job(uid: str) -> evolve.TrainingJob:
+    return evolve.TrainingJob(rev=domain.Revision(uid=domain.UID(uid), ver=domain.Version(1)), day=date(2025, 1, 27))
+
+
+async def test_reports_trained_and_broken(repo, monkeypatch):
+    monkeypatch.setattr(worker, "_IDLE_INTERVAL", timedelta())
+    queue = _FakeQueue(_job("broken"), _job("crash"), _job("good"))
+
+    with pytest.raises(asyncio.CancelledError):
+        await worker.Worker(repo, queue, _FakeHandler()).run()
+
+    assert [(job.uid, job.status, job.error) for job in queue.completed] == [
+        ("broken", evolve.JobStatus.FAILED, "broken"),
+        ("crash", evolve.JobStatus.FAILED, "crash"),
+        ("good", evolve.JobStatus.TRAINED, ""),
+    ]
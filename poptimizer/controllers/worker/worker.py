@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import timedelta
+from typing import Final, Protocol
+
+from poptimizer import errors
+from poptimizer.adapters import logger, storage
+from poptimizer.controllers.bus import uow
+from poptimizer.domain.evolve import evolve
+from poptimizer.use_cases.evolve import evolve as evolve_use_cases
+
+_IDLE_INTERVAL: Final = timedelta(seconds=10)
+
+
+class Queue(Protocol):
+    @property
+    def ttl(self) -> timedelta: ...
+
+    async def claim(self, worker: str) -> evolve.TrainingJob | None: ...
+
+    async def extend(self, job: evolve.TrainingJob, worker: str) -> bool: ...
+
+    async def complete(self, job: evolve.TrainingJob, worker: str) -> bool: ...
+
+
+class JobHandler(Protocol):
+    async def __call__(self, ctx: evolve_use_cases.Ctx, job: evolve.TrainingJob) -> None: ...
+
+
+class Worker:
+    """Обучает модели из общей очереди - воркеров можно запускать на нескольких машинах."""
+
+    def __init__(self, repo: storage.Repo, queue: Queue, handler: JobHandler) -> None:
+        self._lgr = logging.getLogger()
+        self._repo = repo
+        self._queue = queue
+        self._handler = handler
+        self._name = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def run(self) -> None:
+        self._lgr.info("Worker %s started", self._name)
+
+        while True:
+            try:
+                trained = await self._claim_and_train()
+            except* errors.POError as err:
+                self._lgr.warning("Training job failed - %s", logger.get_root_error(err))
+                trained = False
+
+            if not trained:
+                await asyncio.sleep(_IDLE_INTERVAL.total_seconds())
+
+    async def _claim_and_train(self) -> bool:
+        if (job := await self._queue.claim(self._name)) is None:
+            return False
+
+        self._lgr.info("Training job %s claimed - attempt %d", job.uid, job.attempts)
+
+        async with asyncio.TaskGroup() as tg:
+            heartbeat = tg.create_task(self._heartbeat(job))
+
+            try:
+                async with uow.UOW(self._repo) as ctx:
+                    await self._handler(ctx, job)
+            except Exception as err:  # noqa: BLE001
+                # Иначе задание останется в очереди и будет повторяться с той же ошибкой
+                job.failed(str(logger.get_root_error(err)), None)
+                self._lgr.warning("Training job %s failed - %s", job.uid, job.error)
+            finally:
+                heartbeat.cancel()
+
+        if not await self._queue.complete(job, self._name):
+            self._lgr.warning("Training job %s lease lost - result not reported", job.uid)
+
+        return True
+
+    async def _heartbeat(self, job: evolve.TrainingJob) -> None:
+        while True:
+            await asyncio.sleep(self._queue.ttl.total_seconds() / 3)
+
+            try:
+                extended = await self._queue.extend(job, self._name)
+            except errors.AdapterError as err:
+                self._lgr.warning("Can't extend training job %s lease - %s", job.uid, err)
+            else:
+                if not extended:
+                    self._lgr.warning("Training job %s lease lost", job.uid)
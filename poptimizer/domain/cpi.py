@@ -25,7 +25,10 @@ class CPI(domain.Entity):
         list[Row],
         AfterValidator(domain.sorted_by_day_validator),
     ] = Field(default_factory=list[Row])
+    # Хеш исходного файла, из которого получены данные
+    digest: str = ""
 
-    def update(self, update_day: domain.Day, rows: list[Row]) -> None:
+    def update(self, update_day: domain.Day, rows: list[Row], digest: str = "") -> None:
         self.day = update_day
         self.df = rows
+        self.digest = digest
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import statistics
+from datetime import datetime
 from enum import StrEnum
 from typing import Final, Self, cast
 
@@ -9,6 +10,7 @@ from pydantic import (
     Field,
     FiniteFloat,
     NonNegativeFloat,
+    NonNegativeInt,
     PositiveInt,
     computed_field,
     model_validator,
@@ -52,8 +54,6 @@ class Model(domain.Entity):
     alfa_diff: Stats = Field(default_factory=Stats)
     llh: list[FiniteFloat] = Field(default_factory=list[FiniteFloat])
     llh_diff: Stats = Field(default_factory=Stats)
-    mean: list[list[FiniteFloat]] = Field(default_factory=list[list[FiniteFloat]])
-    cov: list[list[FiniteFloat]] = Field(default_factory=list[list[FiniteFloat]])
     risk_tolerance: FiniteFloat = Field(default=0, ge=0, le=1)
 
     @model_validator(mode="after")
@@ -61,20 +61,6 @@ class Model(domain.Entity):
         if len(self.llh) != len(self.alfa):
             raise ValueError("alfa and llh mismatch")
 
-        n = len(self.tickers)
-
-        if len(self.mean) != n:
-            raise ValueError("invalid mean")
-
-        if any(len(row) != 1 for row in self.mean):
-            raise ValueError("invalid mean")
-
-        if len(self.cov) != n:
-            raise ValueError("invalid cov")
-
-        if any(len(row) != n for row in self.cov):
-            raise ValueError("invalid cov")
-
         return self
 
     def __str__(self) -> str:
@@ -113,6 +99,46 @@ class Model(domain.Entity):
         return model.make_child(model1, model2, scale).genes
 
 
+class ModelForecast(domain.Entity):
+    tickers: domain.Tickers = Field(default_factory=tuple)
+    forecast_days: PositiveInt = 1
+    mean: list[list[FiniteFloat]] = Field(default_factory=list[list[FiniteFloat]])
+    cov: list[list[FiniteFloat]] = Field(default_factory=list[list[FiniteFloat]])
+
+    @model_validator(mode="after")
+    def _match_length(self) -> Self:
+        n = len(self.tickers)
+
+        if len(self.mean) != n:
+            raise ValueError("invalid mean")
+
+        if any(len(row) != 1 for row in self.mean):
+            raise ValueError("invalid mean")
+
+        if len(self.cov) != n:
+            raise ValueError("invalid cov")
+
+        if any(len(row) != n for row in self.cov):
+            raise ValueError("invalid cov")
+
+        return self
+
+    def update(
+        self,
+        model: Model,
+        mean: list[list[float]],
+        cov: list[list[float]],
+    ) -> None:
+        self.day = model.day
+        self.tickers = model.tickers
+        self.forecast_days = model.forecast_days
+        self.mean = mean
+        self.cov = cov
+
+    def is_actual(self, model: Model) -> bool:
+        return (self.day, self.tickers, self.forecast_days) == (model.day, model.tickers, model.forecast_days)
+
+
 class State(StrEnum):
     EVAL_NEW_BASE_MODEL = "evaluating new base model"
     EVAL_MODEL = "evaluating model"
@@ -132,6 +158,7 @@ class Evolution(domain.Entity):
     test_days: float = Field(default=1, ge=1)
     minimal_returns_days: int = _INITIAL_MINIMAL_RETURNS_DAYS
     load_factor: NonNegativeFloat = 0
+    jobs: list[domain.UID] = Field(default_factory=list[domain.UID])
 
     @model_validator(mode="after")
     def _match_length(self) -> Self:
@@ -157,3 +184,42 @@ class Evolution(domain.Entity):
         self.base_model_uid = model.uid
         self.alfa = model.alfa
         self.llh = model.llh
+
+
+class JobStatus(StrEnum):
+    QUEUED = "queued"
+    TRAINED = "trained"
+    FAILED = "failed"
+
+
+class TrainingJob(domain.Entity):
+    tickers: domain.Tickers = Field(default_factory=tuple)
+    forecast_days: PositiveInt = 1
+    test_days: PositiveInt = 1
+    state: State = State.EVAL_NEW_BASE_MODEL
+    good: bool = False
+    status: JobStatus = JobStatus.QUEUED
+    error: str = ""
+    minimal_returns_days: int | None = None
+    worker: str = ""
+    lease_until: datetime | None = None
+    attempts: NonNegativeInt = 0
+
+    def enqueue(self, evolution: Evolution, *, good: bool) -> None:
+        self.day = evolution.day
+        self.tickers = evolution.tickers
+        self.forecast_days = evolution.forecast_days
+        self.test_days = int(evolution.test_days)
+        self.state = evolution.state
+        self.good = good
+        self.status = JobStatus.QUEUED
+        self.error = ""
+        self.minimal_returns_days = None
+
+    def trained(self) -> None:
+        self.status = JobStatus.TRAINED
+
+    def failed(self, error: str, minimal_returns_days: int | None) -> None:
+        self.status = JobStatus.FAILED
+        self.error = error
+        self.minimal_returns_days = minimal_returns_days
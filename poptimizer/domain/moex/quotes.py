@@ -1,11 +1,15 @@
+import math
 from datetime import date
-from typing import Annotated
+from typing import Annotated, Final
 
 from pydantic import AfterValidator, Field
 
 from poptimizer import errors
 from poptimizer.domain import domain
 
+# Свечи и итоги торгов режима могут расходиться в округлении цен
+_PRICE_TOLERANCE: Final = 1e-6
+
 
 class Row(domain.Row):
     day: domain.Day = Field(alias="begin")
@@ -15,6 +19,18 @@ class Row(domain.Row):
     low: float = Field(alias="low", gt=0)
     turnover: float = Field(alias="value", ge=0)
 
+    def same_prices(self, other: Row) -> bool:
+        """Оборот не сравнивается - в итогах торгов он учитывается только по одному режиму."""
+        return self.day == other.day and all(
+            math.isclose(price, other_price, rel_tol=_PRICE_TOLERANCE)
+            for price, other_price in (
+                (self.open, other.open),
+                (self.close, other.close),
+                (self.high, other.high),
+                (self.low, other.low),
+            )
+        )
+
 
 class Quotes(domain.Entity):
     df: Annotated[
@@ -33,7 +49,7 @@ class Quotes(domain.Entity):
 
         last = self.df[-1]
 
-        if last != (first := rows[0]):
+        if not last.same_prices(first := rows[0]):
             raise errors.DomainError(f"{self.uid} data mismatch {last} vs {first}")
 
         self.df.extend(rows[1:])
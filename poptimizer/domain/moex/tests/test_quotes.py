@@ -121,6 +121,22 @@ def test_quotes_update_mismatch():
         table.update(update_day, rows)
 
 
+def test_quotes_update_ignores_turnover():
+    table = quotes.Quotes(
+        day=date(2025, 1, 27),
+        rev=domain.Revision(uid=domain.UID("uid"), ver=domain.Version(42)),
+        df=[quotes.Row(day=date(2025, 1, 27), open=1.0, close=1.0, high=1.0, low=1.0, turnover=10.0)],
+    )
+    table.update(
+        date(2025, 1, 28),
+        [
+            quotes.Row(day=date(2025, 1, 27), open=1.0, close=1.0, high=1.0, low=1.0, turnover=5.0),
+            quotes.Row(day=date(2025, 1, 28), open=1.0, close=1.0, high=1.0, low=1.0, turnover=0.0),
+        ],
+    )
+    assert [row.day for row in table.df] == [date(2025, 1, 27), date(2025, 1, 28)]
+
+
 def test_quotes_last_row_date():
     table = quotes.Quotes(
         day=date(2025, 1, 27),
@@ -19,4 +19,7 @@ class UseCasesError(POError): ...
 class AdapterError(POError): ...
 
 
+class VersionConflictError(AdapterError): ...
+
+
 class ControllersError(POError): ...
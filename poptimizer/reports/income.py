@@ -2,7 +2,7 @@ import logging
 from typing import Final
 
 from poptimizer import errors
-from poptimizer.adapters import mongo
+from poptimizer.adapters import storage
 from poptimizer.domain import cpi
 from poptimizer.domain.funds import funds
 
@@ -15,7 +15,7 @@ _ROWS_PARAMS: Final = [
 
 
 async def report(
-    repo: mongo.Repo,
+    repo: storage.Repo,
     investor: funds.Investor,
     months: int,
 ) -> None:
@@ -1,11 +1,11 @@
 import matplotlib.pyplot as plt
 import pandas as pd
 
-from poptimizer.adapters import mongo
+from poptimizer.adapters import storage
 from poptimizer.domain.evolve import evolve
 
 
-async def plot(repo: mongo.Repo) -> None:
+async def plot(repo: storage.Repo) -> None:
     dots = [
         (model.alfa_mean, model.llh_mean, model.ver * 10) async for model in repo.get_all(evolve.Model) if model.ver
     ]
@@ -6,7 +6,7 @@ from typing import Final
 from reportlab.pdfgen.canvas import Canvas
 
 from poptimizer import consts
-from poptimizer.adapters import mongo
+from poptimizer.adapters import storage
 from poptimizer.domain import domain
 from poptimizer.domain.funds import funds
 from poptimizer.domain.moex import quotes
@@ -23,7 +23,7 @@ _THIRD_BLOCK_HEIGHT: Final = style.BLANK_HEIGHT * 0
 
 
 async def _price_for_day(
-    repo: mongo.Repo,
+    repo: storage.Repo,
     pos: portfolio.Position,
     day: domain.Day,
 ) -> None:
@@ -36,19 +36,19 @@ async def _price_for_day(
 
 
 async def _update_fund(
-    repo: mongo.Repo,
+    repo: storage.Repo,
     day: domain.Day,
     dividends: float,
     inflows: dict[funds.Investor, float],
 ) -> tuple[funds.Fund, portfolio.Portfolio]:
     async with asyncio.TaskGroup() as tg:
-        port = await repo.get(portfolio.Portfolio)
+        port = await repo.get(portfolio.Portfolio, for_update=True)
         port.day = day
 
         for pos in port.positions:
             tg.create_task(_price_for_day(repo, pos, day))
 
-        fund = await repo.get(funds.Fund)
+        fund = await repo.get(funds.Fund, for_update=True)
 
     match len(fund.rows):
         case 0:
@@ -70,7 +70,7 @@ def _make_report_files_path(day: domain.Day) -> tuple[Path, Path]:
 
 
 async def _make_report(
-    repo: mongo.Repo,
+    repo: storage.Repo,
     fund: funds.Fund,
     port: portfolio.Portfolio,
 ) -> Path:
@@ -123,7 +123,7 @@ async def _make_report(
 
 
 async def report(
-    repo: mongo.Repo,
+    repo: storage.Repo,
     day: domain.Day,
     dividends: float,
     inflows: dict[funds.Investor, float],
@@ -4,11 +4,11 @@ from collections import Counter
 from datetime import timedelta
 from typing import Any
 
-from poptimizer.adapters import mongo
+from poptimizer.adapters import storage
 from poptimizer.domain.evolve import evolve
 
 
-async def report(repo: mongo.Repo) -> None:
+async def report(repo: storage.Repo) -> None:
     lgr = logging.getLogger()
 
     evolution = await repo.get(evolve.Evolution)
@@ -0,0 +1,98 @@
+import logging
+from collections.abc import Iterable
+from datetime import timedelta
+from pathlib import Path
+from typing import Final
+
+from poptimizer.adapters import trace
+
+_BAR_WIDTH: Final = 40
+_MIN_TOTAL: Final = 1e-3
+
+
+def report(path: Path, trace_id: str, root: str) -> None:
+    lgr = logging.getLogger()
+
+    if not path.exists() or (selected := _select(trace.read(path), trace_id, root)) is None:
+        lgr.warning("No %s traces in %s", trace_id or root, path)
+
+        return
+
+    start = selected.start
+    total = max(selected.end - start, _MIN_TOTAL)
+    depths = _depths(selected.spans)
+
+    lgr.info(
+        "Trace %s %s - %s, %d spans",
+        selected.trace_id,
+        selected.root,
+        timedelta(seconds=round(total)),
+        len(selected.spans),
+    )
+
+    for span in sorted(selected.spans, key=lambda span: span.start):
+        offset = span.start - start
+        lgr.info(
+            f"{_bar(offset, span.duration, total)} {offset:>8.1f}s {span.duration:>8.1f}s "
+            f"{'  ' * depths[span.span_id]}{_name(span)}"
+        )
+
+    lgr.info("Critical path")
+
+    for span in selected.critical_path():
+        lgr.info(
+            f"{span.duration / total:>7.2%} {span.queued:>8.1f}s queued {span.duration - span.queued:>8.1f}s running "
+            f"{_name(span)}"
+        )
+
+
+def _select(traces: Iterable[trace.Trace], trace_id: str, root: str) -> trace.Trace | None:
+    selected = None
+
+    for candidate in traces:
+        if trace_id and candidate.trace_id == trace_id:
+            return candidate
+
+        if not trace_id and candidate.root == root:
+            selected = candidate
+
+    return selected
+
+
+def _depths(spans: list[trace.Span]) -> dict[str, int]:
+    parents = {span.span_id: span.parent_id for span in spans}
+    depths: dict[str, int] = {}
+
+    def depth(span_id: str) -> int:
+        if span_id not in parents:
+            return -1
+
+        if span_id not in depths:
+            depths[span_id] = depth(parents[span_id]) + 1
+
+        return depths[span_id]
+
+    return {span_id: depth(span_id) for span_id in parents}
+
+
+def _bar(offset: float, duration: float, total: float) -> str:
+    begin = min(int(offset / total * _BAR_WIDTH), _BAR_WIDTH - 1)
+    length = max(1, round(duration / total * _BAR_WIDTH))
+
+    return (" " * begin + "#" * length)[:_BAR_WIDTH].ljust(_BAR_WIDTH)
+
+
+def _name(span: trace.Span) -> str:
+    match span.kind:
+        case trace.SpanKind.HANDLER:
+            name = f"{span.name} <- {span.event}"
+        case trace.SpanKind.COMMIT:
+            name = f"{span.name} commit"
+
+    if span.attempts > 1:
+        name = f"{name} x{span.attempts}"
+
+    if span.failed:
+        name = f"{name} failed"
+
+    return name
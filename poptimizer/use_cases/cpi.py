@@ -9,10 +9,10 @@ from poptimizer.domain import cpi
 from poptimizer.use_cases import handler
 
 if TYPE_CHECKING:
-    import aiohttp
     from openpyxl.worksheet import worksheet
 
 _URL: Final = "https://www.cbr.ru/Content/Document/File/108632/indicators_cpd.xlsx"
+_TTL: Final = timedelta(hours=12)
 _SHEET_NAME: Final = "Лист1"
 _FIRST_DATE_CELL: Final = "B1"
 _FIRST_DATE_VALUE: Final = date(year=2002, month=1, day=1)
@@ -27,26 +27,23 @@ _MAX_MONTH_DAYS: Final = 31
 
 
 class CPIHandler:
-    def __init__(self, http_session: aiohttp.ClientSession) -> None:
-        self._http_session = http_session
+    def __init__(self, http_cache: handler.HTTPCache) -> None:
+        self._http_cache = http_cache
 
     async def __call__(self, ctx: handler.Ctx, msg: handler.NewDataPublished) -> None:
+        xlsx_file = await self._http_cache.get(_URL, _TTL)
+
         table = await ctx.get_for_update(cpi.CPI)
 
-        xlsx_file = await self._download()
-        row = _parse_rows(xlsx_file)
+        # Данные не изменились - обновляется только дата без разбора файла
+        if xlsx_file.unchanged and table.digest == xlsx_file.digest:
+            table.day = msg.day
 
-        table.update(msg.day, row)
+            return
 
-    async def _download(self) -> io.BytesIO:
-        async with (
-            handler.wrap_http_err("can't download CPI data"),
-            self._http_session.get(_URL) as resp,
-        ):
-            if not resp.ok:
-                raise errors.UseCasesError(f"bad CPI respond status {resp.reason}")
+        row = _parse_rows(io.BytesIO(xlsx_file.body))
 
-            return io.BytesIO(await resp.read())
+        table.update(msg.day, row, xlsx_file.digest)
 
 
 def _parse_rows(xlsx: io.BytesIO) -> list[cpi.Row]:
@@ -1,6 +1,5 @@
 import asyncio
 from collections.abc import Iterator
-from datetime import date
 
 from poptimizer import consts
 from poptimizer.domain import domain
@@ -12,25 +11,16 @@ from poptimizer.use_cases import handler
 class DivHandler:
     async def __call__(self, ctx: handler.Ctx, msg: handler.SecuritiesUpdated) -> None:
         sec_table = await ctx.get(securities.Securities)
+        tickers = [domain.UID(sec.ticker) for sec in sec_table.df]
 
         async with asyncio.TaskGroup() as tg:
-            for sec in sec_table.df:
-                tg.create_task(self._update_one(ctx, msg.day, domain.UID(sec.ticker)))
+            div_task = tg.create_task(ctx.get_many_for_update(div.Dividends, tickers))
+            raw_task = tg.create_task(ctx.get_many(raw.DivRaw, tickers))
 
-        ctx.publish(handler.DivUpdated(day=msg.day))
-
-    async def _update_one(
-        self,
-        ctx: handler.Ctx,
-        update_day: date,
-        ticker: domain.UID,
-    ) -> None:
-        div_table = await ctx.get_for_update(div.Dividends, ticker)
-        raw_table = await ctx.get(raw.DivRaw, ticker)
+        for div_table, raw_table in zip(await div_task, await raw_task, strict=True):
+            div_table.update(msg.day, list(_prepare_rows(raw_table.df)))
 
-        rows = list(_prepare_rows(raw_table.df))
-
-        div_table.update(update_day, rows)
+        ctx.publish(handler.DivUpdated(day=msg.day))
 
 
 def _prepare_rows(raw_list: list[raw.Row]) -> Iterator[div.Row]:
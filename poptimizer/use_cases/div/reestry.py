@@ -24,10 +24,67 @@ _RE_DIV: Final = re.compile(r"(\d.*)[\xA0\s](руб|USD|\$)")
 _DIV_TRANSLATE: Final = str.maketrans({",": ".", " ": ""})
 
 
+class _LinkIndex:
+    """Ссылки на страницы эмитентов с главной страницы сайта.
+
+    Страница загружается при первом поиске и повторно только после промаха, но не чаще раза за день обновления.
+    Одновременные промахи ждут одну общую загрузку.
+    """
+
+    def __init__(self, http_client: aiohttp.ClientSession) -> None:
+        self._http_client = http_client
+        self._lock = asyncio.Lock()
+        self._loaded: domain.Day | None = None
+        self._links: list[tuple[str, str]] = []
+        self._urls: dict[str, str] = {}
+
+    async def find(self, ticker_base: str, update_day: domain.Day) -> str:
+        if (url := self._find(ticker_base)) is not None:
+            return url
+
+        async with self._lock:
+            if self._loaded != update_day:
+                await self._load(ticker_base)
+                self._loaded = update_day
+
+        if (url := self._find(ticker_base)) is not None:
+            return url
+
+        raise errors.UseCasesError(f"{ticker_base} dividends not found")
+
+    def _find(self, ticker_base: str) -> str | None:
+        if (url := self._urls.get(ticker_base)) is not None:
+            return url
+
+        for link_text, href in self._links:
+            if ticker_base in link_text or ticker_base.lower() in link_text:
+                self._urls[ticker_base] = _URL + href
+
+                return self._urls[ticker_base]
+
+        return None
+
+    async def _load(self, ticker_base: str) -> None:
+        async with (
+            handler.wrap_http_err(f"can't find url for {ticker_base}"),
+            self._http_client.get(_URL) as resp,
+        ):
+            if not resp.ok:
+                raise errors.UseCasesError(f"bad respond status {resp.reason}")
+
+            html_page = await resp.text()
+
+        links: list[html.HtmlElement] = html.document_fromstring(html_page).xpath("//*/a")  # type: ignore[reportUnknownMemberType]
+
+        self._links = [(link.text_content(), link.attrib["href"]) for link in links if "href" in link.attrib]
+        self._urls.clear()
+
+
 class ReestryHandler:
     def __init__(self, http_client: aiohttp.ClientSession) -> None:
         self._lgr = logging.getLogger()
         self._http_client = http_client
+        self._links = _LinkIndex(http_client)
 
     async def __call__(self, ctx: handler.Ctx, msg: handler.DivStatusUpdated) -> None:
         status_table = await ctx.get(status.DivStatus)
@@ -48,7 +105,7 @@ class ReestryHandler:
             return
 
         try:
-            rows = await self._prepare_rows(ctx, status_row)
+            rows = await self._prepare_rows(ctx, update_day, status_row)
         except errors.UseCasesError as err:
             self._lgr.warning("can't prepare dividend for %s - %s", status_row.ticker, err)
 
@@ -56,33 +113,14 @@ class ReestryHandler:
 
         table.update(update_day, rows)
 
-    async def _prepare_rows(self, ctx: handler.Ctx, row: status.Row) -> list[raw.Row]:
-        url = await self._find_url(row.ticker_base)
+    async def _prepare_rows(self, ctx: handler.Ctx, update_day: domain.Day, row: status.Row) -> list[raw.Row]:
+        url = await self._links.find(row.ticker_base, update_day)
         html_page = await self._load_html(url, row.ticker)
         quotes_table = await ctx.get(quotes.Quotes, domain.UID(row.ticker))
         usd_table = await ctx.get(usd.USD)
 
         return _parse(html_page, 1 + row.preferred, usd_table, quotes_table.df[0].day)
 
-    async def _find_url(self, ticker_base: str) -> str:
-        async with (
-            handler.wrap_http_err(f"can't find url for {ticker_base}"),
-            self._http_client.get(_URL) as resp,
-        ):
-            if not resp.ok:
-                raise errors.UseCasesError(f"bad respond status {resp.reason}")
-
-            html_page = await resp.text()
-
-        links: list[html.HtmlElement] = html.document_fromstring(html_page).xpath("//*/a")  # type: ignore[reportUnknownMemberType]
-
-        for link in links:
-            link_text = link.text_content()
-            if ticker_base in link_text or ticker_base.lower() in link_text:
-                return _URL + link.attrib["href"]
-
-        raise errors.UseCasesError(f"{ticker_base} dividends not found")
-
     async def _load_html(self, url: str, ticker: domain.Ticker) -> str:
         async with (
             handler.wrap_http_err(f"can't load dividends for {ticker}"),
@@ -4,34 +4,33 @@ import logging
 import re
 from collections.abc import AsyncIterator, Iterable
 from datetime import date, datetime, timedelta
-from typing import TYPE_CHECKING, Final, TextIO
+from typing import Final, TextIO
 
-from poptimizer import errors
 from poptimizer.domain import domain
 from poptimizer.domain.div import raw, status
 from poptimizer.domain.moex import securities
 from poptimizer.domain.portfolio import portfolio
 from poptimizer.use_cases import handler
 
-if TYPE_CHECKING:
-    import aiohttp
-
 _URL: Final = "https://web.moex.com/moex-web-icdb-api/api/v1/export/register-closing-dates/csv?separator=1&language=1"
+_TTL: Final = timedelta(hours=1)
 _LOOK_BACK_DAYS: Final = 14
 _DATE_FMT: Final = "%m/%d/%Y %H:%M:%S"
 _RE_TICKER: Final = re.compile(r",\s([A-Z]|[A-Z]{4}|[A-Z]{4}P|[A-Z][0-9])\s\[")
 
 
 class DivStatusHandler:
-    def __init__(self, http_client: aiohttp.ClientSession) -> None:
+    def __init__(self, http_cache: handler.HTTPCache) -> None:
         self._lgr = logging.getLogger()
-        self._http_client = http_client
+        self._http_cache = http_cache
+        # Разобранные строки для последней полученной версии файла
+        self._digest = ""
+        self._rows: list[tuple[str, date]] = []
 
     async def __call__(self, ctx: handler.Ctx, msg: handler.PortfolioUpdated) -> None:
         table = await ctx.get_for_update(status.DivStatus)
 
-        csv_file = await self._download()
-        parsed_rows = self._parse(csv_file)
+        parsed_rows = self._recent(await self._load_rows())
 
         sec_table = await ctx.get(securities.Securities)
         port = await ctx.get(portfolio.Portfolio)
@@ -41,28 +40,20 @@ class DivStatusHandler:
 
         ctx.publish(handler.DivStatusUpdated(day=msg.day))
 
-    async def _download(self) -> TextIO:
-        async with (
-            handler.wrap_http_err("can't load dividends status"),
-            self._http_client.get(_URL) as resp,
-        ):
-            if not resp.ok:
-                raise errors.UseCasesError(f"bad dividends status respond {resp.reason}")
+    async def _load_rows(self) -> list[tuple[str, date]]:
+        csv_file = await self._http_cache.get(_URL, _TTL)
 
-            return io.StringIO(await resp.text(encoding="cp1251"), newline="")
+        if csv_file.digest != self._digest:
+            self._rows = list(_parse(io.StringIO(csv_file.body.decode("cp1251"), newline="")))
+            self._digest = csv_file.digest
 
-    def _parse(
-        self,
-        csv_file: TextIO,
-    ) -> Iterable[tuple[domain.Ticker, date]]:
-        reader = csv.reader(csv_file)
-        next(reader)
+        return self._rows
 
-        for ticker_raw, date_raw, *_ in reader:
-            timestamp = datetime.strptime(date_raw, _DATE_FMT)
-            day = date(timestamp.year, timestamp.month, timestamp.day)
+    def _recent(self, rows: Iterable[tuple[str, date]]) -> Iterable[tuple[domain.Ticker, date]]:
+        look_back = date.today() - timedelta(days=_LOOK_BACK_DAYS)
 
-            if day < date.today() - timedelta(days=_LOOK_BACK_DAYS):
+        for ticker_raw, day in rows:
+            if day < look_back:
                 continue
 
             if (ticker_re := _RE_TICKER.search(ticker_raw)) is None:
@@ -82,6 +73,16 @@ class DivStatusHandler:
                 yield row
 
 
+def _parse(csv_file: TextIO) -> Iterable[tuple[str, date]]:
+    reader = csv.reader(csv_file)
+    next(reader)
+
+    for ticker_raw, date_raw, *_ in reader:
+        timestamp = datetime.strptime(date_raw, _DATE_FMT)
+
+        yield ticker_raw, date(timestamp.year, timestamp.month, timestamp.day)
+
+
 def _status_gen(
     raw_rows: Iterable[tuple[domain.Ticker, date]],
     sec: securities.Securities,
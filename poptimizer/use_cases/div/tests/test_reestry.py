@@ -0,0 +1,80 @@
+import asyncio
+from datetime import date
+from typing import Self
+
+import pytest
+
+from poptimizer import errors
+from poptimizer.use_cases.div import reestry
+
+_PAGE = """
+<html><body>
+<a href="sber/">ПАО Сбербанк SBER</a>
+<a href="gazp/">ПАО Газпром gazp</a>
+<a>Без ссылки LKOH</a>
+</body></html>
+"""
+
+
+class _Response:
+    ok = True
+    reason = "OK"
+
+    async def __aenter__(self) -> Self:
+        await asyncio.sleep(0)
+
+        return self
+
+    async def __aexit__(self, *args: object) -> None: ...
+
+    async def text(self) -> str:
+        return _PAGE
+
+
+class _Client:
+    def __init__(self) -> None:
+        self.requests = 0
+
+    def get(self, url: str) -> _Response:  # noqa: ARG002
+        self.requests += 1
+
+        return _Response()
+
+
+@pytest.fixture
+def client() -> _Client:
+    return _Client()
+
+
+@pytest.fixture
+def index(client) -> reestry._LinkIndex:
+    return reestry._LinkIndex(client)
+
+
+async def test_concurrent_lookups_share_download(client, index):
+    urls = await asyncio.gather(
+        index.find("SBER", date(2025, 1, 27)),
+        index.find("GAZP", date(2025, 1, 27)),
+        index.find("SBER", date(2025, 1, 27)),
+    )
+
+    assert urls == [f"{reestry._URL}sber/", f"{reestry._URL}gazp/", f"{reestry._URL}sber/"]
+    assert client.requests == 1
+
+
+async def test_miss_refreshes_once_per_day(client, index):
+    await index.find("SBER", date(2025, 1, 27))
+
+    with pytest.raises(errors.UseCasesError, match="LKOH dividends not found"):
+        await index.find("LKOH", date(2025, 1, 27))
+
+    assert client.requests == 1
+
+    with pytest.raises(errors.UseCasesError, match="LKOH dividends not found"):
+        await index.find("LKOH", date(2025, 1, 28))
+
+    assert client.requests == 2
+
+    await index.find("SBER", date(2025, 1, 29))
+
+    assert client.requests == 2
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 from typing import TYPE_CHECKING
 
 from pydantic import BaseModel
@@ -112,10 +111,7 @@ class Builder:
         self._day = day
         self._tickers = tickers
 
-        async with asyncio.TaskGroup() as tg:
-            tasks = [tg.create_task(ctx.get(features.Features, domain.UID(ticker))) for ticker in tickers]
-
-        self._cache = [await task for task in tasks]
+        self._cache = await ctx.get_many(features.Features, [domain.UID(ticker) for ticker in tickers])
 
         first_embedding = self._cache[0].embedding
         self._embedding_sizes = {feat: desc.size for feat, desc in first_embedding.items()}
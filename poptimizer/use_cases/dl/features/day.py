@@ -1,5 +1,3 @@
-import asyncio
-
 from poptimizer.domain import domain
 from poptimizer.domain.dl.features import EmbeddingSeqFeatDesc, EmbSeqFeat, Features
 from poptimizer.domain.portfolio import portfolio
@@ -8,18 +6,15 @@ from poptimizer.use_cases import handler
 
 class DayFeatHandler:
     async def __call__(self, ctx: handler.Ctx, msg: handler.IndexFeatUpdated) -> None:
-        async with asyncio.TaskGroup() as tg:
-            port = await ctx.get(portfolio.Portfolio)
+        port = await ctx.get(portfolio.Portfolio)
 
-            for pos in port.positions:
-                tg.create_task(_create_day_feats(ctx, domain.UID(pos.ticker), msg.trading_days))
+        for feat in await ctx.get_many_for_update(Features, [domain.UID(pos.ticker) for pos in port.positions]):
+            _create_day_feats(feat, msg.trading_days)
 
         ctx.publish(handler.DayFeatUpdated(day=msg.day))
 
 
-async def _create_day_feats(ctx: handler.Ctx, ticker: domain.UID, trading_days: domain.TradingDays) -> None:
-    feat = await ctx.get_for_update(Features, ticker)
-
+def _create_day_feats(feat: Features, trading_days: domain.TradingDays) -> None:
     feat.embedding_seq[EmbSeqFeat.WEEK_DAY] = EmbeddingSeqFeatDesc(
         sequence=[trading_days[-n].timetuple().tm_wday for n in reversed(range(1, len(feat.numerical) + 1))],
         size=7,
@@ -1,4 +1,3 @@
-import asyncio
 from typing import TYPE_CHECKING
 
 import numpy as np
@@ -19,21 +18,18 @@ class IndexesFeatHandler:
         indexes = await _load_indexes(ctx, pd.DatetimeIndex(msg.trading_days))
         port = await ctx.get(portfolio.Portfolio)
 
-        async with asyncio.TaskGroup() as tg:
-            for pos in port.positions:
-                tg.create_task(_add_indexes_features(ctx, domain.UID(pos.ticker), indexes))
+        for feat in await ctx.get_many_for_update(
+            features.Features, [domain.UID(pos.ticker) for pos in port.positions]
+        ):
+            _add_indexes_features(feat, indexes)
 
         ctx.publish(handler.IndexFeatUpdated(trading_days=msg.trading_days))
 
 
 async def _load_indexes(ctx: handler.Ctx, df_index: pd.DatetimeIndex) -> list[dict[features.NumFeat, FiniteFloat]]:
-    async with asyncio.TaskGroup() as tg:
-        tasks = [tg.create_task(ctx.get(index.Index, uid)) for uid in index.INDEXES]
-
     indexes: list[pd.DataFrame] = []
 
-    for task in tasks:
-        index_table = await task
+    for index_table in await ctx.get_many(index.Index, list(index.INDEXES)):
         index_df = pd.DataFrame(index_table.model_dump()["df"]).set_index("day")
         combined_index = index_df.index.union(df_index, sort=True)
         index_df = index_df.reindex(combined_index).ffill().loc[df_index]
@@ -52,10 +48,7 @@ async def _load_indexes(ctx: handler.Ctx, df_index: pd.DatetimeIndex) -> list[di
     ]
 
 
-async def _add_indexes_features(
-    ctx: handler.Ctx, ticker: domain.UID, indexes: list[dict[features.NumFeat, FiniteFloat]]
-) -> None:
-    quotes_table = await ctx.get_for_update(features.Features, ticker)
+def _add_indexes_features(quotes_table: features.Features, indexes: list[dict[features.NumFeat, FiniteFloat]]) -> None:
 
     delta_len = len(indexes) - len(quotes_table.numerical)
 
@@ -12,19 +12,18 @@ class SecFeatHandler:
         async with asyncio.TaskGroup() as tg:
             sec_task = tg.create_task(ctx.get(securities.Securities))
             port = await ctx.get(portfolio.Portfolio)
-            feat = [tg.create_task(ctx.get_for_update(Features, domain.UID(pos.ticker))) for pos in port.positions]
+            feats = await ctx.get_many_for_update(Features, [domain.UID(pos.ticker) for pos in port.positions])
 
-            sec = await sec_task
+        sec = await sec_task
 
-            pos_count = len(port.positions)
-            sec_types, types_count = _prepare_sec_types(port, sec)
-            sec_sectors, sectors_count = _prepare_sectors(port, sec)
+        pos_count = len(port.positions)
+        sec_types, types_count = _prepare_sec_types(port, sec)
+        sec_sectors, sectors_count = _prepare_sectors(port, sec)
 
-            for n, feat_task in enumerate(feat):
-                feat = await feat_task
-                feat.embedding[EmbFeat.TICKER] = EmbeddingFeatDesc(value=n, size=pos_count)
-                feat.embedding[EmbFeat.TICKER_TYPE] = EmbeddingFeatDesc(value=sec_types[feat.uid], size=types_count)
-                feat.embedding[EmbFeat.SECTOR] = EmbeddingFeatDesc(value=sec_sectors[feat.uid], size=sectors_count)
+        for n, feat in enumerate(feats):
+            feat.embedding[EmbFeat.TICKER] = EmbeddingFeatDesc(value=n, size=pos_count)
+            feat.embedding[EmbFeat.TICKER_TYPE] = EmbeddingFeatDesc(value=sec_types[feat.uid], size=types_count)
+            feat.embedding[EmbFeat.SECTOR] = EmbeddingFeatDesc(value=sec_sectors[feat.uid], size=sectors_count)
 
         ctx.publish(handler.SecFeatUpdated(day=msg.day))
 
@@ -102,7 +102,7 @@ class Trainer:
         )
 
         try:
-            await asyncio.to_thread(
+            mean, cov = await asyncio.to_thread(
                 self._run,
                 model,
                 data,
@@ -119,6 +119,9 @@ class Trainer:
         model.risk_tolerance = cfg.risk.risk_tolerance
         model.duration = time.monotonic() - start
 
+        forecast = await ctx.get_for_update(evolve.ModelForecast, model.uid)
+        forecast.update(model, mean, cov)
+
     def _run(  # noqa: PLR0913
         self,
         model: evolve.Model,
@@ -127,12 +130,13 @@ class Trainer:
         emb_seq_size: list[int],
         cfg: Cfg,
         forecast_days: int,
-    ) -> None:
+    ) -> tuple[list[list[float]], list[list[float]]]:
         net = self._prepare_net(cfg, emb_size, emb_seq_size)
         self._train(net, cfg.optimizer, cfg.scheduler, data, cfg.batch.size)
 
         model.alfa, model.llh, model.ret = self._test(net, cfg, forecast_days, data)
-        model.mean, model.cov = self._forecast(net, forecast_days, data)
+
+        return self._forecast(net, forecast_days, data)
 
     def _train(
         self,
@@ -1,5 +1,6 @@
 import logging
 import operator
+from collections.abc import Sequence
 from typing import Final, Protocol, Self
 
 import bson
@@ -44,8 +45,22 @@ class Ctx(Protocol):
         uid: domain.UID | None = None,
     ) -> E: ...
 
+    async def get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
+
+    async def get_many_for_update[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
+
     async def delete(self, entity: domain.Entity) -> None: ...
 
+    async def delete_many(self, t_entity: type[domain.Entity], uids: Sequence[domain.UID]) -> None: ...
+
     async def count_models(self) -> int: ...
 
     async def next_model_for_update(self, uid: domain.UID) -> tuple[evolve.Model, bool]: ...
@@ -69,16 +84,31 @@ class Result(BaseModel):
         )
 
 
+class TrainingQueue(Protocol):
+    @property
+    def capacity(self) -> int: ...
+
+    async def wait(self, uids: Sequence[domain.UID]) -> bool: ...
+
+
 class EvolutionHandler:
-    def __init__(self) -> None:
+    def __init__(self, queue: TrainingQueue | None = None) -> None:
         self._lgr = logging.getLogger()
         self._builder = builder.Builder()
+        self._queue = queue
 
     async def __call__(
         self,
         ctx: Ctx,
-        msg: handler.DataChecked,
+        msg: handler.DataChecked | handler.TrainingQueued,
     ) -> None:
+        match self._queue:
+            case None:
+                await self._step(ctx, msg)
+            case queue:
+                await self._step_with_workers(ctx, queue, msg)
+
+    async def _step(self, ctx: Ctx, msg: handler.DataChecked | handler.TrainingQueued) -> None:
         evolution, count = await self._init_step(ctx, msg)
         model, good = await self._get_model(ctx, evolution)
         self._lgr.info(
@@ -93,13 +123,106 @@ class EvolutionHandler:
         try:
             await self._update_model_metrics(ctx, evolution, model)
         except* errors.DomainError as err:
-            await self._delete_model_on_error(ctx, evolution, model, err)
+            await self._delete_model_on_error(
+                ctx,
+                evolution,
+                model,
+                str(err.exceptions[0]),
+                _extract_minimal_returns_days(err),
+            )
 
             ctx.publish(handler.ModelDeleted(day=evolution.day, uid=model.uid))
         else:
             ctx.publish(await self._eval_model(ctx, evolution, model, good=good))
 
-    async def _init_step(self, ctx: Ctx, msg: handler.DataChecked) -> tuple[evolve.Evolution, int]:
+    async def _step_with_workers(
+        self,
+        ctx: Ctx,
+        queue: TrainingQueue,
+        msg: handler.DataChecked | handler.TrainingQueued,
+    ) -> None:
+        """Модели обучают воркеры, а результаты применяются к состоянию эволюции в порядке готовности."""
+        if isinstance(msg, handler.TrainingQueued) and not await queue.wait(msg.uids):
+            self._lgr.warning("Training jobs are not completed by workers - training in main process")
+            await self._step(ctx, msg)
+
+            return
+
+        evolution, count = await self._init_step(ctx, msg)
+        applied = False
+
+        for job in await ctx.get_many(evolve.TrainingJob, evolution.jobs):
+            match job.status:
+                case _ if job.day != evolution.day:
+                    self._lgr.info("Training job %s for %s discarded", job.uid, job.day)
+                case evolve.JobStatus.QUEUED:
+                    continue
+                case _:
+                    ctx.publish(await self._apply_job(ctx, evolution, job))
+                    applied = True
+
+            evolution.jobs.remove(job.uid)
+            await ctx.delete(job)
+
+        await self._enqueue(ctx, evolution, count, queue.capacity)
+
+        if not applied:
+            ctx.publish(handler.TrainingQueued(day=evolution.day, uids=list(evolution.jobs)))
+
+    async def _apply_job(
+        self,
+        ctx: Ctx,
+        evolution: evolve.Evolution,
+        job: evolve.TrainingJob,
+    ) -> handler.ModelDeleted | handler.ModelEvaluated:
+        model = await ctx.get_for_update(evolve.Model, job.uid)
+        evolution.state = job.state
+
+        if job.status is evolve.JobStatus.FAILED:
+            await self._delete_model_on_error(ctx, evolution, model, job.error, job.minimal_returns_days)
+
+            return handler.ModelDeleted(day=evolution.day, uid=model.uid)
+
+        self._lgr.info("%s trained by %s", model, job.worker)
+
+        return await self._eval_model(ctx, evolution, model, good=job.good)
+
+    async def _enqueue(self, ctx: Ctx, evolution: evolve.Evolution, count: int, capacity: int) -> None:
+        jobs = await ctx.get_many(evolve.TrainingJob, evolution.jobs)
+
+        # Параллельно обучаются только новые модели - остальные состояния ждут своего результата
+        if any(job.state is not evolve.State.CREATE_NEW_MODEL for job in jobs):
+            return
+
+        while len(evolution.jobs) < capacity:
+            state = evolution.state
+            model, good = await self._get_model(ctx, evolution)
+
+            if model.uid in evolution.jobs:
+                evolution.state = state
+
+                return
+
+            job = await ctx.get_for_update(evolve.TrainingJob, model.uid)
+            job.enqueue(evolution, good=good)
+            evolution.jobs.append(model.uid)
+            self._lgr.info(
+                "Day %s step %d models %d: %s - %s queued",
+                evolution.day,
+                evolution.step,
+                count,
+                evolution.state,
+                model,
+            )
+
+            if evolution.state is not evolve.State.CREATE_NEW_MODEL:
+                return
+
+    async def _init_step(
+        self,
+        ctx: Ctx,
+        msg: handler.DataChecked | handler.TrainingQueued,
+    ) -> tuple[evolve.Evolution, int]:
         evolution = await ctx.get_for_update(evolve.Evolution)
 
         if not (count := await ctx.count_models()):
@@ -169,17 +292,21 @@ class EvolutionHandler:
         await tr.update_model_metrics(ctx, model, int(evolution.test_days))
         self._lgr.info(f"{model}")
 
+    async def _delete_model(self, ctx: Ctx, model: evolve.Model) -> None:
+        await ctx.delete(model)
+        await ctx.delete_many(evolve.ModelForecast, [model.uid])
+
     async def _delete_model_on_error(
         self,
         ctx: Ctx,
         evolution: evolve.Evolution,
         model: evolve.Model,
-        err: BaseExceptionGroup[errors.DomainError],
+        reason: str,
+        minimal_returns_days: int | None,
     ) -> None:
-        await ctx.delete(model)
-        self._lgr.info("Model deleted - %s...", err.exceptions[0])
+        await self._delete_model(ctx, model)
+        self._lgr.info("Model deleted - %s...", reason)
 
-        minimal_returns_days = _extract_minimal_returns_days(err)
         if minimal_returns_days is not None and evolution.state is not evolve.State.CREATE_NEW_MODEL:
             evolution.minimal_returns_days = max(
                 evolution.minimal_returns_days
@@ -271,18 +398,43 @@ class EvolutionHandler:
 
         if model.alfa_diff.p < consts.P_VALUE / 2:
             self._lgr.info("Deleted - very low alfa quality")
-            await ctx.delete(model)
+            await self._delete_model(ctx, model)
 
             return True
 
         if model.llh_diff.p < consts.P_VALUE / 2:
             self._lgr.info("Deleted - very low llh quality")
-            await ctx.delete(model)
+            await self._delete_model(ctx, model)
 
             return True
 
         return False
 
 
+class TrainingHandler:
+    """Обучает модель по заданию из очереди - результат применяет основной процесс."""
+
+    def __init__(self) -> None:
+        self._lgr = logging.getLogger()
+        self._builder = builder.Builder()
+
+    async def __call__(self, ctx: Ctx, job: evolve.TrainingJob) -> None:
+        model = await ctx.get_for_update(evolve.Model, job.uid)
+        model.day = job.day
+        model.tickers = job.tickers
+        model.forecast_days = job.forecast_days
+
+        tr = trainer.Trainer(self._builder)
+
+        try:
+            await tr.update_model_metrics(ctx, model, job.test_days)
+        except* errors.DomainError as err:
+            job.failed(str(err.exceptions[0]), _extract_minimal_returns_days(err))
+            self._lgr.info("Training failed - %s", job.error)
+        else:
+            job.trained()
+            self._lgr.info(f"{model}")
+
+
 def _delta(target: list[float], base: list[float]) -> list[float]:
     return list(map(operator.sub, target, base))
@@ -1,6 +1,7 @@
-from collections.abc import AsyncIterator, Iterator
+from collections.abc import AsyncIterator, Iterator, Sequence
 from contextlib import asynccontextmanager, contextmanager
-from typing import Protocol
+from datetime import timedelta
+from typing import NamedTuple, Protocol
 
 import aiohttp
 from pydantic import BaseModel, Field, ValidationError, computed_field
@@ -26,8 +27,38 @@ class Ctx(Protocol):
         uid: domain.UID | None = None,
     ) -> E: ...
 
+    async def get_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
+
+    async def get_many_for_update[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
+
+    async def find_many[E: domain.Entity](
+        self,
+        t_entity: type[E],
+        uids: Sequence[domain.UID],
+    ) -> list[E]: ...
 
-class AppStarted(Event): ...
+
+class Download(NamedTuple):
+    body: bytes
+    digest: str
+    # Тело совпадает с полученным при предыдущем запросе
+    unchanged: bool
+
+
+class HTTPCache(Protocol):
+    async def get(self, url: str, ttl: timedelta = ...) -> Download: ...
+
+
+class AppStarted(Event):
+    resumed: bool = False
 
 
 class NewDataPublished(Event):
@@ -101,6 +132,11 @@ class DataChecked(Event):
     day: domain.Day
 
 
+class TrainingQueued(Event):
+    day: domain.Day
+    uids: list[domain.UID]
+
+
 class ModelDeleted(Event):
     day: domain.Day
     uid: domain.UID
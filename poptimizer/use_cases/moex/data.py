@@ -64,6 +64,8 @@ class DataHandler:
                     self._lgr.info("Memory usage - %.2f%%", usage)
 
         match msg:
+            case handler.AppStarted(resumed=True):
+                self._lgr.info("Data check skipped - resuming undelivered events")
             case handler.AppStarted() | handler.ForecastsAnalyzed():
                 ctx.publish(await self._check(ctx))
             case handler.SecFeatUpdated():
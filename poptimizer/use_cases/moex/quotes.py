@@ -1,11 +1,13 @@
 import asyncio
-from datetime import date
-from typing import TYPE_CHECKING
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Final
 
 import aiomoex
-from pydantic import TypeAdapter
+from pydantic import BaseModel, Field, TypeAdapter
 
-from poptimizer import consts
+from poptimizer import consts, errors
 from poptimizer.domain import domain
 from poptimizer.domain.moex import quotes, securities
 from poptimizer.use_cases import handler
@@ -13,38 +15,156 @@ from poptimizer.use_cases import handler
 if TYPE_CHECKING:
     import aiohttp
 
+# Бумаги с котировками не старше этого срока дополняются снимками торгов всего режима за каждую дату
+_SNAPSHOT_DAYS: Final = timedelta(days=10)
+_SNAPSHOT_URL: Final = "https://iss.moex.com/iss/history/engines/stock/markets/shares/boards/{board}/securities.json"
+_SNAPSHOT_TABLE: Final = "history"
+_SNAPSHOT_COLUMNS: Final = ("SECID", "TRADEDATE", "OPEN", "CLOSE", "HIGH", "LOW", "VALUE")
+
+
+class _SnapshotRow(BaseModel):
+    ticker: str = Field(alias="SECID")
+    day: domain.Day = Field(alias="TRADEDATE")
+    open: float | None = Field(alias="OPEN")
+    close: float | None = Field(alias="CLOSE")
+    high: float | None = Field(alias="HIGH")
+    low: float | None = Field(alias="LOW")
+    turnover: float = Field(alias="VALUE")
+
+    def to_row(self) -> quotes.Row | None:
+        if self.open is None or self.close is None or self.high is None or self.low is None:
+            return None
+
+        return quotes.Row(
+            day=self.day,
+            open=self.open,
+            close=self.close,
+            high=self.high,
+            low=self.low,
+            turnover=self.turnover,
+        )
+
 
 class QuotesHandler:
     def __init__(self, http_client: aiohttp.ClientSession) -> None:
+        self._lgr = logging.getLogger()
         self._http_client = http_client
 
     async def __call__(self, ctx: handler.Ctx, msg: handler.DivUpdated) -> None:
         sec_table = await ctx.get(securities.Securities)
+        tickers = [domain.UID(sec.ticker) for sec in sec_table.df]
+        tables = await ctx.get_many_for_update(quotes.Quotes, tickers)
 
-        trading_days: set[domain.Day] = set()
+        recent: list[quotes.Quotes] = []
+        backfill: list[quotes.Quotes] = []
+
+        for table in tables:
+            match table.last_row_date():
+                case date() as last_day if last_day >= msg.day - _SNAPSHOT_DAYS:
+                    recent.append(table)
+                case _:
+                    backfill.append(table)
 
         async with asyncio.TaskGroup() as tg:
-            for sec in sec_table.df:
-                tg.create_task(self._update_one(ctx, sec.ticker, msg.day, trading_days))
+            recent_task = tg.create_task(
+                self._update_recent(recent, sorted({sec.board for sec in sec_table.df}), msg.day),
+            )
+
+            for table in backfill:
+                tg.create_task(self._update_one(table, msg.day))
+
+        downloaded = len(backfill) + await recent_task
+        self._lgr.info(
+            "Quotes of %d tickers updated from board snapshots, %d downloaded",
+            len(tables) - downloaded,
+            downloaded,
+        )
 
+        trading_days = {row.day for table in tables for row in table.df}
         ctx.publish(handler.QuotesUpdated(trading_days=sorted(trading_days)))
 
+    async def _update_recent(
+        self,
+        tables: list[quotes.Quotes],
+        boards: list[str],
+        update_day: domain.Day,
+    ) -> int:
+        if not tables:
+            return 0
+
+        last_days = [table.last_row_date() or update_day for table in tables]
+        # Снимок включает последний сохраненный день для проверки на изменение данных задним числом
+        rows = await self._download_snapshots(boards, min(last_days), update_day)
+        missed: list[quotes.Quotes] = []
+
+        for table, last_day in zip(tables, last_days, strict=True):
+            if not (table_rows := [row for row in rows[table.uid] if row.day >= last_day]):
+                missed.append(table)
+
+                continue
+
+            try:
+                table.update(update_day, table_rows)
+            except errors.DomainError:
+                missed.append(table)
+
+        # Если последний сохраненный день отсутствует в снимках или не совпадает с ними,
+        # котировки бумаги загружаются отдельно и сверяются со свечами
+        async with asyncio.TaskGroup() as tg:
+            for table in missed:
+                tg.create_task(self._update_one(table, update_day))
+
+        return len(missed)
+
+    async def _download_snapshots(
+        self,
+        boards: list[str],
+        start_day: domain.Day,
+        update_day: domain.Day,
+    ) -> dict[str, list[quotes.Row]]:
+        days = [start_day + timedelta(days=n) for n in range((update_day - start_day).days + 1)]
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self._download_snapshot(board, day)) for board in boards for day in days]
+
+        rows: defaultdict[str, list[quotes.Row]] = defaultdict(list)
+
+        for ticker, row in sorted((row for task in tasks for row in task.result()), key=lambda row: row[1].day):
+            rows[ticker].append(row)
+
+        return rows
+
+    async def _download_snapshot(self, board: str, day: domain.Day) -> list[tuple[str, quotes.Row]]:
+        iss = aiomoex.ISSClient(
+            self._http_client,
+            _SNAPSHOT_URL.format(board=board),
+            {
+                "date": str(day),
+                "iss.only": f"{_SNAPSHOT_TABLE},{_SNAPSHOT_TABLE}.cursor",
+                f"{_SNAPSHOT_TABLE}.columns": ",".join(_SNAPSHOT_COLUMNS),
+            },
+        )
+
+        async with handler.wrap_http_err(f"{board} {day} MOEX ISS error"):
+            json = await iss.get_all()
+
+        with handler.wrap_validation_err(f"invalid {board} {day} data"):
+            snapshot = TypeAdapter(list[_SnapshotRow]).validate_python(json.get(_SNAPSHOT_TABLE, []))
+
+            return [
+                (snapshot_row.ticker, row) for snapshot_row in snapshot if (row := snapshot_row.to_row()) is not None
+            ]
+
     async def _update_one(
         self,
-        ctx: handler.Ctx,
-        ticker: str,
+        table: quotes.Quotes,
         update_day: domain.Day,
-        trading_days: set[domain.Day],
     ) -> None:
-        table = await ctx.get_for_update(quotes.Quotes, domain.UID(ticker))
-
         start_day = table.last_row_date() or consts.START_DAY
-        rows = await self._download(ticker, start_day, update_day)
+        rows = await self._download(table.uid, start_day, update_day)
 
         table.update(update_day, rows)
 
-        trading_days.update(row.day for row in table.df)
-
     async def _download(
         self,
         ticker: str,
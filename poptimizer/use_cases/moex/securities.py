@@ -1,5 +1,6 @@
 import asyncio
 import itertools
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any, Final
 
 import aiomoex
@@ -30,6 +31,7 @@ _COLUMNS: Final = (
 )
 
 _ETF_URL: Final = "https://rusetfs.com/api/v1/screener"
+_ETF_TTL: Final = timedelta(hours=12)
 
 
 class _IndexSectorRow(BaseModel):
@@ -55,8 +57,12 @@ type _Cache = dict[domain.Ticker, tuple[domain.Sector, domain.Day]]
 
 
 class SecuritiesHandler:
-    def __init__(self, http_client: aiohttp.ClientSession) -> None:
+    def __init__(self, http_client: aiohttp.ClientSession, http_cache: handler.HTTPCache) -> None:
         self._http_client = http_client
+        self._http_cache = http_cache
+        # Разобранное описание ETF для последней полученной версии файла
+        self._etf_digest = ""
+        self._etf_sectors: dict[domain.Ticker, domain.Sector] = {}
 
     async def __call__(self, ctx: handler.Ctx, msg: handler.NewDataPublished) -> None:
         table = await ctx.get_for_update(securities.Securities)
@@ -95,20 +101,17 @@ class SecuritiesHandler:
         return cache
 
     async def _update_etf_sector_cache(self, cache: _Cache) -> None:
-        async with (
-            handler.wrap_http_err("can't load etf sector data"),
-            self._http_client.get(_ETF_URL) as resp,
-        ):
-            if not resp.ok:
-                raise errors.UseCasesError(f"bad etf description respond {resp.reason}")
+        json_file = await self._http_cache.get(_ETF_URL, _ETF_TTL)
 
-            json = await resp.json()
+        if json_file.digest != self._etf_digest:
+            with handler.wrap_validation_err("invalid etf description data"):
+                etf_desc = TypeAdapter(list[_ETFSectorRow]).validate_json(json_file.body)
 
-        with handler.wrap_validation_err("invalid etf description data"):
-            etf_desc = TypeAdapter(list[_ETFSectorRow]).validate_python(json)
+            self._etf_sectors = {desc.ticker: desc.sector for desc in etf_desc}
+            self._etf_digest = json_file.digest
 
-        for desc in etf_desc:
-            cache[desc.ticker] = (desc.sector, consts.START_DAY)
+        for ticker, sector in self._etf_sectors.items():
+            cache[ticker] = (sector, consts.START_DAY)
 
     async def _update_shares_sector_cache(
         self,
@@ -0,0 +1,149 @@
+from datetime import date
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from poptimizer import errors
+from poptimizer.domain import domain
+from poptimizer.domain.moex import quotes, securities
+from poptimizer.use_cases import handler
+from poptimizer.use_cases.moex import quotes as quotes_handler
+
+_UPDATE_DAY = date(2025, 1, 29)
+_LAST_DAY = date(2025, 1, 27)
+
+
+def _row(day: date, price: float = 1.0) -> quotes.Row:
+    return quotes.Row(day=day, open=price, close=price, high=price, low=price, turnover=100.0)
+
+
+def _sec(ticker: str) -> securities.Row:
+    return securities.Row(ticker=ticker, lot=1, isin="", board="TQBR", type="1", instrument="EQIN")
+
+
+def _table(ticker: str, last_day: date) -> quotes.Quotes:
+    return quotes.Quotes(
+        rev=domain.Revision(uid=domain.UID(ticker), ver=domain.Version(1)),
+        day=last_day,
+        df=[_row(last_day)],
+    )
+
+
+def _ctx(tables: list[quotes.Quotes]) -> Mock:
+    ctx = Mock()
+    sec_table = Mock()
+    sec_table.df = [_sec(table.uid) for table in tables]
+    ctx.get = AsyncMock(return_value=sec_table)
+    ctx.get_many_for_update = AsyncMock(return_value=tables)
+    ctx.publish = Mock(return_value=None)
+
+    return ctx
+
+
+def _snapshots(rows: dict[date, list[tuple[str, quotes.Row]]]) -> AsyncMock:
+    async def download(board: str, day: date) -> list[tuple[str, quotes.Row]]:  # noqa: ARG001
+        return rows.get(day, [])
+
+    return AsyncMock(side_effect=download)
+
+
+def _candles(tables: list[quotes.Quotes]) -> AsyncMock:
+    last_rows = {table.uid: table.df[-1] for table in tables}
+
+    async def download(ticker: str, start_day: date, update_day: date) -> list[quotes.Row]:  # noqa: ARG001
+        return [last_rows[ticker], _row(update_day, 2.0)]
+
+    return AsyncMock(side_effect=download)
+
+
+async def test_recent_from_snapshots_and_old_from_candles():
+    recent = _table("AAAA", _LAST_DAY)
+    old = _table("BBBB", date(2024, 1, 10))
+    missed = _table("CCCC", _LAST_DAY)
+    tables = [recent, old, missed]
+    ctx = _ctx(tables)
+
+    quotes_obj = quotes_handler.QuotesHandler(Mock())
+    quotes_obj._download_snapshot = _snapshots(
+        {
+            date(2025, 1, 27): [("AAAA", _row(date(2025, 1, 27)))],
+            date(2025, 1, 28): [("AAAA", _row(date(2025, 1, 28), 3.0)), ("CCCC", _row(date(2025, 1, 28), 4.0))],
+            date(2025, 1, 29): [("AAAA", _row(date(2025, 1, 29), 5.0))],
+        }
+    )
+    quotes_obj._download = _candles(tables)
+
+    await quotes_obj(ctx, handler.DivUpdated(day=_UPDATE_DAY))
+
+    assert recent.df == [_row(date(2025, 1, 27)), _row(date(2025, 1, 28), 3.0), _row(date(2025, 1, 29), 5.0)]
+    assert old.df == [_row(date(2024, 1, 10)), _row(_UPDATE_DAY, 2.0)]
+    assert missed.df == [_row(_LAST_DAY), _row(_UPDATE_DAY, 2.0)]
+    assert all(table.day == _UPDATE_DAY for table in tables)
+    assert sorted(call.args[0] for call in quotes_obj._download.call_args_list) == ["BBBB", "CCCC"]
+    assert sorted(call.args[1] for call in quotes_obj._download_snapshot.call_args_list) == [
+        date(2025, 1, 27),
+        date(2025, 1, 28),
+        date(2025, 1, 29),
+    ]
+
+
+async def test_snapshot_turnover_differs_from_candles():
+    table = _table("AAAA", _LAST_DAY)
+    snapshot_last = _row(_LAST_DAY).model_copy(update={"turnover": 50.0})
+    quotes_obj = quotes_handler.QuotesHandler(Mock())
+    quotes_obj._download_snapshot = _snapshots(
+        {_LAST_DAY: [("AAAA", snapshot_last)], _UPDATE_DAY: [("AAAA", _row(_UPDATE_DAY, 3.0))]},
+    )
+    quotes_obj._download = _candles([table])
+
+    await quotes_obj(_ctx([table]), handler.DivUpdated(day=_UPDATE_DAY))
+
+    assert table.df == [_row(_LAST_DAY), _row(_UPDATE_DAY, 3.0)]
+    quotes_obj._download.assert_not_called()
+
+
+async def test_snapshot_price_mismatch_downloads_candles():
+    table = _table("AAAA", _LAST_DAY)
+    quotes_obj = quotes_handler.QuotesHandler(Mock())
+    quotes_obj._download_snapshot = _snapshots({_LAST_DAY: [("AAAA", _row(_LAST_DAY, 2.0))]})
+    quotes_obj._download = _candles([table])
+
+    await quotes_obj(_ctx([table]), handler.DivUpdated(day=_UPDATE_DAY))
+
+    assert table.df == [_row(_LAST_DAY), _row(_UPDATE_DAY, 2.0)]
+    quotes_obj._download.assert_called_once()
+
+
+async def test_candles_revision_mismatch():
+    table = _table("AAAA", _LAST_DAY)
+    quotes_obj = quotes_handler.QuotesHandler(Mock())
+    quotes_obj._download_snapshot = _snapshots({})
+    quotes_obj._download = AsyncMock(return_value=[_row(_LAST_DAY, 2.0), _row(_UPDATE_DAY, 2.0)])
+
+    with pytest.raises(ExceptionGroup) as exc_info:
+        await quotes_obj(_ctx([table]), handler.DivUpdated(day=_UPDATE_DAY))
+
+    assert exc_info.group_contains(errors.DomainError, match="data mismatch")
+
+
+async def test_snapshot_invalid_price(monkeypatch):
+    iss = Mock()
+    iss.get_all = AsyncMock(
+        return_value={
+            "history": [
+                {
+                    "SECID": "AAAA",
+                    "TRADEDATE": "2025-01-28",
+                    "OPEN": 0.0,
+                    "CLOSE": 1.0,
+                    "HIGH": 1.0,
+                    "LOW": 1.0,
+                    "VALUE": 100.0,
+                },
+            ],
+        },
+    )
+    monkeypatch.setattr(quotes_handler.aiomoex, "ISSClient", Mock(return_value=iss))
+
+    with pytest.raises(errors.UseCasesError, match="invalid TQBR 2025-01-28 data"):
+        await quotes_handler.QuotesHandler(Mock())._download_snapshot("TQBR", date(2025, 1, 28))
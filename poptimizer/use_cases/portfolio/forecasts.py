@@ -20,17 +20,18 @@ class ForecastHandler:
     async def __call__(
         self,
         ctx: handler.Ctx,
-        msg: handler.ModelDeleted | handler.ModelEvaluated,
+        msg: list[handler.ModelDeleted | handler.ModelEvaluated],
     ) -> None:
         forecast = await ctx.get_for_update(forecasts.Forecast)
-        if forecast.day < msg.day:
-            forecast.init_day(msg.day)
+        if forecast.day < (day := max(event.day for event in msg)):
+            forecast.init_day(day)
 
-        match msg:
-            case handler.ModelDeleted():
-                forecast.models -= {msg.uid}
-            case handler.ModelEvaluated():
-                forecast.models.add(msg.uid)
+        for event in msg:
+            match event:
+                case handler.ModelDeleted():
+                    forecast.models -= {event.uid}
+                case handler.ModelEvaluated():
+                    forecast.models.add(event.uid)
 
         port = await ctx.get(portfolio.Portfolio)
 
@@ -48,15 +49,30 @@ class ForecastHandler:
         positions = port.normalized_positions
         port_tickers = tuple(pos.ticker for pos in positions)
 
-        models: list[evolve.Model] = []
-
-        for uid in frozenset(forecast.models):
-            model = await ctx.get(evolve.Model, uid)
-            if model.day != port.day or model.tickers != port_tickers or model.forecast_days != port.forecast_days:
+        uids = list(forecast.models)
+        models: list[tuple[evolve.Model, evolve.ModelForecast]] = []
+
+        async with asyncio.TaskGroup() as tg:
+            models_task = tg.create_task(ctx.find_many(evolve.Model, uids))
+            forecasts_task = tg.create_task(ctx.find_many(evolve.ModelForecast, uids))
+
+        # Удаленные модели и модели без прогноза не учитываются
+        found_models = {model.uid: model for model in await models_task}
+        model_forecasts = {model_forecast.uid: model_forecast for model_forecast in await forecasts_task}
+
+        for uid in uids:
+            if (
+                (model := found_models.get(uid)) is None
+                or (model_forecast := model_forecasts.get(uid)) is None
+                or model.day != port.day
+                or model.tickers != port_tickers
+                or model.forecast_days != port.forecast_days
+                or not model_forecast.is_actual(model)
+            ):
                 forecast.models.remove(uid)
                 continue
 
-            models.append(model)
+            models.append((model, model_forecast))
 
         if len(models) <= 1 or not any(pos.weight for pos in positions):
             return
@@ -74,7 +90,7 @@ class ForecastHandler:
     def _update_forecast(
         self,
         forecast: forecasts.Forecast,
-        models: list[evolve.Model],
+        models: list[tuple[evolve.Model, evolve.ModelForecast]],
         positions: list[portfolio.NormalizedPosition],
     ) -> None:
         weights = np.array([pos.weight for pos in positions]).reshape(-1, 1)
@@ -93,13 +109,13 @@ class ForecastHandler:
         risk_tol: list[float] = []
         p_value = consts.P_VALUE * 2 / len(positions)
 
-        for model in models:
-            mean: NDArray[np.double] = np.array(model.mean)
+        for model, model_forecast in models:
+            mean: NDArray[np.double] = np.array(model_forecast.mean)
             means.append(mean)
             port_mean = weights.reshape(1, -1) @ mean
             port_means.append(port_mean.item())
 
-            cov: NDArray[np.double] = np.array(model.cov)
+            cov: NDArray[np.double] = np.array(model_forecast.cov)
             std = np.diag(cov).reshape(-1, 1) ** 0.5
             stds.append(std)
             covs = cov @ weights
@@ -53,13 +53,12 @@ class PortfolioHandler:
         sec_table = await sec_task
         evolution = await evolution_task
 
-        async with asyncio.TaskGroup() as tg:
-            quotes_tasks = [tg.create_task(ctx.get(quotes.Quotes, domain.UID(sec.ticker))) for sec in sec_table.df]
+        quotes_tables = await ctx.get_many(quotes.Quotes, [domain.UID(sec.ticker) for sec in sec_table.df])
 
         cache: dict[domain.Ticker, portfolio.Position] = {}
 
-        for sec, quotes_task in zip(sec_table.df, quotes_tasks, strict=True):
-            df = quotes_task.result().df
+        for sec, quotes_table in zip(sec_table.df, quotes_tables, strict=True):
+            df = quotes_table.df
 
             if len(df) < evolution.minimal_returns_days:
                 continue
@@ -3,7 +3,7 @@ import http
 import logging
 from enum import StrEnum, auto
 from pathlib import Path
-from typing import Any
+from typing import Any, Final
 from urllib import parse
 
 from aiohttp import typedefs, web
@@ -18,6 +18,8 @@ from poptimizer.domain.domain import AccName, Ticker, date
 from poptimizer.domain.portfolio import forecasts, portfolio
 from poptimizer.use_cases import handler
 
+_PROMETHEUS_CONTENT_TYPE: Final = "text/plain; version=0.0.4; charset=utf-8"
+
 
 class Layout(BaseModel):
     title: str
@@ -218,6 +220,7 @@ class Provider:
         for method, path, unwrapped_handler in routes:
             self._app.add_routes([method(path, bus.wrap(unwrapped_handler))])
 
+        self._app.add_routes([web.get("/metrics", self._metrics)])
         self._app.add_routes([web.get("/{path:.*}", self._static_file)])
 
     def __call__(self) -> web.Application:
@@ -664,6 +667,9 @@ class Provider:
             content_type="text/html",
         )
 
+    async def _metrics(self, req: web.Request) -> web.StreamResponse:  # noqa: ARG002
+        return web.Response(text=self._bus.prometheus_metrics(), headers={"Content-Type": _PROMETHEUS_CONTENT_TYPE})
+
     async def _static_file(self, req: web.Request) -> web.StreamResponse:
         file_path = Path(__file__).parent / "static" / req.match_info["path"]
 